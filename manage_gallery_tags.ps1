@@ -32,9 +32,13 @@ function Show-Help {
 
 function List-MarkedWorks {
     Write-Host "搜尋已標記的作品..." -ForegroundColor Cyan
-    $marked = Get-ChildItem -Path $GalleryRoot -Filter $MarkerFile -Recurse -Force | ForEach-Object {
-        $_.Directory.Name
-    }
+    # 標記檔案只會放在作品資料夾第一層，不需遞迴掃描整個 Gallery 目錄
+    # （伺服器端可直接查詢 /gallery/api/list?featured=true）
+    $marked = @(Get-ChildItem -Path $GalleryRoot -Directory -Force | Where-Object {
+        Test-Path -LiteralPath (Join-Path $_.FullName $MarkerFile)
+    } | ForEach-Object {
+        $_.Name
+    })
     
     if ($marked.Count -eq 0) {
         Write-Host "目前沒有任何作品被標記為精選" -ForegroundColor Yellow
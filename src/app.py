@@ -7,17 +7,26 @@
 重構版本：採用 Blueprint 模組化架構
 - 漫畫和 Gallery 模組完全隔離
 - 易於擴展和維護
+- create_app 應用工廠：服務可由外部注入，正式環境由 serve.py / wsgi.py 啟動
 """
 
-from flask import Flask, redirect, jsonify
+from flask import Flask, redirect, jsonify, Response, stream_with_context, request, g
 from pathlib import Path
+import atexit
+import logging
 import os
+import time
 
 # 導入配置管理
 from config import load_config, get_frontend_config
 
 # 導入狀態管理
 from core.status_manager import StatusManager
+from core.event_broker import EventBroker
+from core.progress_store import ProgressStore
+from core.response import configure_responses
+from core.metrics import metrics
+from core.index_snapshot import IndexSnapshot
 
 # 導入漫畫模組
 from modules.manga.routes import manga_bp, init_service as init_manga_service
@@ -37,7 +46,7 @@ def ensure_data_directory():
     
     # 創建 data 目錄
     if not data_dir.exists():
-        print(f"📁 創建數據目錄: {data_dir}")
+        logger.info("創建數據目錄: %s", data_dir)
         data_dir.mkdir(parents=True, exist_ok=True)
     
     # 創建初始 status.json 文件
@@ -53,83 +62,403 @@ def ensure_data_directory():
                 "reviewed": []
             }
         }
-        print(f"📝 創建狀態文件: {status_file}")
+        logger.info("創建狀態文件: %s", status_file)
         with open(status_file, 'w', encoding='utf-8') as f:
             json.dump(initial_data, f, ensure_ascii=False, indent=2)
     
-    print(f"✅ 數據目錄檢查完成")
+    logger.info("數據目錄檢查完成")
 
 
-# 創建 Flask 應用
-app = Flask(__name__)
+logger = logging.getLogger('reader')
 
-# 載入配置
-config = load_config()
 
-# 確保數據目錄存在
-ensure_data_directory()
+def configure_logging(logging_config):
+    """
+    設定日誌等級與格式（訊息以 key=value 記錄，方便過濾與解析）
+    
+    Args:
+        logging_config: 配置的 logging 區段
+    """
+    level = str(logging_config.get('level', 'INFO')).upper()
+    logging.basicConfig(format='%(asctime)s %(levelname)s %(name)s %(message)s')
+    logging.getLogger().setLevel(getattr(logging, level, logging.INFO))
 
-# 初始化狀態管理器 - 使用配置檔案指定的路徑
-status_file_path = config['manga'].get('status_file_path', './data/status.json')
-# 如果路徑是相對路徑,從專案根目錄計算
-if not Path(status_file_path).is_absolute():
-    project_root = Path(__file__).parent.parent
-    status_file_path = str(project_root / status_file_path)
 
-print(f"📊 狀態檔案路徑: {status_file_path}")
-status_manager = StatusManager(status_file_path)
+def register_metrics(app, services):
+    """
+    註冊請求計時 hook、/metrics 端點與服務的量測（快取大小、single-flight 統計）
+    
+    Args:
+        app: Flask 應用
+        services: {名稱: 服務實例}
+    """
+    access_log = app.extensions['reader']['config'].get('logging', {}).get('access_log', False)
+    
+    @app.before_request
+    def start_timer():
+        g.request_started = time.perf_counter()
+    
+    @app.after_request
+    def record_request(response):
+        """記錄請求延遲與回應大小（串流回應只計算到開始回應為止）"""
+        started = g.pop('request_started', None)
+        if started is None:
+            return response
+        elapsed = time.perf_counter() - started
+        route = request.url_rule.rule if request.url_rule else 'unmatched'
+        size = None if response.is_streamed else response.calculate_content_length()
+        metrics.observe_request(route, request.method, response.status_code, elapsed, size)
+        if access_log:
+            logger.info("request method=%s path=%s route=%s status=%d duration_ms=%.1f bytes=%s",
+                        request.method, request.path, route, response.status_code, elapsed * 1000, size)
+        return response
+    
+    def collect_services():
+        """各服務的快取項目數與 single-flight 統計"""
+        entries, executed, coalesced = [], [], []
+        for name, service in services.items():
+            labels = {'service': name}
+            entries.append((labels, len(service.cache)))
+            executed.append((labels, service.flight.executed))
+            coalesced.append((labels, service.flight.coalesced))
+        return [
+            ('reader_cache_entries', 'gauge', '記憶體快取項目數', entries),
+            ('reader_single_flight_executed_total', 'counter', '快取未命中時實際執行的計算次數', executed),
+            ('reader_single_flight_coalesced_total', 'counter', '等待其他請求結果而省下的計算次數', coalesced)
+        ]
+    
+    metrics.add_collector('services', collect_services)
+    
+    if app.extensions['reader']['config'].get('server', {}).get('metrics', True):
+        @app.route('/metrics')
+        def get_metrics():
+            """Prometheus 指標（文字格式）"""
+            return Response(metrics.render(), mimetype='text/plain; version=0.0.4')
 
-# 應用程式配置
-app.config['SECRET_KEY'] = config['server'].get('secret_key', 'manga-reader-2025')
 
-# 支援的圖片格式
-IMAGE_EXTENSIONS = set(config['manga'].get('supported_formats', ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp']))
+def register_profiling(app, services, profile_dir):
+    """
+    註冊效能診斷功能（[debug] profiling = true 時；只允許本機連線或帶有管理權杖的請求）
+    
+    - 請求帶 ?profile=1 或 X-Profile: 1 標頭：以 cProfile 分析該請求，報告名稱放在 X-Profile 回應標頭
+      （profile=text 時直接回傳文字摘要取代原回應）；串流回應只分析到開始回應為止
+    - GET /debug/profiles、/debug/profiles/<name>：報告列表與文字摘要
+    - GET /debug/memory：tracemalloc 快照（與上一次比較）與各服務記憶體快取的組成
+    
+    Args:
+        app: Flask 應用
+        services: {名稱: 服務實例}
+        profile_dir: 預設的報告目錄
+    """
+    debug_config = app.extensions['reader']['config'].get('debug', {})
+    if not debug_config.get('profiling', False):
+        return
+    
+    # 只在啟用時載入（cProfile / pstats / tracemalloc 會拉長啟動時間）
+    from core.profiling import ProfileStore, MemoryTracker, is_debug_request, summarize_cache
+    
+    profile_store = ProfileStore(
+        resolve_data_path(debug_config.get('profile_dir', profile_dir)),
+        keep=debug_config.get('profile_keep', 20)
+    )
+    memory_tracker = MemoryTracker()
+    
+    def debug_allowed():
+        return is_debug_request(debug_config, request.remote_addr, request.headers.get('X-Debug-Token'))
+    
+    @app.before_request
+    def start_profile():
+        mode = request.args.get('profile') or request.headers.get('X-Profile')
+        if not mode or mode in ('0', 'false') or not debug_allowed():
+            return
+        profiler = profile_store.start()
+        if profiler is None:
+            g.profile_busy = True  # 其他請求正在分析
+            return
+        g.profiler = profiler
+        g.profile_mode = mode
+    
+    @app.after_request
+    def stop_profile(response):
+        profiler = g.pop('profiler', None)
+        if profiler is None:
+            if g.pop('profile_busy', False):
+                response.headers['X-Profile'] = 'busy'
+            return response
+        route = request.url_rule.rule if request.url_rule else request.path
+        name = profile_store.stop(profiler, f"{request.method}{route}")
+        if g.pop('profile_mode', None) == 'text':
+            response = Response(profile_store.render(name), mimetype='text/plain')
+        response.headers['X-Profile'] = name
+        return response
+    
+    @app.teardown_request
+    def release_profile(exc):
+        """請求中途失敗時仍結束分析"""
+        profiler = g.pop('profiler', None)
+        if profiler is not None:
+            profile_store.stop(profiler, 'failed')
+    
+    @app.route('/debug/profiles')
+    def list_profiles():
+        """診斷：分析報告列表"""
+        if not debug_allowed():
+            return jsonify({'error': '只允許本機或管理權杖存取'}), 403
+        return jsonify({'profiles': profile_store.list()})
+    
+    @app.route('/debug/profiles/<name>')
+    def get_profile(name):
+        """診斷：分析報告的文字摘要（?sort=cumulative|tottime|calls&limit=N）"""
+        if not debug_allowed():
+            return jsonify({'error': '只允許本機或管理權杖存取'}), 403
+        try:
+            report = profile_store.render(name, request.args.get('sort'), request.args.get('limit', type=int))
+        except KeyError:
+            return jsonify({'error': '不支援的排序欄位'}), 400
+        if report is None:
+            return jsonify({'error': '報告不存在'}), 404
+        return Response(report, mimetype='text/plain')
+    
+    @app.route('/debug/memory')
+    def get_memory():
+        """診斷：記憶體快照（第一次呼叫時開始追蹤；?stop=1 停止追蹤）"""
+        if not debug_allowed():
+            return jsonify({'error': '只允許本機或管理權杖存取'}), 403
+        caches = {name: summarize_cache(service.cache) for name, service in services.items()}
+        if request.args.get('stop'):
+            memory_tracker.stop()
+            return jsonify({'tracing': False, 'caches': caches})
+        result = memory_tracker.snapshot(limit=request.args.get('limit', 20, type=int))
+        result['caches'] = caches
+        return jsonify(result)
 
-# 初始化服務
-MANGA_ROOT = Path(config['manga'].get('root_path', './test_manga'))
-Gallery_ROOT = Path(config['manga'].get('gallery_root_path', './test_gallery'))
 
-manga_service = MangaService(MANGA_ROOT, IMAGE_EXTENSIONS, config)
-gallery_service = GalleryService(Gallery_ROOT, IMAGE_EXTENSIONS, config)
+def resolve_data_path(path):
+    """相對路徑從專案根目錄計算"""
+    if Path(path).is_absolute():
+        return str(path)
+    return str(Path(__file__).parent.parent / path)
 
-# 初始化各模組的服務（傳入狀態管理器）
-init_manga_service(manga_service, status_manager)
-init_gallery_service(gallery_service, config.get('gallery', {}), status_manager)
 
-# 註冊 Blueprint
-app.register_blueprint(manga_bp)
-app.register_blueprint(gallery_bp)
+def create_app(config=None, manga_service=None, gallery_service=None, status_manager=None, progress_store=None):
+    """
+    建立 Flask 應用（應用工廠）
+    
+    未注入的服務依配置建立；注入的服務直接使用（測試或由啟動器預先建立）。
+    Blueprint 的服務實例是模組層級變數，因此每個進程只應建立一個應用
+    
+    Args:
+        config: 配置字典（None 時載入 config.toml）
+        manga_service: MangaService 實例（可選）
+        gallery_service: GalleryService 實例（可選）
+        status_manager: StatusManager 實例（可選）
+        progress_store: ProgressStore 實例（可選）
+        
+    Returns:
+        Flask: 應用實例
+    """
+    if config is None:
+        config = load_config()
+    
+    configure_logging(config.get('logging', {}))
+    
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = config['server'].get('secret_key', 'manga-reader-2025')
+    
+    # 初始化狀態管理器 - 使用配置檔案指定的路徑
+    if status_manager is None:
+        ensure_data_directory()
+        status_file_path = resolve_data_path(config['manga'].get('status_file_path', './data/status.json'))
+        logger.info("狀態檔案路徑: %s", status_file_path)
+        status_manager = StatusManager(status_file_path)
+    
+    # 初始化閱讀進度儲存（與狀態檔案放在同一目錄）
+    if progress_store is None:
+        default_progress_path = str(Path(status_manager.storage_path).with_name('progress.json'))
+        progress_store = ProgressStore(
+            resolve_data_path(config['manga'].get('progress_file_path', default_progress_path)),
+            flush_interval=config.get('performance', {}).get('progress_flush_seconds', 5)
+        )
+    
+    # 支援的圖片格式
+    image_extensions = set(config['manga'].get('supported_formats', ['.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp']))
+    
+    # 初始化服務
+    if manga_service is None:
+        manga_service = MangaService(Path(config['manga'].get('root_path', './test_manga')), image_extensions, config)
+    if gallery_service is None:
+        gallery_service = GalleryService(Path(config['manga'].get('gallery_root_path', './test_gallery')), image_extensions, config)
+    
+    # JSON 回應壓縮設定（兩個 Blueprint 共用）
+    configure_responses(config.get('performance', {}))
+    
+    # 初始化各模組的服務（傳入狀態管理器）
+    init_manga_service(manga_service, status_manager, progress_store)
+    init_gallery_service(gallery_service, config.get('gallery', {}), status_manager, progress_store)
+    
+    # 註冊 Blueprint
+    app.register_blueprint(manga_bp)
+    app.register_blueprint(gallery_bp)
+    
+    # 事件廣播：狀態變更與作品庫變動推送給 SSE 連線
+    event_broker = EventBroker()
+    status_manager.add_listener(event_broker.publish)
+    manga_service.index.add_listener(event_broker.publish)
+    gallery_service.index.add_listener(event_broker.publish)
+    
+    # 啟動快照：結束時保存索引與章節清單快取，下次啟動由 warm_up 載入
+    performance_config = config.get('performance', {})
+    index_snapshot = None
+    if performance_config.get('index_snapshot', True):
+        default_snapshot_path = str(Path(status_manager.storage_path).with_name('index_snapshot.bin'))
+        index_snapshot = IndexSnapshot(
+            resolve_data_path(performance_config.get('index_snapshot_path', default_snapshot_path)),
+            {'manga': manga_service, 'gallery': gallery_service}
+        )
+    
+    def sync_shared_state():
+        """同步其他 worker 的狀態變更與磁碟上的作品庫變動（變動會經由監聽器廣播）"""
+        status_manager.refresh()
+        manga_service.index.refresh()
+        gallery_service.index.refresh()
+    
+    # 供啟動器、ASGI 介面與 hook 存取的共用狀態
+    app.extensions['reader'] = {
+        'config': config,
+        'manga_service': manga_service,
+        'gallery_service': gallery_service,
+        'status_manager': status_manager,
+        'progress_store': progress_store,
+        'event_broker': event_broker,
+        'index_snapshot': index_snapshot,
+        'sync_shared_state': sync_shared_state
+    }
+    
+    # 請求計時與 Prometheus 指標
+    register_metrics(app, {'manga': manga_service, 'gallery': gallery_service})
+    
+    # 效能診斷（預設關閉）
+    register_profiling(app, {'manga': manga_service, 'gallery': gallery_service},
+                       str(Path(status_manager.storage_path).with_name('profiles')))
+    
+    # 全局路由
+    @app.route('/')
+    def index():
+        """首頁：重定向到漫畫列表"""
+        return redirect('/manga')
+    
+    @app.route('/api/config')
+    def get_config():
+        """API：獲取前端配置"""
+        return jsonify(get_frontend_config(config))
+    
+    @app.route('/api/events')
+    def stream_events():
+        """API：Server-Sent Events 串流（狀態變更、作品庫變動）"""
+        server_config = config.get('server', {})
+        # 每個 SSE 連線佔用一個執行緒，超過上限時拒絕，保留執行緒處理一般請求（前端改為輪詢）
+        limit = server_config.get('sse_max_connections', max(1, server_config.get('threads', 8) // 2))
+        subscription = event_broker.subscribe(limit=limit)
+        if subscription is None:
+            response = jsonify({'error': '即時事件連線數已達上限'})
+            response.status_code = 503
+            response.headers['Retry-After'] = str(event_broker.RETRY_AFTER_SECONDS)
+            return response
+        heartbeat = server_config.get('sse_heartbeat_seconds', 15)
+        response = Response(
+            stream_with_context(event_broker.stream(heartbeat_seconds=heartbeat, on_idle=sync_shared_state,
+                                                    subscription=subscription)),
+            mimetype='text/event-stream'
+        )
+        response.headers['Cache-Control'] = 'no-cache'
+        response.headers['X-Accel-Buffering'] = 'no'  # 避免反向代理緩衝
+        # 串流尚未開始就中斷時產生器的 finally 不會執行，關閉回應時一併取消訂閱
+        response.call_on_close(lambda: event_broker.unsubscribe(subscription))
+        return response
+    
+    return app
 
 
-# 全局路由
-@app.route('/')
-def index():
-    """首頁：重定向到漫畫列表"""
-    return redirect('/manga')
+def warm_up(app, stats=None):
+    """
+    預先建立作品索引（正式環境在 fork worker 之前呼叫，worker 以寫入時複製共用這些記憶體）
+    
+    有啟動快照時先載入快照，之後的 refresh 只以 mtime 驗證並增量更新，不需重新掃描整個作品庫
+    
+    Args:
+        app: create_app 建立的應用
+        stats: 是否一併建立排序用統計欄位（需讀取所有作品目錄；None 時依 performance.preload_stats）
+        
+    Returns:
+        dict: {'seconds': 耗時, 'snapshot': 各服務的快照載入結果}
+    """
+    shared = app.extensions['reader']
+    if stats is None:
+        stats = shared['config'].get('performance', {}).get('preload_stats', False)
+    
+    started = time.perf_counter()
+    restored = shared['index_snapshot'].load() if shared.get('index_snapshot') else {}
+    
+    counts = []
+    for service in (shared['manga_service'], shared['gallery_service']):
+        service.index.refresh()
+        counts.append(len(service.index.get_names()))  # 建立排序後的名稱列表
+        if stats:
+            service.index.refresh_stats()
+    shared['manga_service'].chapter_index.refresh(force=True)
+    elapsed = time.perf_counter() - started
+    
+    from_snapshot = any(result.get('index') for result in restored.values())
+    logger.info("索引預熱完成（%s，%.2f 秒）：漫畫 %d 部、Gallery %d 部",
+                '快照' if from_snapshot else '掃描', elapsed, counts[0], counts[1])
+    
+    def collect_warm_up():
+        return [('reader_warm_up_seconds', 'gauge', '啟動時預熱索引的耗時（秒）',
+                 [({'source': 'snapshot' if from_snapshot else 'scan'}, elapsed)])]
+    
+    metrics.add_collector('warm_up', collect_warm_up)
+    return {'seconds': elapsed, 'snapshot': restored}
 
 
-@app.route('/api/config')
-def get_config():
-    """API：獲取前端配置"""
-    return jsonify(get_frontend_config(config))
+def register_exit_hooks(app):
+    """
+    註冊進程結束時的保存動作：寫回尚未儲存的閱讀進度，並保存啟動快照（啟用時）
+    
+    只由進入點（wsgi.py、asgi.py、serve.py、直接執行 app.py）呼叫；
+    測試等會建立多個應用的情況不註冊，避免 atexit 讓每個實例存活到進程結束
+    
+    Args:
+        app: create_app 建立的應用
+    """
+    atexit.register(app.extensions['reader']['progress_store'].flush)
+    index_snapshot = app.extensions['reader']['index_snapshot']
+    if index_snapshot is not None:
+        atexit.register(index_snapshot.save_at_exit)
 
 
 if __name__ == '__main__':
-    print("=" * 50)
-    print("🎌 本地漫畫閱讀器")
-    print("=" * 50)
-    print(f"📁 漫畫資料夾: {MANGA_ROOT}")
-    print(f"🎨 Gallery 資料夾: {Gallery_ROOT}")
-    print(f"💾 狀態文件: {Path(__file__).parent.parent / 'data' / 'status.json'}")
-    print(f"🌐 服務器地址: http://{config['server'].get('host', '127.0.0.1')}:{config['server'].get('port', 5000)}")
-    print(f"🎨 主題: {config['reader'].get('theme', 'dark')}")
-    print(f"🌍 語言: {config['ui'].get('language', 'zh-TW')}")
-    print("=" * 50)
-    print("📖 請在瀏覽器中開啟上方地址開始使用")
-    print("🔧 配置文件位置: ../config.toml")
-    print("⭐ 收藏功能已啟用")
-    print("⏹️  按 Ctrl+C 停止服務器")
-    print("=" * 50)
+    # 開發用伺服器（正式環境請使用 serve.py 或 wsgi.py）
+    app = create_app()
+    register_exit_hooks(app)
+    config = app.extensions['reader']['config']
+    manga_root = app.extensions['reader']['manga_service'].root_path
+    gallery_root = app.extensions['reader']['gallery_service'].root_path
+    
+    logger.info("=" * 50)
+    logger.info("🎌 本地漫畫閱讀器")
+    logger.info("=" * 50)
+    logger.info("📁 漫畫資料夾: %s", manga_root)
+    logger.info("🎨 Gallery 資料夾: %s", gallery_root)
+    logger.info("💾 狀態文件: %s", Path(__file__).parent.parent / 'data' / 'status.json')
+    logger.info("🌐 服務器地址: http://%s:%s", config['server'].get('host', '127.0.0.1'), config['server'].get('port', 5000))
+    logger.info("🎨 主題: %s", config['reader'].get('theme', 'dark'))
+    logger.info("🌍 語言: %s", config['ui'].get('language', 'zh-TW'))
+    logger.info("=" * 50)
+    logger.info("📖 請在瀏覽器中開啟上方地址開始使用")
+    logger.info("🔧 配置文件位置: ../config.toml")
+    logger.info("⭐ 收藏功能已啟用")
+    logger.info("⏹️  按 Ctrl+C 停止服務器")
+    logger.info("=" * 50)
     
     app.run(
         debug=config['server'].get('debug', True), 
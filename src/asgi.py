@@ -0,0 +1,20 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ASGI 進入點
+供 ASGI 伺服器使用，例如：
+
+    uvicorn asgi:app --host 127.0.0.1 --port 5000 --workers 2
+
+圖片與 SSE 由事件迴圈非同步處理，其餘路由在有上限的執行緒池中執行 Flask 應用；
+索引在 lifespan 啟動時預熱
+"""
+
+from functools import partial
+
+from app import create_app, register_exit_hooks, warm_up
+from core.asgi_app import ReaderASGI
+
+flask_app = create_app()
+register_exit_hooks(flask_app)
+app = ReaderASGI(flask_app, on_startup=partial(warm_up, flask_app))
@@ -2,9 +2,12 @@
 配置管理模組
 """
 
+import logging
 import toml
 from pathlib import Path
 
+logger = logging.getLogger(__name__)
+
 
 def load_config():
     """
@@ -28,20 +31,19 @@ def load_config():
             break
     
     if not config_path:
-        print("⚠️  未找到配置文件，使用預設配置")
+        logger.warning("未找到配置文件，使用預設配置")
         return get_default_config()
     
     try:
         with open(config_path, 'r', encoding='utf-8') as f:
             config_data = toml.load(f)
-            print(f"✅ 配置文件載入成功: {config_path}")
+            logger.info("配置文件載入成功: %s", config_path)
             return config_data
     except ImportError:
-        print("⚠️  未安裝 toml 庫，使用預設配置")
+        logger.warning("未安裝 toml 庫，使用預設配置")
         return get_default_config()
     except Exception as e:
-        print(f"❌ 載入配置文件失敗: {e}")
-        print("使用預設配置...")
+        logger.warning("載入配置文件失敗，使用預設配置: %s", e)
         return get_default_config()
 
 
@@ -68,7 +70,9 @@ def get_default_config():
             'per_page': 6,
             'search_debounce_ms': 300,
             'skip_chapters_on_list': True,
-            'default_filter': ''
+            'default_filter': '',
+            'special_tag_name': '✨ 精選',
+            'special_tag_marker': '.special'
         },
         'reader': {
             'theme': 'dark',
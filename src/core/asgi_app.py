@@ -0,0 +1,430 @@
+"""
+ASGI 介面
+讓慢速磁碟（休眠中的硬碟、網路磁碟）上的 iterdir / 讀檔不會卡住整個 worker：
+
+- 圖片以非同步方式分段串流，讀檔在有上限的執行緒池中進行，大量圖片請求由少數 worker 多工處理；
+  與 Blueprint 的 send_file 相同支援條件請求（ETag / If-Modified-Since）與單一範圍的 Range 請求
+- SSE 事件串流在事件迴圈中等待，不佔用執行緒
+- 其餘路由（manga / gallery Blueprint 的 API 與頁面）交給 Flask 應用，
+  在有上限的請求執行緒池中執行，檔案系統操作不會阻塞事件迴圈
+"""
+
+import asyncio
+import io
+import logging
+import mimetypes
+import os
+import stat
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from email.utils import formatdate, parsedate_to_datetime
+
+from .metrics import metrics
+from .response import dumps_json
+
+logger = logging.getLogger(__name__)
+
+
+def parse_byte_range(value, size):
+    """
+    解析 Range 標頭的單一位元組範圍（bytes=起點-終點 / 起點- / -結尾長度）
+
+    Args:
+        value: Range 標頭值
+        size: 檔案大小
+
+    Returns:
+        tuple: (起點, 終點（含）)；格式不符或多重範圍時返回 None（回應完整檔案）
+
+    Raises:
+        ValueError: 範圍超出檔案（應回應 416）
+    """
+    unit, _, spec = value.partition('=')
+    if unit.strip().lower() != 'bytes' or ',' in spec:
+        return None
+    start, sep, end = (part.strip() for part in spec.partition('-'))
+    if not sep or not (start or end) or (start and not start.isdigit()) or (end and not end.isdigit()):
+        return None
+
+    if not start:
+        length = int(end)
+        if length == 0 or size == 0:
+            raise ValueError(value)
+        return max(0, size - length), size - 1
+    first = int(start)
+    if end and int(end) < first:
+        return None
+    if first >= size:
+        raise ValueError(value)
+    return first, min(int(end), size - 1) if end else size - 1
+
+
+def is_not_modified(request_headers, etag, mtime):
+    """
+    條件請求是否可回應 304（If-None-Match 優先，否則比對 If-Modified-Since）
+
+    Args:
+        request_headers: {小寫標頭名稱: 值}（bytes）
+        etag: 回應的 ETag（bytes）
+        mtime: 檔案修改時間（秒）
+    """
+    if_none_match = request_headers.get(b'if-none-match')
+    if if_none_match is not None:
+        return etag in (tag.strip() for tag in if_none_match.split(b',')) or if_none_match.strip() == b'*'
+    if_modified_since = request_headers.get(b'if-modified-since')
+    if if_modified_since is None:
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since.decode('latin-1')).timestamp()
+    except (TypeError, ValueError, IndexError):
+        return False
+    # HTTP 日期精度為秒
+    return int(mtime) <= since
+
+
+class ReaderASGI:
+    """
+    包裝 create_app 建立的 Flask 應用，提供 ASGI 介面（uvicorn / hypercorn 等）
+    """
+
+    # 圖片路由前綴 -> 服務名稱（對應 Blueprint 的 /image/<path>）
+    IMAGE_ROUTES = {
+        '/manga/image/': 'manga_service',
+        '/gallery/image/': 'gallery_service'
+    }
+    # 指標使用與 Flask 路由規則相同的名稱
+    IMAGE_ROUTE_RULE = '<path:image_path>'
+    EVENTS_PATH = '/api/events'
+    MAX_EVENT_CONNECTIONS = 256
+
+    def __init__(self, flask_app, on_startup=None, request_workers=None, chunk_size=256 * 1024):
+        """
+        初始化 ASGI 介面
+
+        Args:
+            flask_app: create_app 建立的應用
+            on_startup: 啟動時在執行緒池中呼叫的函數（例如預熱索引）
+            request_workers: 執行 Flask 路由的執行緒數上限（預設為 server.threads）
+            chunk_size: 圖片串流的分段大小（位元組）
+        """
+        self.flask_app = flask_app
+        self.on_startup = on_startup
+        self.shared = flask_app.extensions['reader']
+        server_config = self.shared['config'].get('server', {})
+        self.request_workers = request_workers or server_config.get('threads', 8)
+        self.request_executor = ThreadPoolExecutor(max_workers=self.request_workers,
+                                                   thread_name_prefix='asgi-request')
+        self.chunk_size = chunk_size
+        self.heartbeat_seconds = server_config.get('sse_heartbeat_seconds', 15)
+        # SSE 連線在事件迴圈中等待、不佔用執行緒，預設上限遠高於執行緒伺服器
+        self.max_event_connections = server_config.get('sse_max_connections', self.MAX_EVENT_CONNECTIONS)
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] == 'lifespan':
+            await self.handle_lifespan(receive, send)
+            return
+        if scope['type'] != 'http':
+            return
+
+        path = scope['path']
+        if scope['method'] in ('GET', 'HEAD'):
+            for prefix, service_name in self.IMAGE_ROUTES.items():
+                if path.startswith(prefix):
+                    started = time.perf_counter()
+                    status, size = await self.serve_image(self.shared[service_name], path[len(prefix):], scope, send)
+                    metrics.observe_request(prefix + self.IMAGE_ROUTE_RULE, scope['method'], status,
+                                            time.perf_counter() - started, size)
+                    return
+            if path == self.EVENTS_PATH:
+                await self.stream_events(receive, send)
+                return
+        await self.call_flask(scope, receive, send)
+
+    # ------------------------------------------------------------------
+    # 生命週期
+    # ------------------------------------------------------------------
+
+    async def handle_lifespan(self, receive, send):
+        """啟動時執行 on_startup（預熱索引），關閉時寫回閱讀進度並結束執行緒池"""
+        loop = asyncio.get_running_loop()
+        while True:
+            message = await receive()
+            if message['type'] == 'lifespan.startup':
+                try:
+                    if self.on_startup:
+                        await loop.run_in_executor(self.request_executor, self.on_startup)
+                except Exception as e:
+                    await send({'type': 'lifespan.startup.failed', 'message': str(e)})
+                    return
+                await send({'type': 'lifespan.startup.complete'})
+            elif message['type'] == 'lifespan.shutdown':
+                await loop.run_in_executor(self.request_executor, self.shared['progress_store'].flush)
+                self.request_executor.shutdown(wait=False)
+                await send({'type': 'lifespan.shutdown.complete'})
+                return
+
+    # ------------------------------------------------------------------
+    # 圖片
+    # ------------------------------------------------------------------
+
+    @staticmethod
+    async def send_json(send, status, data, headers=()):
+        """送出小型 JSON 回應（headers 為額外的標頭）"""
+        body = dumps_json(data)
+        await send({
+            'type': 'http.response.start',
+            'status': status,
+            'headers': [(b'content-type', b'application/json'), (b'content-length', str(len(body)).encode()),
+                        *headers]
+        })
+        await send({'type': 'http.response.body', 'body': body})
+
+    async def serve_image(self, service, image_path, scope, send):
+        """
+        非同步串流圖片（stat 與讀檔在服務的執行緒池中進行）
+
+        Args:
+            service: MangaService / GalleryService 實例
+            image_path: 圖片相對路徑
+            scope: ASGI scope
+            send: ASGI send
+
+        Returns:
+            tuple: (狀態碼, 回應大小)
+        """
+        loop = asyncio.get_running_loop()
+        executor = service.get_io_executor()
+        full_path = service.resolve_path(image_path)
+
+        try:
+            if full_path is None:
+                raise FileNotFoundError(image_path)
+            file_stat = await loop.run_in_executor(executor, os.stat, full_path)
+            if not stat.S_ISREG(file_stat.st_mode):
+                raise FileNotFoundError(image_path)
+        except OSError:
+            await self.send_json(send, 404, {'error': '圖片不存在'})
+            return 404, None
+
+        size = file_stat.st_size
+        etag = f'"{file_stat.st_mtime_ns:x}-{size:x}"'.encode()
+        last_modified = formatdate(file_stat.st_mtime, usegmt=True).encode()
+        headers = [
+            (b'etag', etag),
+            (b'last-modified', last_modified),
+            (b'cache-control', service.IMAGE_CACHE_CONTROL.encode()),
+            (b'accept-ranges', b'bytes')
+        ]
+        request_headers = dict(scope.get('headers', []))
+        if is_not_modified(request_headers, etag, file_stat.st_mtime):
+            await send({'type': 'http.response.start', 'status': 304, 'headers': headers})
+            await send({'type': 'http.response.body', 'body': b''})
+            return 304, 0
+
+        # Range 請求（If-Range 與目前版本不符時回應完整檔案）
+        status, first, last = 200, 0, size - 1
+        range_header = request_headers.get(b'range')
+        if_range = request_headers.get(b'if-range')
+        if range_header is not None and if_range in (None, etag, last_modified):
+            try:
+                byte_range = parse_byte_range(range_header.decode('latin-1'), size)
+            except ValueError:
+                headers.append((b'content-range', f'bytes */{size}'.encode()))
+                await send({'type': 'http.response.start', 'status': 416, 'headers': headers})
+                await send({'type': 'http.response.body', 'body': b''})
+                return 416, 0
+            if byte_range is not None:
+                status, (first, last) = 206, byte_range
+                headers.append((b'content-range', f'bytes {first}-{last}/{size}'.encode()))
+
+        length = last - first + 1
+        content_type = mimetypes.guess_type(full_path.name)[0] or 'application/octet-stream'
+        headers += [(b'content-type', content_type.encode()), (b'content-length', str(length).encode())]
+        await send({'type': 'http.response.start', 'status': status, 'headers': headers})
+        if scope['method'] == 'HEAD' or length <= 0:
+            await send({'type': 'http.response.body', 'body': b''})
+            return status, 0
+
+        handle = await loop.run_in_executor(executor, open, full_path, 'rb')
+        try:
+            if first:
+                await loop.run_in_executor(executor, handle.seek, first)
+            remaining = length
+            while remaining > 0:
+                chunk = await loop.run_in_executor(executor, handle.read, min(self.chunk_size, remaining))
+                remaining -= len(chunk)
+                more_body = remaining > 0 and bool(chunk)
+                await send({'type': 'http.response.body', 'body': chunk, 'more_body': more_body})
+                if not more_body:
+                    break
+        finally:
+            await loop.run_in_executor(executor, handle.close)
+        return status, length
+
+    # ------------------------------------------------------------------
+    # SSE
+    # ------------------------------------------------------------------
+
+    async def stream_events(self, receive, send):
+        """
+        在事件迴圈中等待事件並送出 SSE，連線中斷時取消訂閱
+
+        事件由廣播器直接轉入事件迴圈（見 AsyncSubscription），閒置連線只在心跳時喚醒
+        """
+        loop = asyncio.get_running_loop()
+        broker = self.shared['event_broker']
+        subscription = broker.subscribe_async(loop, limit=self.max_event_connections)
+        if subscription is None:
+            await self.send_json(send, 503, {'error': '即時事件連線數已達上限'},
+                                 headers=[(b'retry-after', str(broker.RETRY_AFTER_SECONDS).encode())])
+            return
+        disconnect = asyncio.ensure_future(receive())
+        next_event = asyncio.ensure_future(subscription.get())
+        try:
+            await send({
+                'type': 'http.response.start',
+                'status': 200,
+                'headers': [
+                    (b'content-type', b'text/event-stream; charset=utf-8'),
+                    (b'cache-control', b'no-cache'),
+                    (b'x-accel-buffering', b'no')  # 避免反向代理緩衝
+                ]
+            })
+            await send({'type': 'http.response.body', 'body': b'retry: 3000\n\n', 'more_body': True})
+
+            while True:
+                done, _ = await asyncio.wait({disconnect, next_event}, timeout=self.heartbeat_seconds,
+                                             return_when=asyncio.FIRST_COMPLETED)
+                if disconnect in done:
+                    if disconnect.result()['type'] == 'http.disconnect':
+                        return
+                    # 請求內容等其他訊息：繼續等待連線中斷
+                    disconnect = asyncio.ensure_future(receive())
+                    continue
+                if next_event in done:
+                    body = broker.format_sse(next_event.result()).encode('utf-8')
+                    next_event = asyncio.ensure_future(subscription.get())
+                else:
+                    try:
+                        # 同步其他 worker 的狀態變更（變動會經由監聽器廣播）
+                        await loop.run_in_executor(self.request_executor, self.shared['sync_shared_state'])
+                    except Exception:
+                        logger.exception("SSE 同步失敗")
+                    body = b': keep-alive\n\n'
+                await send({'type': 'http.response.body', 'body': body, 'more_body': True})
+        finally:
+            disconnect.cancel()
+            next_event.cancel()
+            broker.unsubscribe(subscription)
+
+    # ------------------------------------------------------------------
+    # Flask 路由
+    # ------------------------------------------------------------------
+
+    def build_environ(self, scope, body):
+        """由 ASGI scope 建立 WSGI environ"""
+        server = scope.get('server') or ('localhost', 80)
+        client = scope.get('client') or ('', 0)
+        environ = {
+            'REQUEST_METHOD': scope['method'],
+            'SCRIPT_NAME': scope.get('root_path', '').encode('utf-8').decode('latin-1'),
+            'PATH_INFO': scope['path'].encode('utf-8').decode('latin-1'),
+            'QUERY_STRING': scope.get('query_string', b'').decode('latin-1'),
+            'SERVER_NAME': str(server[0]),
+            'SERVER_PORT': str(server[1]),
+            'SERVER_PROTOCOL': f"HTTP/{scope.get('http_version', '1.1')}",
+            'REMOTE_ADDR': client[0],
+            'wsgi.version': (1, 0),
+            'wsgi.url_scheme': scope.get('scheme', 'http'),
+            'wsgi.input': io.BytesIO(body),
+            'wsgi.errors': sys.stderr,
+            'wsgi.multithread': True,
+            'wsgi.multiprocess': True,
+            'wsgi.run_once': False
+        }
+        for name, value in scope.get('headers', []):
+            name = name.decode('latin-1').upper().replace('-', '_')
+            value = value.decode('latin-1')
+            if name in ('CONTENT_TYPE', 'CONTENT_LENGTH'):
+                environ[name] = value
+            else:
+                key = f'HTTP_{name}'
+                environ[key] = f"{environ[key]},{value}" if key in environ else value
+        return environ
+
+    async def call_flask(self, scope, receive, send):
+        """
+        在請求執行緒池中執行 Flask 應用
+
+        同一個請求從呼叫到讀完回應都在同一個執行緒（stream_with_context 需要），
+        回應內容經有界佇列交回事件迴圈送出；用戶端中斷時通知執行緒停止並關閉回應
+        """
+        body = b''
+        while True:
+            message = await receive()
+            if message['type'] == 'http.disconnect':
+                return
+            body += message.get('body', b'')
+            if not message.get('more_body'):
+                break
+
+        loop = asyncio.get_running_loop()
+        environ = self.build_environ(scope, body)
+        chunks = asyncio.Queue(maxsize=8)
+        stopped = False
+        done = object()
+
+        def put(item):
+            asyncio.run_coroutine_threadsafe(chunks.put(item), loop).result()
+
+        def run():
+            started = {}
+
+            def start_response(status, headers, exc_info=None):
+                started['status'] = int(status.split(' ', 1)[0])
+                started['headers'] = [(k.lower().encode('latin-1'), v.encode('latin-1')) for k, v in headers]
+                return lambda data: None  # 不支援舊式 write()
+
+            result = None
+            try:
+                result = self.flask_app(environ, start_response)
+                header_sent = False
+                for chunk in result:
+                    if not header_sent:
+                        put(('start', started))
+                        header_sent = True
+                    if chunk:
+                        put(('body', chunk))
+                    if stopped:
+                        break
+                if not header_sent:
+                    put(('start', started))
+            except Exception as e:
+                put(('error', e))
+            finally:
+                if result is not None and hasattr(result, 'close'):
+                    result.close()
+                put(('end', done))
+
+        future = loop.run_in_executor(self.request_executor, run)
+        try:
+            while True:
+                kind, value = await chunks.get()
+                if kind == 'start':
+                    await send({'type': 'http.response.start', 'status': value['status'], 'headers': value['headers']})
+                elif kind == 'body':
+                    await send({'type': 'http.response.body', 'body': value, 'more_body': True})
+                elif kind == 'error':
+                    raise value
+                else:
+                    await send({'type': 'http.response.body', 'body': b''})
+                    break
+        finally:
+            # 送出失敗（用戶端中斷）時讓執行緒停止，並持續取出佇列直到執行緒結束
+            stopped = True
+            while not future.done():
+                try:
+                    await asyncio.wait_for(chunks.get(), timeout=0.1)
+                except asyncio.TimeoutError:
+                    pass
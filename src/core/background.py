@@ -0,0 +1,77 @@
+"""
+背景工作
+索引的全庫重新驗證（逐一 stat 作品目錄）在背景執行緒進行，請求只讀取目前的索引，不等待掃描
+"""
+
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# 背景工作執行緒的名稱前綴（測試計算請求的檔案系統呼叫時排除這些執行緒）
+THREAD_NAME_PREFIX = 'index-refresh'
+
+
+class BackgroundTasks:
+    """
+    以名稱去重的背景工作
+
+    - 同名工作執行中時不重複啟動（TTL 到期時多個請求同時觸發只執行一次）
+    - 工作在 daemon 執行緒中執行，例外只記錄不拋出
+    """
+
+    def __init__(self):
+        """初始化"""
+        self._lock = threading.Lock()
+        self._threads = {}
+
+    def start(self, name, fn, *args, **kwargs):
+        """
+        在背景執行工作（同名工作執行中時略過）
+
+        Args:
+            name: 工作名稱
+            fn: 工作函數
+            *args, **kwargs: 傳給工作函數的參數
+
+        Returns:
+            bool: 是否啟動了新的工作
+        """
+        with self._lock:
+            thread = self._threads.get(name)
+            if thread is not None and thread.is_alive():
+                return False
+            thread = threading.Thread(target=self._run, args=(name, fn, args, kwargs),
+                                      name=f"{THREAD_NAME_PREFIX}-{name}", daemon=True)
+            self._threads[name] = thread
+            thread.start()
+        return True
+
+    @staticmethod
+    def _run(name, fn, args, kwargs):
+        try:
+            fn(*args, **kwargs)
+        except Exception:
+            logger.exception("背景工作 %s 失敗", name)
+
+    def is_running(self, name):
+        """同名工作是否執行中"""
+        with self._lock:
+            thread = self._threads.get(name)
+            return thread is not None and thread.is_alive()
+
+    def wait(self, timeout=None):
+        """
+        等待目前所有工作完成（測試與關閉時使用）
+
+        Args:
+            timeout: 每個工作的最長等待秒數
+
+        Returns:
+            bool: 是否全部完成
+        """
+        with self._lock:
+            threads = list(self._threads.values())
+        for thread in threads:
+            thread.join(timeout)
+        return not any(thread.is_alive() for thread in threads)
@@ -3,15 +3,32 @@
 提供通用的圖片和章節管理功能
 """
 
+import logging
 import os
 import re
+import threading
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
-from .utils import parsePath, formatPathForUrl
+from .utils import parsePath, formatPathForUrl, encodeCursor
+from .library_index import LibraryIndex
+from .metrics import metrics
+from .single_flight import SingleFlight
+
+logger = logging.getLogger(__name__)
 
 
 class BaseReader:
     """基礎閱讀器類別"""
     
+    # 狀態類別（子類別覆寫，例如 manga/gallery）
+    CATEGORY = None
+    
+    # 圖片回應的 Cache-Control（Blueprint 與 ASGI 圖片路由共用；預設每次以 ETag 驗證）
+    IMAGE_CACHE_CONTROL = 'no-cache'
+    
+    # 名稱搜尋方式：substring 為子字串（預設），prefix 只返回前綴相符的作品
+    SEARCH_MATCH_MODES = ('substring', 'prefix')
+    
     def __init__(self, root_path, image_extensions, config=None):
         """
         初始化閱讀器
@@ -25,6 +42,28 @@ class BaseReader:
         self.image_extensions = image_extensions
         self.config = config or {}  # 儲存配置
         self.cache = {}  # 簡單的內存緩存
+        self.flight = SingleFlight()  # 合併同一快取鍵的並行計算
+        performance_config = self.config.get('performance', {})
+        self.io_workers = max(1, int(performance_config.get('io_workers', 4)))
+        self._io_executor = None  # 檔案系統工作的共用執行緒池（首次使用時建立）
+        self._io_executor_lock = threading.Lock()
+        self.index = LibraryIndex(  # 作品目錄索引
+            self.root_path,
+            sort_key=self.natural_sort_key,
+            category=self.CATEGORY,
+            metadata_extractor=self.get_metadata_extractor(),
+            metadata_ttl=performance_config.get('metadata_refresh_seconds', 30),
+            stats_extractor=self.compute_work_stats
+        )
+    
+    def get_metadata_extractor(self):
+        """
+        獲取作品中繼資料擷取函數（子類別覆寫）
+        
+        Returns:
+            callable: 接收作品目錄路徑、返回欄位字典的函數；None 表示不建立中繼資料索引
+        """
+        return None
     
     def natural_sort_key(self, text):
         """
@@ -38,48 +77,611 @@ class BaseReader:
         """
         return [int(s) if s.isdigit() else s.lower() for s in re.split(r'(\d+)', text)]
     
-    def get_images_in_dir(self, dir_path):
+    def compute_work_stats(self, work_path):
+        """
+        計算作品的統計欄位（供索引排序使用，只在作品新增或作品目錄變動時計算）
+        
+        Args:
+            work_path: 作品目錄路徑
+            
+        Returns:
+            dict: {'mtime', 'ctime', 'bytes', 'images', 'chapters'}，
+                  chapters 為直接包含圖片的目錄數（作品目錄本身或章節子目錄）
+        """
+        stat = os.stat(work_path)
+        metrics.record_fs('stat')
+        # Windows 的 st_ctime 即建立時間；其他平台優先使用 st_birthtime
+        stats = {
+            'mtime': stat.st_mtime,
+            'ctime': getattr(stat, 'st_birthtime', stat.st_ctime),
+            'bytes': 0,
+            'images': 0,
+            'chapters': 0
+        }
+        
+        def scan(dir_path, recurse):
+            """統計目錄內的圖片，recurse 為 True 時繼續統計第一層子目錄"""
+            images = 0
+            metrics.record_fs('scandir')
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_file():
+                            if os.path.splitext(entry.name)[1].lower() in self.image_extensions:
+                                images += 1
+                                stats['bytes'] += entry.stat().st_size
+                        elif recurse and entry.is_dir():
+                            scan(entry.path, False)
+                    except OSError:
+                        continue
+            if images:
+                stats['images'] += images
+                stats['chapters'] += 1
+        
+        scan(work_path, True)
+        return stats
+    
+    def get_work_dirs(self, status_filter=None, status_manager=None, search_keyword=None, metadata_filters=None,
+                      search_match='substring'):
+        """
+        獲取作品目錄列表
+        狀態篩選、中繼資料篩選與名稱搜尋直接由索引決定，不需掃描整個根目錄
+        
+        Args:
+            status_filter: 狀態篩選 (favorite/unreviewed/reviewed)
+            status_manager: 狀態管理器實例
+            search_keyword: 搜尋關鍵字（名稱子字串，不分大小寫）
+            metadata_filters: 中繼資料篩選 {欄位: 值}（例如 {'artist': 'xxx', 'featured': True}）
+            search_match: 搜尋方式（SEARCH_MATCH_MODES 之一）
+            
+        Returns:
+            list: 作品目錄 Path 列表（有搜尋時依相關度排序，否則自然排序）
         """
-        獲取目錄中的所有圖片檔案 - 高性能版本（帶快取）
+        use_status = bool(status_filter and status_manager)
+        if use_status:
+            self.index.attach_status_manager(status_manager, self.CATEGORY)
+        
+        status = status_filter if use_status else None
+        if search_keyword and search_keyword.strip():
+            names = self.index.search(search_keyword, status=status, metadata=metadata_filters,
+                                      prefix=search_match == 'prefix')
+        else:
+            names = self.index.get_names_filtered(status=status, metadata=metadata_filters)
+        
+        return [self.root_path / name for name in names]
+    
+    def get_work_page(self, page=1, per_page=6, cursor=None, status_filter=None, status_manager=None,
+                      search_keyword=None, metadata_filters=None, sort=None, descending=True,
+                      search_match='substring'):
+        """
+        分頁獲取作品目錄（支援游標分頁）
+        
+        自然排序時游標記錄上一頁最後一個名稱，以排序鍵二分定位，每頁成本 O(per_page)；
+        搜尋結果依相關度排序，游標記錄結果位移
+        
+        Args:
+            page: 頁碼（從1開始，未提供游標時使用）
+            per_page: 每頁數量
+            cursor: 已解碼的游標字典（None 表示使用頁碼）
+            status_filter: 狀態篩選 (favorite/unreviewed/reviewed)
+            status_manager: 狀態管理器實例
+            search_keyword: 搜尋關鍵字
+            metadata_filters: 中繼資料篩選 {欄位: 值}
+            sort: 排序欄位（LibraryIndex.SORT_COLUMNS 之一），None 或 'name' 表示自然排序
+            descending: 欄位排序是否遞減（預設最新 / 最大在前）
+            search_match: 搜尋方式（SEARCH_MATCH_MODES 之一）
+            
+        Returns:
+            tuple: (作品目錄 Path 列表, 符合總數, 下一頁游標或 None)
+        """
+        if sort == 'name':
+            sort = None
+        if sort and sort not in self.index.SORT_COLUMNS:
+            raise ValueError(f"不支援的排序欄位: {sort}")
+        if search_match not in self.SEARCH_MATCH_MODES:
+            raise ValueError(f"不支援的搜尋方式: {search_match}")
+        
+        use_status = bool(status_filter and status_manager)
+        if use_status:
+            self.index.attach_status_manager(status_manager, self.CATEGORY)
+        status = status_filter if use_status else None
+        
+        if search_keyword and search_keyword.strip():
+            names = self.index.search(search_keyword, status=status, metadata=metadata_filters,
+                                      prefix=search_match == 'prefix')
+            if sort:
+                names = self.index.sort_by_column(names, sort, descending)
+            start = cursor.get('offset', 0) if cursor else max(0, page - 1) * per_page
+            end = start + per_page
+            next_cursor = encodeCursor({'offset': end}) if end < len(names) else None
+            return [self.root_path / name for name in names[start:end]], len(names), next_cursor
+        
+        names, total, next_position = self.index.get_page(
+            after=cursor.get('after') if cursor else None,
+            offset=max(0, page - 1) * per_page,
+            limit=per_page,
+            status=status,
+            metadata=metadata_filters,
+            sort=sort,
+            descending=descending,
+            after_value=cursor.get('value') if cursor else None
+        )
+        next_cursor = encodeCursor(next_position) if next_position else None
+        return [self.root_path / name for name in names], total, next_cursor
+    
+    def is_sort_pending(self, sort):
+        """
+        欄位排序是否因統計欄位尚在背景建立而暫以自然排序回應（前端稍後重新載入）
+
+        Args:
+            sort: 請求的排序欄位
+
+        Returns:
+            bool: 是否暫以自然排序回應
+        """
+        return bool(sort) and sort != 'name' and not self.index.stats_ready()
+    
+    def iter_export(self, include_chapters=False, include_images=False, status_manager=None):
+        """
+        逐筆產生整個作品庫的匯出記錄（供 NDJSON 串流）
+        
+        作品清單取自索引；章節與圖片以 scandir 逐一讀取，不寫入快取，
+        記憶體用量只與單一作品的章節數有關
+        
+        Args:
+            include_chapters: 是否輸出章節記錄
+            include_images: 是否在章節記錄附上圖片檔名陣列（需 include_chapters）
+            status_manager: 狀態管理器實例（提供時作品記錄附上狀態）
+            
+        Yields:
+            dict: {'type': 'work', ...} 或 {'type': 'chapter', ...} 記錄
+        """
+        statuses = status_manager.get_all_statuses(self.CATEGORY) if status_manager else None
+        
+        for name in self.index.get_names():
+            work = {'type': 'work', 'name': name, 'path': name}
+            metadata = self.index.get_metadata(name)
+            if metadata:
+                work.update(metadata)
+            if statuses is not None:
+                work['status'] = statuses.get(name, status_manager.STATUS_UNREVIEWED)
+            yield work
+            
+            if include_chapters:
+                yield from self._iter_export_chapters(name, include_images)
+    
+    def _iter_export_chapters(self, work_name, include_images):
+        """產生單一作品的章節記錄（作品目錄本身或第一層子目錄中直接包含圖片者）"""
+        work_path = self.root_path / work_name
+        
+        def read_dir(dir_path):
+            """返回 (圖片檔名列表, 子目錄名稱列表)"""
+            files, subdirs = [], []
+            try:
+                metrics.record_fs('scandir')
+                with os.scandir(dir_path) as entries:
+                    for entry in entries:
+                        try:
+                            if entry.is_dir():
+                                subdirs.append(entry.name)
+                            elif os.path.splitext(entry.name)[1].lower() in self.image_extensions:
+                                files.append(entry.name)
+                        except OSError:
+                            continue
+            except OSError as e:
+                logger.warning("匯出時讀取目錄失敗 %s: %s", dir_path, e)
+            return files, subdirs
+        
+        def chapter_record(name, path, files):
+            record = {'type': 'chapter', 'work': work_name, 'name': name, 'path': path, 'image_count': len(files)}
+            if include_images:
+                record['files'] = sorted(files, key=self.natural_sort_key)
+            return record
+        
+        files, subdirs = read_dir(work_path)
+        if files:
+            yield chapter_record(work_name, work_name, files)
+        for subdir in sorted(subdirs, key=self.natural_sort_key):
+            chapter_files, _ = read_dir(work_path / subdir)
+            if chapter_files:
+                yield chapter_record(subdir, f"{work_name}/{subdir}", chapter_files)
+    
+    def get_status_counts(self, status_manager=None):
+        """
+        獲取篩選分頁所需的各狀態作品數量
+        
+        Args:
+            status_manager: 狀態管理器實例
+            
+        Returns:
+            dict: {'all': 總數, 'favorite': 數量, 'reviewed': 數量, 'unreviewed': 數量}
+        """
+        if status_manager:
+            self.index.attach_status_manager(status_manager, self.CATEGORY)
+        return self.index.get_status_counts()
+
+    def get_cached(self, cache_key, compute, limit=100):
+        """
+        讀取快取；未命中時計算並寫入快取
+        同一鍵的並行未命中只計算一次（single-flight），其餘請求等待並共用結果
+
+        Args:
+            cache_key: 快取鍵
+            compute: 無參數的計算函數（返回 None 表示不快取）
+            limit: 快取項目數上限（超過時只計算不寫入）
+
+        Returns:
+            快取或計算的結果
+        """
+        cache_name = cache_key.split('_', 1)[0]
+        value = self.cache.get(cache_key)
+        metrics.record_cache(cache_name, value is not None)
+        if value is not None:
+            return value
+
+        def load():
+            # 等待期間其他請求可能已寫入快取
+            value = self.cache.get(cache_key)
+            if value is None:
+                value = compute()
+                if value is not None and len(self.cache) < limit:
+                    self.cache[cache_key] = value
+            return value
+
+        return self.flight.do(cache_key, load)
+
+    # 批次詳情 API 單次最多查詢的作品數
+    DETAIL_BATCH_LIMIT = 50
+
+    def get_io_executor(self):
+        """
+        獲取檔案系統工作的共用執行緒池（數量上限為 performance.io_workers）
+
+        Returns:
+            ThreadPoolExecutor: 執行緒池
+        """
+        with self._io_executor_lock:
+            if self._io_executor is None:
+                self._io_executor = ThreadPoolExecutor(
+                    max_workers=self.io_workers,
+                    thread_name_prefix=f"{self.CATEGORY or 'reader'}-io"
+                )
+            return self._io_executor
+
+    def resolve_path(self, relative_path):
+        """
+        將 API 傳入的相對路徑轉為作品庫內的完整路徑
+
+        拒絕絕對路徑與含有 '..' 的路徑，組合後的路徑一定位於 root_path 之下
+        （只檢查路徑字串，不解析符號連結，不需存取檔案系統）
+
+        Args:
+            relative_path: 相對路徑（URL 編碼或任一種分隔符）
+
+        Returns:
+            Path: 完整路徑；路徑會離開作品庫時返回 None
+        """
+        relative = parsePath(relative_path)
+        if relative.anchor or '..' in relative.parts:
+            return None
+        return self.root_path / relative
+
+    def get_work_detail(self, work_path, **options):
+        """
+        獲取單部作品詳情（章節列表）
+
+        Args:
+            work_path: 作品路徑（相對路徑）
+            **options: 傳給 get_chapters 的選項（例如 favorite_only、status_manager）
+
+        Returns:
+            dict: {'name', 'path', 'chapters'}，作品不存在時返回 None
+        """
+        full_path = self.resolve_path(work_path)
+        if full_path is None or not full_path.is_dir():
+            return None
+        return {
+            'name': full_path.name,
+            'path': work_path,
+            'chapters': self.get_chapters(full_path, **options)
+        }
+
+    def get_work_details(self, work_paths, **options):
+        """
+        批次獲取多部作品詳情（在執行緒池中並行讀取各作品目錄）
+
+        Args:
+            work_paths: 作品路徑列表（重複的路徑只計算一次）
+            **options: 傳給 get_chapters 的選項
+
+        Returns:
+            dict: {作品路徑: 詳情或 None}（依輸入順序）
+        """
+        def load(work_path):
+            try:
+                return self.get_work_detail(work_path, **options)
+            except Exception:
+                logger.exception("讀取作品詳情 %s 時出錯", work_path)
+                return None
+
+        unique_paths = list(dict.fromkeys(work_paths))
+        if len(unique_paths) <= 1:
+            return {work_path: load(work_path) for work_path in unique_paths}
+        return dict(zip(unique_paths, self.get_io_executor().map(load, unique_paths)))
+
+    # 列表 API 可選的欄位（子類別擴充）
+    LIST_FIELDS = ('name', 'path', 'chapters', 'chapter_count', 'cover_image', 'status')
+
+    def parse_list_fields(self, value):
+        """
+        解析列表 API 的 fields 參數（逗號分隔）
+
+        Args:
+            value: fields 參數值（None 或空字串表示全部欄位）
+
+        Returns:
+            frozenset: 欄位集合，None 表示全部欄位
+
+        Raises:
+            ValueError: 包含不支援的欄位時
+        """
+        if not value:
+            return None
+        fields = frozenset(f.strip() for f in value.split(',') if f.strip())
+        unknown = fields - set(self.LIST_FIELDS)
+        if unknown:
+            raise ValueError(f"不支援的欄位: {', '.join(sorted(unknown))}")
+        return fields or None
+
+    @staticmethod
+    def wants_field(fields, name):
+        """是否需要計算指定欄位（fields 為 None 表示全部）"""
+        return fields is None or name in fields
+
+    @staticmethod
+    def fields_cache_key(fields, chapter_limit):
+        """欄位選擇與章節預覽上限對應的快取鍵片段"""
+        selected = ','.join(sorted(fields)) if fields is not None else '*'
+        return f"{selected}_{chapter_limit}"
+
+    def get_chapter_dirs(self, work_path):
+        """
+        獲取作品的章節目錄（自然排序，不讀取章節內容）
+
+        Args:
+            work_path: 作品目錄路徑
+
+        Returns:
+            list: 章節目錄 Path 列表
+        """
+        work_path = Path(work_path)
+        metrics.record_fs('scandir')
+        # os.scandir 的目錄項目帶有檔案類型，不需要逐一 stat
+        with os.scandir(work_path) as entries:
+            names = [entry.name for entry in entries if entry.is_dir()]
+        return [work_path / name for name in sorted(names, key=self.natural_sort_key)]
+
+    # 章節清單格式版本（前端依此判斷如何展開）
+    MANIFEST_VERSION = 1
+    # 章節清單快取的鍵前綴與項目數上限（章節清單會保存到啟動快照，依目錄 mtime 驗證）
+    MANIFEST_CACHE_PREFIX = 'manifest_'
+    MANIFEST_CACHE_LIMIT = 200
+    # 逐圖欄位的快取鍵前綴（鍵為 前綴 + 欄位 + '_' + 目錄，與清單分開快取）
+    MANIFEST_COLUMNS_CACHE_PREFIX = 'columns_'
+    
+    # 可選的逐圖欄位
+    MANIFEST_COLUMNS = ('bytes',)
+    
+    def get_chapter_manifest(self, dir_path, columns=()):
+        """
+        獲取目錄的章節清單（帶快取）
+        
+        清單只記錄一次基底路徑加上檔名陣列，不重複儲存每張圖片的完整路徑；
+        完整路徑為 `base/檔名`（base 為空字串時即為檔名）
         
         Args:
             dir_path: 目錄路徑
+            columns: 需要的逐圖欄位（MANIFEST_COLUMNS 之一，例如 'bytes'）
             
         Returns:
-            list: 圖片相對路徑列表
+            dict: {'version', 'base', 'files', 'columns'（有要求時）}，目錄不存在時返回 None；
+                  結果可能與其他請求共用，呼叫端不應修改
         """
         dir_path = Path(dir_path)
         
-        if not dir_path.exists():
-            return []
+        # 快取結果（最多 MANIFEST_CACHE_LIMIT 個目錄）；多個請求同時開啟同一章節時只讀取一次目錄
+        cache_key = f"{self.MANIFEST_CACHE_PREFIX}{dir_path}"
+        manifest = self.get_cached(cache_key, lambda: self._load_manifest(dir_path), limit=self.MANIFEST_CACHE_LIMIT)
+        if manifest is None:
+            return None
         
-        # 檢查快取
-        cache_key = f"images_{dir_path}"
-        if cache_key in self.cache:
-            return self.cache[cache_key]
+        requested = [c for c in dict.fromkeys(columns) if c in self.MANIFEST_COLUMNS]
+        if not requested:
+            return manifest
         
+        # 逐圖欄位需要 stat 每個檔案，只在有要求時計算並以獨立的鍵快取；
+        # 快取的清單不修改，回傳只合併要求欄位的副本
+        result = dict(manifest)
+        result['columns'] = {
+            column: self.get_cached(
+                f"{self.MANIFEST_COLUMNS_CACHE_PREFIX}{column}_{dir_path}",
+                lambda column=column: self._load_manifest_column(dir_path, manifest['files'], column),
+                limit=self.MANIFEST_CACHE_LIMIT
+            )
+            for column in requested
+        }
+        return result
+    
+    def _load_manifest(self, dir_path):
+        """
+        讀取目錄建立章節清單
+        
+        Returns:
+            dict: 章節清單，目錄不存在或讀取失敗時返回 None
+        """
         try:
+            metrics.record_fs('listdir')
             # 使用 os.listdir 比 Path.iterdir() 快很多
-            all_files = os.listdir(dir_path)
-            
-            # 篩選圖片文件
-            images = [
-                formatPathForUrl((dir_path / f).relative_to(self.root_path))
-                for f in all_files
-                if Path(f).suffix.lower() in self.image_extensions
+            files = [
+                f for f in os.listdir(dir_path)
+                if os.path.splitext(f)[1].lower() in self.image_extensions
             ]
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning("讀取圖片列表錯誤 %s: %s", dir_path, e)
+            return None
+        
+        files.sort(key=self.natural_sort_key)
+        base = formatPathForUrl(dir_path.relative_to(self.root_path))
+        return {
+            'version': self.MANIFEST_VERSION,
+            'base': '' if base == '.' else base,
+            'files': files
+        }
+    
+    def _load_manifest_column(self, dir_path, files, column):
+        """
+        計算章節清單的逐圖欄位
+        
+        Returns:
+            list: 與 files 順序相同的欄位值（無法讀取的檔案為 None）
+        """
+        if column == 'bytes':
+            sizes = []
+            for f in files:
+                try:
+                    sizes.append(os.stat(dir_path / f).st_size)
+                except OSError:
+                    sizes.append(None)
+            metrics.record_fs('stat', len(sizes))
+            return sizes
+        raise ValueError(f"不支援的逐圖欄位: {column}")
+    
+    def export_snapshot(self):
+        """
+        匯出作品索引與章節清單快取（供啟動快照保存）
+        
+        Returns:
+            dict: {'index': 作品索引狀態, 'manifests': {目錄: (目錄 mtime, 章節清單)}}
+        """
+        manifests = {}
+        for key, manifest in list(self.cache.items()):
+            if not key.startswith(self.MANIFEST_CACHE_PREFIX):
+                continue
+            dir_path = key[len(self.MANIFEST_CACHE_PREFIX):]
+            try:
+                manifests[dir_path] = (os.stat(dir_path).st_mtime_ns, manifest)
+            except OSError:
+                continue
+        return {'index': self.index.export_state(), 'manifests': manifests}
+    
+    def restore_snapshot(self, state):
+        """
+        載入啟動快照：作品索引取代首次掃描，章節清單只保留目錄 mtime 未變動的項目
+        
+        Args:
+            state: export_snapshot 返回的字典
+        
+        Returns:
+            dict: {'index': 是否套用作品索引, 'manifests': 載入的章節清單數}
+        """
+        restored = self.index.restore_state(state.get('index'))
+        manifests = 0
+        for dir_path, (mtime, manifest) in state.get('manifests', {}).items():
+            if len(self.cache) >= self.MANIFEST_CACHE_LIMIT:
+                break
+            if manifest.get('version') != self.MANIFEST_VERSION:
+                continue
+            try:
+                if os.stat(dir_path).st_mtime_ns != mtime:
+                    continue
+            except OSError:
+                continue
+            self.cache.setdefault(self.MANIFEST_CACHE_PREFIX + dir_path, manifest)
+            manifests += 1
+        return {'index': restored, 'manifests': manifests}
+    
+    def has_chapter(self, chapter_path):
+        """
+        章節目錄是否存在（記錄進度等 API 拒絕不存在的章節）
+
+        Args:
+            chapter_path: 章節路徑（相對路徑）
+
+        Returns:
+            bool: 是否存在
+        """
+        full_path = self.resolve_path(chapter_path)
+        return full_path is not None and full_path.is_dir()
+
+    def get_chapter_manifest_by_path(self, chapter_path, columns=()):
+        """
+        依章節相對路徑獲取章節清單
+        
+        Args:
+            chapter_path: 章節路徑（相對路徑）
+            columns: 需要的逐圖欄位
             
-            # 簡單排序
-            images = sorted(images, key=self.natural_sort_key)
-            
-            # 快取結果（最多 200 個目錄）
-            if len(self.cache) < 200:
-                self.cache[cache_key] = images
+        Returns:
+            dict: 章節清單，目錄不存在時返回沒有檔案的清單
+        """
+        full_path = self.resolve_path(chapter_path)
+        if full_path is None:
+            return {'version': self.MANIFEST_VERSION, 'base': '', 'files': []}
+        if not full_path.is_dir():
+            return {'version': self.MANIFEST_VERSION, 'base': formatPathForUrl(parsePath(chapter_path)), 'files': []}
+        return self._get_existing_chapter_manifest(full_path, chapter_path, columns)
+    
+    def _get_existing_chapter_manifest(self, full_path, chapter_path, columns=()):
+        """已確認存在的章節目錄的清單（讀取失敗時返回沒有檔案的清單，不重複檢查目錄）"""
+        manifest = self.get_chapter_manifest(full_path, columns)
+        if manifest is None:
+            return {'version': self.MANIFEST_VERSION, 'base': formatPathForUrl(parsePath(chapter_path)), 'files': []}
+        return manifest
+    
+    @staticmethod
+    def expand_manifest(manifest):
+        """
+        將章節清單展開為完整相對路徑列表
+        
+        Args:
+            manifest: get_chapter_manifest 返回的清單
             
-            return images
-        except Exception as e:
-            print(f"讀取圖片列表錯誤: {e}")
+        Returns:
+            list: 圖片相對路徑列表
+        """
+        if not manifest:
             return []
+        base = manifest['base']
+        if not base:
+            return list(manifest['files'])
+        return [f"{base}/{f}" for f in manifest['files']]
+    
+    def get_images_in_dir(self, dir_path):
+        """
+        獲取目錄中的所有圖片檔案（由快取的章節清單展開）
+        
+        Args:
+            dir_path: 目錄路徑
+            
+        Returns:
+            list: 圖片相對路徑列表
+        """
+        return self.expand_manifest(self.get_chapter_manifest(dir_path))
+    
+    def count_images_in_dir(self, dir_path):
+        """
+        獲取目錄中的圖片數量（不展開完整路徑）
+        
+        Args:
+            dir_path: 目錄路徑
+            
+        Returns:
+            int: 圖片數量
+        """
+        manifest = self.get_chapter_manifest(dir_path)
+        return len(manifest['files']) if manifest else 0
     
     def get_images_in_dir_paginated(self, dir_path, offset=0, limit=50):
         """
@@ -104,6 +706,7 @@ class BaseReader:
             needed_count = offset + limit
             
             # 使用 os.scandir（比 listdir 更快）
+            metrics.record_fs('scandir')
             with os.scandir(dir_path) as entries:
                 for entry in entries:
                     if entry.is_file():
@@ -129,7 +732,7 @@ class BaseReader:
             # 返回 -1 表示總數未知（首次載入時不統計，提升速度）
             return images, -1
         except Exception as e:
-            print(f"讀取圖片列表錯誤: {e}")
+            logger.warning("讀取圖片列表錯誤 %s: %s", dir_path, e)
             return [], 0
     
     def get_cover_image(self, manga_path):
@@ -147,22 +750,31 @@ class BaseReader:
         # 優先搜尋的圖片格式（按優先級排序）
         priority_formats = ['.jpg', '.jpeg', '.png', '.webp', '.gif', '.bmp', '.tiff']
         
+        def scan(dir_path):
+            """讀取目錄一次，返回 (優先級最高的圖片路徑, 子目錄名稱列表)"""
+            best, best_rank, subdirs = None, len(priority_formats), []
+            metrics.record_fs('scandir')
+            with os.scandir(dir_path) as entries:
+                for entry in entries:
+                    if entry.is_dir():
+                        subdirs.append(entry.name)
+                        continue
+                    ext = os.path.splitext(entry.name)[1].lower()
+                    # 同一格式取目錄順序中的第一張
+                    if ext in priority_formats and priority_formats.index(ext) < best_rank and entry.is_file():
+                        best, best_rank = dir_path / entry.name, priority_formats.index(ext)
+            return best, subdirs
+        
         # 先檢查根目錄下是否有圖片
-        for format_ext in priority_formats:
-            for file_path in manga_path.iterdir():
-                if file_path.is_file() and file_path.suffix.lower() == format_ext:
-                    return formatPathForUrl(file_path.relative_to(self.root_path))
-        
-        # 如果根目錄沒有圖片，檢查第一個章節目錄
-        subdirs = [d for d in manga_path.iterdir() if d.is_dir()]
-        if subdirs:
-            # 按自然排序找第一個章節
-            first_chapter = sorted(subdirs, key=lambda x: self.natural_sort_key(x.name))[0]
-            for format_ext in priority_formats:
-                for file_path in first_chapter.iterdir():
-                    if file_path.is_file() and file_path.suffix.lower() == format_ext:
-                        return formatPathForUrl(file_path.relative_to(self.root_path))
+        cover, subdirs = scan(manga_path)
+        
+        # 如果根目錄沒有圖片，檢查第一個章節目錄（自然排序）
+        if cover is None and subdirs:
+            first_chapter = manga_path / min(subdirs, key=self.natural_sort_key)
+            cover, _ = scan(first_chapter)
         
+        if cover is not None:
+            return formatPathForUrl(cover.relative_to(self.root_path))
         return None  # 沒有找到封面圖片
     
     def _count_images_fast(self, manga_path):
@@ -176,10 +788,12 @@ class BaseReader:
             int: 圖片數量
         """
         try:
-            count = sum(
-                1 for f in manga_path.iterdir() 
-                if f.is_file() and f.suffix.lower() in self.image_extensions
-            )
+            metrics.record_fs('scandir')
+            with os.scandir(manga_path) as entries:
+                count = sum(
+                    1 for entry in entries
+                    if os.path.splitext(entry.name)[1].lower() in self.image_extensions and entry.is_file()
+                )
             return count
         except:
             return 0
@@ -0,0 +1,224 @@
+"""
+全域章節索引
+維護根目錄下所有作品的章節名稱與路徑，支援跨作品的章節名稱搜尋
+"""
+
+import os
+import threading
+import time
+
+from .background import BackgroundTasks
+from .metrics import metrics
+from .search_index import NgramIndex
+
+
+class ChapterIndex:
+    """
+    跨作品的章節名稱索引
+
+    - 作品清單來自 LibraryIndex（根目錄 mtime 未變時不重新掃描），世代編號未變時不複製名稱清單
+    - 每部作品記錄章節目錄與作品目錄 mtime；新增 / 刪除章節會更新作品目錄 mtime，
+      因此定期在背景比對 mtime，只重新掃描有變動的作品（搜尋不等待）
+    - 章節名稱放入 trigram 搜尋索引（鍵為「作品/章節」），搜尋不需逐一開啟作品
+    """
+
+    def __init__(self, library_index, sort_key=None, refresh_ttl=30.0):
+        """
+        初始化章節索引
+
+        Args:
+            library_index: LibraryIndex 實例（提供作品清單與根目錄）
+            sort_key: 名稱排序鍵函數（同分時排序用）
+            refresh_ttl: 重新驗證作品目錄 mtime 的最短間隔秒數
+        """
+        self.library = library_index
+        self.root_path = library_index.root_path
+        self.sort_key = sort_key or (lambda name: name.lower())
+        self.refresh_ttl = refresh_ttl
+        self._lock = threading.RLock()
+        self._works = {}     # 作品名稱 -> {'mtime': 作品目錄 mtime, 'chapters': 章節名稱集合}
+        self._search_index = NgramIndex()
+        self._checked_at = None          # 上次比對所有作品 mtime 的時間，None 表示需要比對（例如載入快照後）
+        self._library_generation = None  # 已同步的 LibraryIndex 世代編號
+        self._tasks = BackgroundTasks()
+
+    @staticmethod
+    def make_key(work, chapter):
+        """章節鍵（作品/章節，與 API 使用的相對路徑一致）"""
+        return f"{work}/{chapter}"
+
+    def _scan_work(self, work):
+        """
+        掃描單一作品的章節目錄
+
+        Returns:
+            tuple: (作品目錄 mtime, 章節名稱集合)，作品不存在時返回 (None, 空集合)
+        """
+        path = os.path.join(self.root_path, work)
+        chapters = set()
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            metrics.record_fs('scandir')
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir():
+                            chapters.add(entry.name)
+                    except OSError:
+                        continue
+        except OSError:
+            return None, chapters
+        return mtime, chapters
+
+    def _apply_work(self, work, mtime, chapters):
+        """套用單一作品的掃描結果，增量更新搜尋索引（呼叫端需持有鎖）"""
+        old = self._works.get(work, {}).get('chapters', set())
+        removed = [self.make_key(work, name) for name in old - chapters]
+        added = {self.make_key(work, name): name for name in chapters - old}
+        self._search_index.update(added=added, removed=removed)
+        if mtime is None:
+            self._works.pop(work, None)
+        else:
+            self._works[work] = {'mtime': mtime, 'chapters': chapters}
+
+    def _sync_works(self):
+        """
+        跟隨 LibraryIndex 的作品增刪（世代編號未變時直接返回），只掃描新增的作品
+
+        Returns:
+            int: 掃描的作品數
+        """
+        self.library.refresh()
+        with self._lock:
+            if self.library.generation == self._library_generation:
+                return 0
+        generation, names = self.library.get_name_set()
+
+        with self._lock:
+            known = set(self._works)
+        # 不持鎖掃描檔案系統，避免長時間阻塞搜尋
+        results = {work: self._scan_work(work) for work in names - known}
+
+        with self._lock:
+            # 並行同步時不以較舊的名稱清單覆蓋
+            if self._library_generation is not None and generation < self._library_generation:
+                return len(results)
+            for work in set(self._works) - names:
+                self._apply_work(work, None, set())
+            for work, (mtime, chapters) in results.items():
+                self._apply_work(work, mtime, chapters)
+            self._library_generation = generation
+            if not known and self._checked_at is None:
+                self._checked_at = time.monotonic()  # 首次建立的掃描結果不需立即重新比對
+        return len(results)
+
+    def _revalidate(self):
+        """
+        比對所有已知作品的目錄 mtime，只重新掃描有變動的作品（逐一 stat，於背景執行緒或預熱時呼叫）
+
+        Returns:
+            int: 重新掃描的作品數
+        """
+        with self._lock:
+            self._checked_at = time.monotonic()
+            mtimes = {work: info['mtime'] for work, info in self._works.items()}
+
+        changed = []
+        for work, mtime in mtimes.items():
+            try:
+                if os.stat(os.path.join(self.root_path, work)).st_mtime_ns != mtime:
+                    changed.append(work)
+            except OSError:
+                changed.append(work)
+        results = {work: self._scan_work(work) for work in changed}
+
+        with self._lock:
+            for work, (mtime, chapters) in results.items():
+                # 比對期間已被同步移除的作品不重新加入
+                if work in self._works:
+                    self._apply_work(work, mtime, chapters)
+        return len(results)
+
+    def refresh(self, force=False):
+        """
+        同步作品清單並重新掃描有變動的作品
+
+        作品增刪跟隨 LibraryIndex；既有作品的 mtime 距上次比對滿 refresh_ttl 秒時在背景重新比對
+
+        Args:
+            force: 是否立即在呼叫端比對所有作品的 mtime（預熱時使用）
+
+        Returns:
+            int: 本次呼叫重新掃描的作品數（不含背景比對）
+        """
+        scanned = self._sync_works()
+        if force:
+            return scanned + self._revalidate()
+        with self._lock:
+            expired = self._checked_at is None or time.monotonic() - self._checked_at >= self.refresh_ttl
+        if expired:
+            self._tasks.start('chapters', self._revalidate)
+        return scanned
+
+    def wait_for_refresh(self, timeout=None):
+        """
+        等待進行中的背景比對完成（測試與關閉時使用）
+
+        Returns:
+            bool: 是否全部完成
+        """
+        return self._tasks.wait(timeout)
+
+    def export_state(self):
+        """
+        匯出各作品的章節掃描結果（供啟動快照保存）
+
+        Returns:
+            dict: {'root', 'works': {作品名稱: (作品目錄 mtime, 章節名稱列表)}}
+        """
+        with self._lock:
+            return {
+                'root': str(self.root_path),
+                'works': {work: (info['mtime'], list(info['chapters'])) for work, info in self._works.items()}
+            }
+
+    def restore_state(self, state):
+        """
+        以快照取代首次掃描；之後的 refresh 比對所有作品的 mtime（預熱時立即進行，否則在背景），
+        只重新掃描有變動的作品
+
+        Args:
+            state: export_state 返回的字典
+
+        Returns:
+            bool: 是否已套用（已有資料或根目錄不同時不套用）
+        """
+        with self._lock:
+            if self._works or not state or state.get('root') != str(self.root_path):
+                return False
+            added = {}
+            for work, (mtime, chapters) in state['works'].items():
+                self._works[work] = {'mtime': mtime, 'chapters': set(chapters)}
+                added.update((self.make_key(work, name), name) for name in chapters)
+            self._search_index.update(added=added)
+            self._checked_at = None
+        return True
+
+    def search(self, query, limit=None):
+        """
+        搜尋章節名稱（依相關度排序）
+
+        Args:
+            query: 搜尋字串（不分大小寫、全半形）
+            limit: 最多返回筆數
+
+        Returns:
+            list: [(作品名稱, 章節名稱)]
+        """
+        self.refresh()
+        keys = self._search_index.search(query, limit=limit, sort_key=self.sort_key)
+        return [tuple(key.split('/', 1)) for key in keys]
+
+    def __len__(self):
+        with self._lock:
+            return sum(len(info['chapters']) for info in self._works.values())
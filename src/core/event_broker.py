@@ -0,0 +1,182 @@
+"""
+事件廣播模組
+將狀態變更與作品庫變動推送給所有 Server-Sent Events (SSE) 連線
+"""
+
+import asyncio
+import json
+import logging
+import queue
+import threading
+
+logger = logging.getLogger(__name__)
+
+
+class AsyncSubscription:
+    """
+    事件迴圈中的訂閱者（ASGI 的 SSE 連線使用）
+
+    publish 可能在任意執行緒呼叫，事件以 call_soon_threadsafe 轉入事件迴圈的 asyncio.Queue，
+    連線以 await get() 等待，不需定期輪詢
+    """
+
+    def __init__(self, loop, maxsize):
+        """
+        初始化
+
+        Args:
+            loop: 連線所在的事件迴圈
+            maxsize: 佇列的最大事件數
+        """
+        self._loop = loop
+        self._queue = asyncio.Queue(maxsize=maxsize)
+
+    def put_nowait(self, event):
+        """由任意執行緒放入事件（事件迴圈已關閉時略過）"""
+        try:
+            self._loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass
+
+    def _put(self, event):
+        """在事件迴圈中放入事件；佇列滿時丟棄最舊的事件"""
+        if self._queue.full():
+            self._queue.get_nowait()
+        self._queue.put_nowait(event)
+
+    async def get(self):
+        """等待下一個事件"""
+        return await self._queue.get()
+
+
+class EventBroker:
+    """
+    進程內的事件廣播器
+
+    每個 SSE 連線訂閱一個有界佇列；佇列滿時丟棄最舊的事件，
+    避免慢速客戶端拖垮伺服器記憶體
+    """
+
+    # 連線數已達上限時，建議客戶端重試的秒數（Retry-After）
+    RETRY_AFTER_SECONDS = 30
+
+    def __init__(self, max_queue_size=100):
+        """
+        初始化事件廣播器
+
+        Args:
+            max_queue_size: 每個訂閱者佇列的最大事件數
+        """
+        self.max_queue_size = max_queue_size
+        self._subscribers = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, limit=None):
+        """
+        新增訂閱者
+
+        Args:
+            limit: 訂閱者數量上限（None 表示不限制）
+
+        Returns:
+            queue.Queue: 事件佇列；已達上限時返回 None
+        """
+        return self._add_subscriber(queue.Queue(maxsize=self.max_queue_size), limit)
+
+    def subscribe_async(self, loop, limit=None):
+        """
+        新增事件迴圈中的訂閱者（見 AsyncSubscription）
+
+        Args:
+            loop: 連線所在的事件迴圈
+            limit: 訂閱者數量上限（None 表示不限制）
+
+        Returns:
+            AsyncSubscription: 訂閱；已達上限時返回 None
+        """
+        return self._add_subscriber(AsyncSubscription(loop, self.max_queue_size), limit)
+
+    def _add_subscriber(self, subscription, limit):
+        """加入訂閱者（已達上限時返回 None）"""
+        with self._lock:
+            if limit is not None and len(self._subscribers) >= limit:
+                return None
+            self._subscribers.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """移除訂閱者"""
+        with self._lock:
+            self._subscribers.discard(subscription)
+
+    def publish(self, event):
+        """
+        廣播事件給所有訂閱者
+
+        Args:
+            event: 事件字典（必須包含 'type'）
+        """
+        with self._lock:
+            subscribers = list(self._subscribers)
+
+        for subscription in subscribers:
+            while True:
+                try:
+                    subscription.put_nowait(event)
+                    break
+                except queue.Full:
+                    try:
+                        subscription.get_nowait()
+                    except queue.Empty:
+                        pass
+
+    @property
+    def subscriber_count(self):
+        """目前的訂閱者數量"""
+        with self._lock:
+            return len(self._subscribers)
+
+    @staticmethod
+    def format_sse(event):
+        """
+        將事件格式化為 SSE 訊息
+
+        Args:
+            event: 事件字典
+
+        Returns:
+            str: SSE 格式字串
+        """
+        data = json.dumps(event, ensure_ascii=False)
+        return f"event: {event.get('type', 'message')}\ndata: {data}\n\n"
+
+    def stream(self, heartbeat_seconds=15, on_idle=None, subscription=None):
+        """
+        SSE 串流產生器（結束時取消訂閱）
+
+        Args:
+            heartbeat_seconds: 無事件時送出心跳的間隔秒數
+            on_idle: 每次心跳前呼叫的函數（例如同步其他 worker 的狀態變更）
+            subscription: 已取得的訂閱（None 時自行訂閱）
+
+        Yields:
+            str: SSE 訊息
+        """
+        if subscription is None:
+            subscription = self.subscribe()
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    event = subscription.get(timeout=heartbeat_seconds)
+                except queue.Empty:
+                    if on_idle:
+                        try:
+                            on_idle()
+                        except Exception:
+                            logger.exception("SSE 同步失敗")
+                    yield ": keep-alive\n\n"
+                    continue
+                yield self.format_sse(event)
+        finally:
+            self.unsubscribe(subscription)
@@ -0,0 +1,88 @@
+"""
+跨進程檔案鎖
+用於多個 worker 進程共用同一份 JSON 檔案時序列化寫入
+"""
+
+import os
+import time
+from pathlib import Path
+
+if os.name == 'nt':
+    import msvcrt
+else:
+    import fcntl
+
+
+class FileLock:
+    """
+    基於旁路 .lock 檔案的排他鎖（支援 Windows 與 POSIX）
+
+    用法：
+        with FileLock('data/status.json.lock'):
+            ...
+    """
+
+    def __init__(self, lock_path, timeout=10.0, poll_interval=0.05):
+        """
+        初始化檔案鎖
+
+        Args:
+            lock_path: 鎖檔案路徑
+            timeout: 取得鎖的最長等待秒數
+            poll_interval: 重試間隔秒數
+        """
+        self.lock_path = Path(lock_path)
+        self.timeout = timeout
+        self.poll_interval = poll_interval
+        self._fd = None
+
+    def acquire(self):
+        """取得排他鎖，逾時拋出 TimeoutError"""
+        self.lock_path.parent.mkdir(parents=True, exist_ok=True)
+        fd = os.open(str(self.lock_path), os.O_RDWR | os.O_CREAT, 0o644)
+        deadline = time.monotonic() + self.timeout
+
+        while True:
+            try:
+                self._try_lock(fd)
+                self._fd = fd
+                return
+            except OSError:
+                if time.monotonic() >= deadline:
+                    os.close(fd)
+                    raise TimeoutError(f"無法取得檔案鎖: {self.lock_path}")
+                time.sleep(self.poll_interval)
+
+    def release(self):
+        """釋放排他鎖"""
+        if self._fd is None:
+            return
+        try:
+            self._unlock(self._fd)
+        finally:
+            os.close(self._fd)
+            self._fd = None
+
+    def _try_lock(self, fd):
+        """非阻塞地嘗試加鎖，失敗時拋出 OSError"""
+        if os.name == 'nt':
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_NBLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+
+    def _unlock(self, fd):
+        """解鎖"""
+        if os.name == 'nt':
+            os.lseek(fd, 0, os.SEEK_SET)
+            msvcrt.locking(fd, msvcrt.LK_UNLCK, 1)
+        else:
+            fcntl.flock(fd, fcntl.LOCK_UN)
+
+    def __enter__(self):
+        self.acquire()
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        self.release()
+        return False
@@ -0,0 +1,120 @@
+"""
+啟動快照
+關閉時把作品索引、全域章節索引與章節清單快取寫入檔案，啟動時載入取代首次掃描，
+重新啟動的伺服器不需重新讀取整個作品庫即可回應
+
+- 以 marshal 序列化（只含字串、數字、列表、字典等基本型別，載入快且不會執行任意程式碼），
+  載入時以 mmap 對應檔案，不先複製整個檔案到記憶體
+- 快照只是加速用的提示：各項資料載入後仍以目錄 mtime 驗證，格式或 Python 版本不符時直接忽略
+"""
+
+import logging
+import marshal
+import mmap
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+logger = logging.getLogger(__name__)
+
+
+class IndexSnapshot:
+    """服務索引與快取的啟動快照"""
+
+    # 快照格式版本（欄位變動時遞增，舊快照會被忽略）
+    VERSION = 1
+
+    def __init__(self, storage_path, services, save_on_exit=True):
+        """
+        初始化
+
+        Args:
+            storage_path: 快照檔案路徑
+            services: {名稱: 服務實例}（需提供 export_snapshot / restore_snapshot）
+            save_on_exit: 進程結束時是否自動保存（由進入點以 register_exit_hooks 註冊）
+        """
+        self.storage_path = Path(storage_path)
+        self.services = services
+        self.save_on_exit = save_on_exit
+
+    def save_at_exit(self):
+        """進程結束時保存（save_on_exit 為 False 時略過，例如改由 worker 結束 hook 保存）"""
+        if self.save_on_exit:
+            self.save()
+
+    def save(self):
+        """
+        保存快照（寫入暫存檔後原子替換）
+
+        Returns:
+            bool: 是否成功
+        """
+        try:
+            data = marshal.dumps({
+                'version': self.VERSION,
+                'python': list(sys.version_info[:2]),
+                'saved_at': time.time(),
+                'services': {name: service.export_snapshot() for name, service in self.services.items()}
+            })
+            self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=self.storage_path.name + '.',
+                suffix='.tmp',
+                dir=str(self.storage_path.parent)
+            )
+            try:
+                with os.fdopen(fd, 'wb') as f:
+                    f.write(data)
+                os.replace(tmp_path, self.storage_path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            return True
+        except Exception:
+            logger.exception("儲存索引快照失敗")
+            return False
+
+    def _read(self):
+        """
+        讀取快照檔案
+
+        Returns:
+            dict: 快照內容；不存在、格式或 Python 版本不符時返回 None
+        """
+        try:
+            with open(self.storage_path, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mapped:
+                    data = marshal.loads(mapped)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError, EOFError, TypeError) as e:
+            logger.warning("讀取索引快照失敗，改為掃描作品庫: %s", e)
+            return None
+        if not isinstance(data, dict) or data.get('version') != self.VERSION \
+                or data.get('python') != list(sys.version_info[:2]):
+            return None
+        return data
+
+    def load(self):
+        """
+        載入快照到各服務（只套用尚未掃描的索引）
+
+        Returns:
+            dict: {服務名稱: restore_snapshot 的結果}，沒有可用快照時返回空字典
+        """
+        data = self._read()
+        if data is None:
+            return {}
+        restored = {}
+        for name, state in data.get('services', {}).items():
+            service = self.services.get(name)
+            if service is None:
+                continue
+            try:
+                restored[name] = service.restore_snapshot(state)
+            except Exception:
+                logger.exception("載入索引快照失敗 %s", name)
+        return restored
@@ -0,0 +1,853 @@
+"""
+作品庫索引
+在記憶體中維護根目錄下的作品資料夾清單，避免每個請求都掃描整個根目錄
+"""
+
+import bisect
+import logging
+import os
+import threading
+import time
+from pathlib import Path
+
+from .background import BackgroundTasks
+from .metadata_index import MetadataIndex
+from .metrics import metrics
+from .search_index import NgramIndex
+
+logger = logging.getLogger(__name__)
+
+
+class LibraryIndex:
+    """
+    根目錄作品索引
+
+    - 以根目錄的 mtime 判斷是否需要重新掃描（新增、刪除、改名都會更新目錄 mtime）
+    - 重新掃描時與舊清單做差異比對，增量維護衍生資料
+    - 可綁定 StatusManager，維護各狀態的作品集合（含「未審核」補集），
+      使狀態篩選只需 O(結果數)、狀態計數只需 O(1)
+    - 維護名稱的 trigram 搜尋索引，搜尋不需逐一比對所有名稱
+    - 可提供中繼資料擷取函數，掃描時把解析出的欄位放入反向索引（依作者、精選篩選只需查表）；
+      作品資料夾內的標記檔案變動不會更新根目錄 mtime，因此另以作品目錄 mtime 定期重新驗證：
+      回傳的作品逐一比對 mtime，篩選與計數所需的全庫重新驗證在背景執行緒進行
+    - 可提供統計欄位擷取函數（修改 / 建立時間、容量、圖片數、章節數），首次依欄位排序時在背景建立
+      （建立完成前以自然排序回應），之後與中繼資料相同以作品目錄 mtime 在背景增量更新，
+      排序結果快取至欄位變動為止
+    """
+
+    # 單一事件最多攜帶的名稱數量
+    MAX_EVENT_NAMES = 100
+
+    # 可排序的統計欄位
+    SORT_COLUMNS = ('mtime', 'ctime', 'bytes', 'images', 'chapters')
+
+    def __init__(self, root_path, sort_key=None, category=None, metadata_extractor=None, metadata_ttl=30.0,
+                 stats_extractor=None):
+        """
+        初始化索引
+
+        Args:
+            root_path: 根目錄路徑
+            sort_key: 名稱排序鍵函數（預設為小寫字串）
+            category: 類別 (manga/gallery)，用於狀態綁定與事件
+            metadata_extractor: 中繼資料擷取函數（接收作品目錄路徑，返回欄位字典），None 表示不建立
+            metadata_ttl: 重新驗證作品目錄 mtime（偵測標記檔案、統計欄位變動）的最短間隔秒數
+            stats_extractor: 統計欄位擷取函數（接收作品目錄路徑，返回 SORT_COLUMNS 欄位字典），None 表示不支援欄位排序
+        """
+        self.root_path = Path(root_path)
+        self.sort_key = sort_key or (lambda name: name.lower())
+        self._lock = threading.RLock()
+        self._listeners = []
+        self._root_mtime = None
+        self._scanned = False
+        self._names = set()
+        self._sort_keys = {}
+        self._sorted_entries = None  # [(排序鍵, 名稱)]，名稱作為同鍵時的次要排序
+        self._search_index = NgramIndex()
+        self._generation = 0  # 作品清單每次變動遞增（供衍生索引判斷是否需要重新同步）
+
+        # 中繼資料
+        self._metadata_extractor = metadata_extractor
+        self._metadata_ttl = metadata_ttl
+        self._metadata = MetadataIndex()
+        self._metadata_mtimes = {}  # 作品名稱 -> 擷取時的作品目錄 mtime
+        self._metadata_checked_at = time.monotonic()  # 掃描時才擷取，建立後的第一個 TTL 內不需重新驗證
+        self._metadata_served = {}  # 作品名稱 -> 單獨重新驗證的時間（回傳作品時）
+        self._tasks = BackgroundTasks()
+
+        # 統計欄位（首次依欄位排序時才建立）
+        self._stats_extractor = stats_extractor
+        self._stats = None          # 作品名稱 -> 統計欄位字典，None 表示尚未建立
+        self._stats_mtimes = {}     # 作品名稱 -> 擷取時的作品目錄 mtime
+        self._stats_checked_at = 0.0
+        self._column_entries = {}   # (欄位, 遞減) -> 排序項目列表
+
+        # 狀態綁定
+        self._category = category
+        self._status_manager = None
+        self._status_sets = None  # {狀態: 作品名稱集合}，None 表示需要重新計算
+        self._status_generation = 0  # 每次狀態事件遞增，用於偵測重算期間的並行變更
+
+    # ------------------------------------------------------------------
+    # 掃描
+    # ------------------------------------------------------------------
+
+    def refresh(self, force=False):
+        """
+        根目錄有變動時重新掃描
+
+        Args:
+            force: 是否忽略 mtime 強制重新掃描
+
+        Returns:
+            bool: 作品清單是否有變動
+        """
+        try:
+            root_mtime = os.stat(self.root_path).st_mtime_ns
+        except OSError:
+            root_mtime = None
+
+        with self._lock:
+            if not force and root_mtime == self._root_mtime and root_mtime is not None:
+                return False
+
+            names = set()
+            if root_mtime is not None:
+                try:
+                    metrics.record_fs('scandir')
+                    with os.scandir(self.root_path) as entries:
+                        for entry in entries:
+                            try:
+                                if entry.is_dir():
+                                    names.add(entry.name)
+                            except OSError:
+                                continue
+                except OSError as e:
+                    logger.warning("掃描作品目錄失敗: %s", e)
+
+            self._root_mtime = root_mtime
+            first_scan = not self._scanned
+            self._scanned = True
+            added = names - self._names
+            removed = self._names - names
+            if not added and not removed:
+                return False
+
+            self._apply_changes(added, removed)
+
+        if added and self._status_manager is not None:
+            self._add_status_members(added)
+
+        # 首次掃描不是「變動」，不發出事件
+        if not first_scan:
+            self._notify({
+                'type': 'library',
+                'category': self._category,
+                'added': sorted(added)[:self.MAX_EVENT_NAMES],
+                'removed': sorted(removed)[:self.MAX_EVENT_NAMES],
+                'added_count': len(added),
+                'removed_count': len(removed)
+            })
+        return True
+
+    def add_listener(self, callback):
+        """
+        註冊作品庫變動監聽器
+
+        事件格式：{'type': 'library', 'category', 'added': [...], 'removed': [...],
+                   'added_count', 'removed_count'}（名稱列表最多 MAX_EVENT_NAMES 筆）
+
+        Args:
+            callback: 接收事件字典的函數
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+
+    def _notify(self, event):
+        """通知所有監聽器（監聽器錯誤不影響索引操作）"""
+        for callback in list(self._listeners):
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("作品庫事件處理失敗")
+
+    def _apply_changes(self, added, removed):
+        """套用掃描差異並增量更新衍生資料（呼叫端需持有鎖）"""
+        self._generation += 1
+        for name in removed:
+            self._names.discard(name)
+            self._sort_keys.pop(name, None)
+        for name in added:
+            self._names.add(name)
+            self._sort_keys[name] = self.sort_key(name)
+        self._sorted_entries = None
+        self._search_index.update(added=added, removed=removed)
+
+        if self._metadata_extractor is not None:
+            for name in removed:
+                self._metadata.remove(name)
+                self._metadata_mtimes.pop(name, None)
+                self._metadata_served.pop(name, None)
+            for name in added:
+                self._extract_metadata(name)
+
+        if self._stats is not None:
+            for name in removed:
+                self._stats.pop(name, None)
+                self._stats_mtimes.pop(name, None)
+            for name in added:
+                self._apply_stats(name, self._compute_stats(name))
+        self._column_entries = {}
+
+        if self._status_sets is not None:
+            for members in self._status_sets.values():
+                members -= removed
+
+    def _add_status_members(self, added):
+        """將新增作品依目前狀態放入對應集合（不持鎖呼叫 StatusManager，避免鎖順序死結）"""
+        status_map = self._status_manager.get_all_statuses(self._category)
+        unreviewed = self._status_manager.STATUS_UNREVIEWED
+        with self._lock:
+            if self._status_sets is None:
+                return
+            for name in added:
+                if name in self._names:
+                    self._status_sets[status_map.get(name, unreviewed)].add(name)
+
+    def _extract_metadata(self, name, mtime=None):
+        """擷取單一作品的中繼資料並更新索引"""
+        path = os.path.join(self.root_path, name)
+        try:
+            if mtime is None:
+                mtime = os.stat(path).st_mtime_ns
+            record = self._metadata_extractor(path)
+        except Exception as e:
+            logger.warning("擷取作品中繼資料失敗 %s: %s", name, e)
+            return
+        self._metadata_mtimes[name] = mtime
+        self._metadata.set(name, record)
+
+    def refresh_metadata(self, force=False):
+        """
+        重新驗證中繼資料：作品目錄 mtime 有變動（例如新增或刪除標記檔案）時重新擷取
+
+        需逐一 stat 所有作品目錄，查詢時由 _schedule_metadata_refresh 在背景呼叫；
+        距離上次驗證未滿 metadata_ttl 秒時直接返回（force 除外）
+
+        Returns:
+            int: 重新擷取的作品數
+        """
+        if self._metadata_extractor is None:
+            return 0
+        self.refresh()
+
+        now = time.monotonic()
+        with self._lock:
+            if not force and now - self._metadata_checked_at < self._metadata_ttl:
+                return 0
+            self._metadata_checked_at = now
+            known = dict(self._metadata_mtimes)
+
+        # 不持鎖逐一 stat，避免長時間阻塞其他查詢
+        changed = {}
+        for name, mtime in known.items():
+            try:
+                current = os.stat(os.path.join(self.root_path, name)).st_mtime_ns
+            except OSError:
+                continue
+            if current != mtime:
+                changed[name] = current
+
+        with self._lock:
+            for name, mtime in changed.items():
+                if name in self._names:
+                    self._extract_metadata(name, mtime)
+            self._metadata_served = {}
+        return len(changed)
+
+    def _schedule_metadata_refresh(self):
+        """TTL 到期時在背景重新驗證全部中繼資料（查詢使用目前的索引，不等待）"""
+        if self._metadata_extractor is None:
+            return
+        with self._lock:
+            expired = time.monotonic() - self._metadata_checked_at >= self._metadata_ttl
+        if expired:
+            self._tasks.start(f"{self._category}-metadata", self.refresh_metadata)
+
+    def _revalidate_metadata(self, name):
+        """
+        重新驗證單一作品的中繼資料（回傳作品時呼叫，每部作品每 metadata_ttl 秒最多 stat 一次）
+
+        全庫重新驗證未滿 metadata_ttl 秒時略過
+        """
+        now = time.monotonic()
+        with self._lock:
+            if now - self._metadata_checked_at < self._metadata_ttl:
+                return
+            checked = self._metadata_served.get(name)
+            if checked is not None and now - checked < self._metadata_ttl:
+                return
+            self._metadata_served[name] = now
+            known = self._metadata_mtimes.get(name)
+
+        try:
+            current = os.stat(os.path.join(self.root_path, name)).st_mtime_ns
+        except OSError:
+            return
+        if current != known:
+            with self._lock:
+                if name in self._names:
+                    self._extract_metadata(name, current)
+
+    def wait_for_refresh(self, timeout=None):
+        """
+        等待進行中的背景重新驗證完成（測試與關閉時使用）
+
+        Returns:
+            bool: 是否全部完成
+        """
+        return self._tasks.wait(timeout)
+
+    def _compute_stats(self, name):
+        """
+        計算單一作品的統計欄位（不需持鎖）
+
+        Returns:
+            tuple: (作品目錄 mtime, 統計欄位字典)，失敗時返回 None
+        """
+        path = os.path.join(self.root_path, name)
+        try:
+            mtime = os.stat(path).st_mtime_ns
+            return mtime, self._stats_extractor(path)
+        except Exception as e:
+            logger.warning("計算作品統計失敗 %s: %s", name, e)
+            return None
+
+    def _apply_stats(self, name, result):
+        """套用統計欄位計算結果（呼叫端需持有鎖；計算失敗的作品以空欄位排在最後）"""
+        if result is None:
+            self._stats[name] = {}
+            return
+        self._stats_mtimes[name], self._stats[name] = result
+
+    def refresh_stats(self, force=False):
+        """
+        建立或重新驗證統計欄位
+
+        首次呼叫時計算所有作品；之後距離上次驗證滿 metadata_ttl 秒（或 force）時，
+        只重新計算作品目錄 mtime 有變動的作品（需讀取所有作品目錄，查詢時由 ensure_stats 在背景呼叫）
+
+        Returns:
+            int: 重新計算的作品數
+        """
+        if self._stats_extractor is None:
+            raise ValueError("此作品庫不支援統計欄位排序")
+        self.refresh()
+
+        now = time.monotonic()
+        with self._lock:
+            if self._stats is None:
+                to_compute = set(self._names)
+            elif force or now - self._stats_checked_at >= self._metadata_ttl:
+                to_compute = None
+                known = dict(self._stats_mtimes)
+            else:
+                return 0
+            self._stats_checked_at = now
+
+        # 不持鎖存取檔案系統，避免長時間阻塞其他查詢
+        if to_compute is None:
+            to_compute = set()
+            for name, mtime in known.items():
+                try:
+                    if os.stat(os.path.join(self.root_path, name)).st_mtime_ns != mtime:
+                        to_compute.add(name)
+                except OSError:
+                    continue
+        results = {name: self._compute_stats(name) for name in to_compute}
+
+        with self._lock:
+            if self._stats is None:
+                self._stats = {}
+            for name, result in results.items():
+                if name in self._names:
+                    self._apply_stats(name, result)
+            # 計算期間新增的作品
+            for name in self._names - self._stats.keys():
+                self._apply_stats(name, self._compute_stats(name))
+            if results:
+                self._column_entries = {}
+        return len(results)
+
+    def stats_ready(self):
+        """統計欄位是否已建立"""
+        with self._lock:
+            return self._stats is not None
+
+    def ensure_stats(self):
+        """
+        確保統計欄位可用於排序：尚未建立或距上次驗證滿 metadata_ttl 秒時在背景建立 / 重新驗證
+
+        Returns:
+            bool: 統計欄位是否已建立（未建立時呼叫端改以自然排序回應）
+        """
+        if self._stats_extractor is None:
+            raise ValueError("此作品庫不支援統計欄位排序")
+        with self._lock:
+            ready = self._stats is not None
+            expired = not ready or time.monotonic() - self._stats_checked_at >= self._metadata_ttl
+        if expired:
+            self._tasks.start(f"{self._category}-stats", self.refresh_stats)
+        return ready
+
+    def get_stats(self, name):
+        """
+        獲取作品的統計欄位（尚未建立時返回 None，不會觸發計算）
+
+        Returns:
+            dict: 統計欄位字典或 None
+        """
+        with self._lock:
+            if self._stats is None:
+                return None
+            record = self._stats.get(name)
+            return dict(record) if record is not None else None
+
+    # ------------------------------------------------------------------
+    # 快照
+    # ------------------------------------------------------------------
+
+    def export_state(self):
+        """
+        匯出掃描結果（供啟動快照保存；只含基本型別）
+
+        Returns:
+            dict: {'root', 'root_mtime', 'names', 'metadata', 'stats'}，尚未掃描時返回 None
+        """
+        with self._lock:
+            if not self._scanned:
+                return None
+            return {
+                'root': str(self.root_path),
+                'root_mtime': self._root_mtime,
+                'names': list(self._names),
+                'metadata': {
+                    name: (mtime, self._metadata.get(name))
+                    for name, mtime in self._metadata_mtimes.items()
+                },
+                # 計算失敗的作品沒有 mtime，不保存（載入後重新計算）
+                'stats': None if self._stats is None else {
+                    name: (mtime, self._stats[name])
+                    for name, mtime in self._stats_mtimes.items() if name in self._stats
+                }
+            }
+
+    def restore_state(self, state):
+        """
+        以快照取代首次掃描
+
+        根目錄 mtime 仍由下次 refresh 比對，有變動時與快照的清單做差異更新；
+        中繼資料與統計欄位在第一次查詢時依作品目錄 mtime 重新驗證，只重新擷取有變動的作品
+
+        Args:
+            state: export_state 返回的字典
+
+        Returns:
+            bool: 是否已套用（已掃描過或根目錄不同時不套用）
+        """
+        with self._lock:
+            if self._scanned or not state or state.get('root') != str(self.root_path):
+                return False
+
+            self._root_mtime = state['root_mtime']
+            self._scanned = True
+            self._names = set(state['names'])
+            self._sort_keys = {name: self.sort_key(name) for name in self._names}
+            self._sorted_entries = None
+            self._search_index.update(added=self._names)
+            self._generation += 1
+
+            if self._metadata_extractor is not None:
+                for name, (mtime, record) in state.get('metadata', {}).items():
+                    if name in self._names and record is not None:
+                        self._metadata_mtimes[name] = mtime
+                        self._metadata.set(name, record)
+                # 快照沒有記錄的作品（例如當時擷取失敗）重新擷取
+                for name in self._names - self._metadata_mtimes.keys():
+                    self._extract_metadata(name)
+                self._metadata_checked_at = 0.0
+
+            stats = state.get('stats')
+            if self._stats_extractor is not None and stats is not None:
+                self._stats = {}
+                for name, (mtime, record) in stats.items():
+                    if name in self._names:
+                        self._stats_mtimes[name] = mtime
+                        self._stats[name] = record
+                self._stats_checked_at = 0.0
+        return True
+
+    # ------------------------------------------------------------------
+    # 查詢
+    # ------------------------------------------------------------------
+
+    def get_names(self):
+        """
+        獲取所有作品名稱（已排序）
+
+        Returns:
+            list: 作品資料夾名稱列表
+        """
+        self.refresh()
+        with self._lock:
+            return [name for _, name in self._get_sorted_entries()]
+
+    @property
+    def generation(self):
+        """作品清單的世代編號（不觸發重新掃描）"""
+        with self._lock:
+            return self._generation
+
+    def get_name_set(self):
+        """
+        獲取作品名稱集合與對應的世代編號（不排序，供衍生索引同步）
+
+        Returns:
+            tuple: (世代編號, 作品名稱集合)
+        """
+        self.refresh()
+        with self._lock:
+            return self._generation, set(self._names)
+
+    def _get_sorted_entries(self):
+        """獲取依 (排序鍵, 名稱) 排序的項目列表（呼叫端需持有鎖）"""
+        if self._sorted_entries is None:
+            self._sorted_entries = sorted((self._sort_keys[name], name) for name in self._names)
+        return self._sorted_entries
+
+    def _entry(self, name):
+        """名稱的排序項目（已刪除的名稱也能計算，供游標定位）"""
+        key = self._sort_keys.get(name)
+        return (key if key is not None else self.sort_key(name), name)
+
+    def contains(self, name):
+        """作品是否存在於索引中"""
+        self.refresh()
+        with self._lock:
+            return name in self._names
+
+    def sort_names(self, names):
+        """以快取的排序鍵排序名稱（只排序傳入的部分）"""
+        with self._lock:
+            return sorted(names, key=self._entry)
+
+    def _make_entry(self, name, sort=None, descending=False, value=None):
+        """
+        名稱在指定排序下的排序項目
+
+        自然排序為 (排序鍵, 名稱)；欄位排序為 (欄位值, 排序鍵, 名稱)，遞減時欄位值取負數
+
+        Args:
+            name: 作品名稱
+            sort: 統計欄位名稱（None 表示自然排序）
+            descending: 是否遞減
+            value: 已知的欄位主鍵（游標提供；None 表示由統計欄位計算）
+        """
+        natural = self._entry(name)
+        if not sort:
+            return natural
+        if value is None:
+            value = (self._stats.get(name) or {}).get(sort) or 0
+            value = -value if descending else value
+        return (value,) + natural
+
+    def _get_column_entries(self, sort, descending):
+        """獲取依統計欄位排序的項目列表（快取至作品或統計變動為止，呼叫端需持有鎖）"""
+        cache_key = (sort, descending)
+        entries = self._column_entries.get(cache_key)
+        if entries is None:
+            entries = sorted(self._make_entry(name, sort, descending) for name in self._names)
+            self._column_entries[cache_key] = entries
+        return entries
+
+    def get_page(self, after=None, offset=0, limit=20, status=None, metadata=None,
+                 sort=None, descending=False, after_value=None):
+        """
+        分頁獲取作品名稱
+
+        以游標（上一頁最後一個項目）定位時只需二分搜尋排序項目，成本為 O(log N + limit)，
+        且兩次請求之間新增 / 刪除作品不會造成結果位移
+
+        Args:
+            after: 上一頁最後一個名稱（游標，可已不存在），None 表示從頭開始
+            offset: 未提供游標時的起始位置（舊版頁碼分頁）
+            limit: 每頁數量
+            status: 狀態篩選（需已綁定 StatusManager）
+            metadata: 中繼資料條件 {欄位: 值}
+            sort: 統計欄位排序（SORT_COLUMNS 之一），None 表示自然排序；統計欄位尚未建立時改用自然排序
+            descending: 欄位排序是否遞減
+            after_value: 游標項目的欄位主鍵（欄位排序時由游標提供）
+
+        Returns:
+            tuple: (名稱列表, 符合總數, 下一頁位置 {'after', 'value'} 或 None)
+        """
+        if sort and not self.ensure_stats():
+            sort = None
+        self.refresh()
+        allowed = self._get_allowed_names(status, metadata)
+
+        with self._lock:
+            entries = self._get_column_entries(sort, descending) if sort else self._get_sorted_entries()
+            # 篩選結果佔比小時（或以位移分頁時）直接排序篩選結果；否則沿全體排序列表走訪並檢查成員
+            if allowed is not None and (len(allowed) * 16 < len(entries) or (after is None and offset)):
+                entries = sorted(self._make_entry(name, sort, descending) for name in allowed)
+                allowed = None
+
+            total = len(entries) if allowed is None else len(allowed)
+            if after is not None:
+                start = bisect.bisect_right(entries, self._make_entry(after, sort, descending, after_value))
+            else:
+                start = offset
+
+            # 多取一筆判斷是否還有下一頁
+            page = []
+            position = start
+            while position < len(entries) and len(page) <= limit:
+                entry = entries[position]
+                if allowed is None or entry[-1] in allowed:
+                    page.append(entry)
+                position += 1
+
+            has_more = len(page) > limit
+            page = page[:limit]
+            next_position = None
+            if has_more and page:
+                next_position = {'after': page[-1][-1]}
+                if sort:
+                    next_position['value'] = page[-1][0]
+            return [entry[-1] for entry in page], total, next_position
+
+    def sort_by_column(self, names, sort, descending=False):
+        """
+        依統計欄位排序指定的名稱（例如搜尋結果）
+
+        Args:
+            names: 名稱列表
+            sort: 統計欄位名稱
+            descending: 是否遞減
+
+        Returns:
+            list: 排序後的名稱列表（統計欄位尚未建立時維持原順序）
+        """
+        if not self.ensure_stats():
+            return list(names)
+        with self._lock:
+            return sorted(names, key=lambda name: self._make_entry(name, sort, descending))
+
+    # ------------------------------------------------------------------
+    # 狀態篩選下推
+    # ------------------------------------------------------------------
+
+    def attach_status_manager(self, status_manager, category):
+        """
+        綁定狀態管理器（重複呼叫無副作用）
+
+        Args:
+            status_manager: StatusManager 實例
+            category: 類別 (manga/gallery)
+        """
+        with self._lock:
+            if self._status_manager is status_manager and self._category == category:
+                return
+            self._status_manager = status_manager
+            self._category = category
+            self._status_sets = None
+        status_manager.add_listener(self._on_status_event)
+
+    def _on_status_event(self, event):
+        """狀態變更事件：把作品從舊狀態集合移到新狀態集合"""
+        with self._lock:
+            self._status_generation += 1
+            if self._status_sets is None:
+                return
+            if event.get('type') == 'reload':
+                # 其他進程修改了狀態檔案，下次查詢時重算
+                self._status_sets = None
+                return
+            if event.get('category') != self._category:
+                return
+
+            name = event.get('path')
+            if name not in self._names:
+                return
+            for members in self._status_sets.values():
+                members.discard(name)
+            # 非 favorite/reviewed 的狀態在 StatusManager 中等同未審核
+            unreviewed = self._status_sets[self._status_manager.STATUS_UNREVIEWED]
+            self._status_sets.get(event.get('status'), unreviewed).add(name)
+
+    def _get_status_sets(self):
+        """
+        獲取各狀態的作品集合，失效時依狀態資料重建
+
+        Returns:
+            dict: {狀態: 作品名稱集合}
+        """
+        sm = self._status_manager
+        with self._lock:
+            if self._status_sets is not None:
+                return self._status_sets
+            generation = self._status_generation
+
+        # 注意：持有索引鎖時不呼叫 StatusManager（其事件回呼會反向取得索引鎖）
+        status_map = sm.get_all_statuses(self._category)
+        with self._lock:
+            status_sets = {
+                sm.STATUS_FAVORITE: set(),
+                sm.STATUS_REVIEWED: set(),
+                sm.STATUS_UNREVIEWED: set()
+            }
+            for name in self._names:
+                status_sets[status_map.get(name, sm.STATUS_UNREVIEWED)].add(name)
+            # 重建期間若有狀態事件，結果可能過時，僅本次使用不快取
+            if generation == self._status_generation:
+                self._status_sets = status_sets
+            return status_sets
+
+    def _get_names_by_status(self, status):
+        """依狀態獲取作品名稱集合（未排序的副本），未綁定或狀態無效時返回空集合"""
+        self.refresh()
+        if self._status_manager is None:
+            return set()
+
+        status_sets = self._get_status_sets()
+        with self._lock:
+            return set(status_sets.get(status, ()))
+
+    def get_names_by_status(self, status):
+        """
+        依狀態獲取作品名稱（已排序），成本與結果數成正比
+
+        Args:
+            status: 狀態 (favorite/reviewed/unreviewed)
+
+        Returns:
+            list: 作品資料夾名稱列表
+        """
+        return self.sort_names(self._get_names_by_status(status))
+
+    # ------------------------------------------------------------------
+    # 中繼資料篩選
+    # ------------------------------------------------------------------
+
+    def get_metadata(self, name):
+        """
+        獲取作品的中繼資料
+
+        Args:
+            name: 作品資料夾名稱
+
+        Returns:
+            dict: 欄位字典，未建立中繼資料時返回 None
+        """
+        if self._metadata_extractor is None:
+            return None
+        self._revalidate_metadata(name)
+        return self._metadata.get(name)
+
+    def _get_names_by_metadata(self, filters):
+        """依中繼資料條件（{欄位: 值}，全部符合）獲取作品名稱集合"""
+        self._schedule_metadata_refresh()
+        result = None
+        for field, value in filters.items():
+            members = self._metadata.lookup(field, value)
+            result = members if result is None else result & members
+            if not result:
+                return set()
+        return result if result is not None else set()
+
+    def get_metadata_counts(self, field):
+        """
+        獲取中繼資料欄位各值的作品數量（例如各作者的作品數）
+
+        Args:
+            field: 欄位名稱
+
+        Returns:
+            dict: {欄位值: 作品數量}
+        """
+        self._schedule_metadata_refresh()
+        return self._metadata.value_counts(field)
+
+    def _get_allowed_names(self, status=None, metadata=None):
+        """合併狀態與中繼資料條件，返回允許的名稱集合（沒有條件時返回 None）"""
+        allowed = None
+        if status:
+            allowed = self._get_names_by_status(status)
+        if metadata:
+            members = self._get_names_by_metadata(metadata)
+            allowed = members if allowed is None else allowed & members
+        return allowed
+
+    def get_names_filtered(self, status=None, metadata=None):
+        """
+        依狀態與中繼資料條件獲取作品名稱（已排序），成本與結果數成正比
+
+        Args:
+            status: 狀態 (favorite/reviewed/unreviewed)，None 表示不篩選
+            metadata: 中繼資料條件 {欄位: 值}，None 表示不篩選
+
+        Returns:
+            list: 作品資料夾名稱列表
+        """
+        allowed = self._get_allowed_names(status, metadata)
+        if allowed is None:
+            return self.get_names()
+        return self.sort_names(allowed)
+
+    def search(self, query, status=None, prefix=False, limit=None, metadata=None):
+        """
+        搜尋作品名稱（依相關度排序）
+
+        Args:
+            query: 搜尋字串（不分大小寫、全半形）
+            status: 只搜尋指定狀態的作品（需已綁定 StatusManager）
+            prefix: 是否只返回前綴相符的結果
+            limit: 最多返回筆數
+            metadata: 只搜尋符合中繼資料條件 {欄位: 值} 的作品
+
+        Returns:
+            list: 作品資料夾名稱列表
+        """
+        self.refresh()
+        allowed = self._get_allowed_names(status, metadata)
+        names = self._search_index.search(
+            query,
+            prefix=prefix,
+            limit=None if allowed is not None else limit,
+            sort_key=lambda n: self._sort_keys.get(n) or self.sort_key(n)
+        )
+        if allowed is not None:
+            names = [n for n in names if n in allowed]
+            if limit is not None:
+                names = names[:limit]
+        return names
+
+    def get_status_counts(self):
+        """
+        獲取各狀態的作品數量（維護中的集合大小，O(1)）
+
+        Returns:
+            dict: {'all': 總數, 'favorite': 數量, 'reviewed': 數量, 'unreviewed': 數量}
+        """
+        self.refresh()
+        counts = {'all': len(self._names)}
+        if self._status_manager is None:
+            return counts
+
+        status_sets = self._get_status_sets()
+        with self._lock:
+            counts['all'] = len(self._names)
+            for status, members in status_sets.items():
+                counts[status] = len(members)
+        return counts
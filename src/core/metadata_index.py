@@ -0,0 +1,159 @@
+"""
+作品中繼資料索引
+從資料夾命名（`<pixiv id>-<artist>`）與標記檔案（例如 `.special`）解析結構化欄位，
+並維護「欄位值 -> 作品名稱集合」的反向索引，使依作者、精選等條件篩選只需查表
+"""
+
+import os
+import re
+import threading
+
+from .search_index import normalize_text
+
+# Gallery 資料夾命名：<pixiv id>-<作者>
+WORK_NAME_PATTERN = re.compile(r'^(\d+)-(.+)$')
+
+
+def parse_work_name(name):
+    """
+    解析 `<pixiv id>-<artist>` 格式的作品資料夾名稱
+
+    Args:
+        name: 作品資料夾名稱
+
+    Returns:
+        dict: {'pixiv_id': int 或 None, 'artist': str 或 None}
+    """
+    match = WORK_NAME_PATTERN.match(name)
+    if not match:
+        return {'pixiv_id': None, 'artist': None}
+    artist = match.group(2).strip()
+    return {'pixiv_id': int(match.group(1)), 'artist': artist or None}
+
+
+def extract_gallery_metadata(work_path, marker_file='.special'):
+    """
+    擷取 Gallery 作品的中繼資料（名稱解析 + 一次 stat 檢查標記檔案）
+
+    Args:
+        work_path: 作品目錄路徑
+        marker_file: 精選標記檔案名稱
+
+    Returns:
+        dict: {'pixiv_id', 'artist', 'featured'}
+    """
+    metadata = parse_work_name(os.path.basename(work_path))
+    metadata['featured'] = os.path.isfile(os.path.join(work_path, marker_file))
+    return metadata
+
+
+class MetadataIndex:
+    """
+    中繼資料反向索引
+
+    - 每部作品一筆記錄（欄位字典），記錄變動時增量更新反向索引
+    - 字串欄位以搜尋用正規化（NFKC + casefold）後的值建立索引，查詢不分大小寫、全半形
+    - 值為 None / False 的欄位不建立索引
+    """
+
+    def __init__(self):
+        """初始化索引"""
+        self._lock = threading.RLock()
+        self._records = {}  # 作品名稱 -> 欄位字典
+        self._fields = {}   # 欄位 -> {索引值 -> 作品名稱集合}
+        self._labels = {}   # 欄位 -> {索引值 -> 顯示用原始值}
+
+    def __len__(self):
+        return len(self._records)
+
+    @staticmethod
+    def _index_value(value):
+        """轉換為索引用的值（字串正規化，其餘原樣）"""
+        if isinstance(value, str):
+            return normalize_text(value)
+        return value
+
+    def _unindex(self, name, record):
+        """從反向索引移除一筆記錄（呼叫端需持有鎖）"""
+        for field, value in record.items():
+            if value is None or value is False:
+                continue
+            key = self._index_value(value)
+            values = self._fields.get(field, {})
+            members = values.get(key)
+            if members is None:
+                continue
+            members.discard(name)
+            if not members:
+                del values[key]
+                self._labels[field].pop(key, None)
+
+    def set(self, name, record):
+        """
+        設定作品的中繼資料（取代舊記錄）
+
+        Args:
+            name: 作品資料夾名稱
+            record: 欄位字典
+        """
+        with self._lock:
+            old = self._records.get(name)
+            if old == record:
+                return
+            if old is not None:
+                self._unindex(name, old)
+
+            self._records[name] = record
+            for field, value in record.items():
+                if value is None or value is False:
+                    continue
+                key = self._index_value(value)
+                self._fields.setdefault(field, {}).setdefault(key, set()).add(name)
+                self._labels.setdefault(field, {}).setdefault(key, value)
+
+    def remove(self, name):
+        """移除作品的中繼資料（不存在時忽略）"""
+        with self._lock:
+            old = self._records.pop(name, None)
+            if old is not None:
+                self._unindex(name, old)
+
+    def get(self, name):
+        """
+        獲取作品的中繼資料
+
+        Returns:
+            dict: 欄位字典（副本），沒有記錄時返回 None
+        """
+        with self._lock:
+            record = self._records.get(name)
+            return dict(record) if record is not None else None
+
+    def lookup(self, field, value):
+        """
+        依欄位值查詢作品
+
+        Args:
+            field: 欄位名稱（例如 artist、featured）
+            value: 欄位值（字串不分大小寫、全半形）
+
+        Returns:
+            set: 作品名稱集合（副本）
+        """
+        with self._lock:
+            members = self._fields.get(field, {}).get(self._index_value(value))
+            return set(members) if members else set()
+
+    def value_counts(self, field):
+        """
+        獲取欄位各值的作品數量
+
+        Args:
+            field: 欄位名稱
+
+        Returns:
+            dict: {顯示用值: 作品數量}
+        """
+        with self._lock:
+            labels = self._labels.get(field, {})
+            return {labels[key]: len(members) for key, members in self._fields.get(field, {}).items()}
@@ -0,0 +1,222 @@
+"""
+執行指標
+記錄各路由的延遲與回應大小、檔案系統呼叫次數、快取命中率，
+以 Prometheus 文字格式輸出（/metrics）
+
+指標存在各進程的記憶體中；多 worker 部署時每個 worker 各自累計
+"""
+
+import bisect
+import logging
+import threading
+
+logger = logging.getLogger(__name__)
+
+# 延遲分桶（秒）
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# 回應大小分桶（位元組）
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+
+class Histogram:
+    """累積分桶直方圖（非執行緒安全，由 Metrics 的鎖保護）"""
+
+    def __init__(self, buckets):
+        """
+        初始化
+
+        Args:
+            buckets: 遞增的分桶上限
+        """
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)  # 最後一格為 +Inf
+        self.sum = 0
+        self.count = 0
+
+    def observe(self, value):
+        """記錄一個觀測值"""
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def cumulative(self):
+        """
+        Returns:
+            list: [(上限字串, 累計次數)]，最後一項為 +Inf
+        """
+        result = []
+        total = 0
+        for bound, count in zip(list(self.buckets) + ['+Inf'], self.counts):
+            total += count
+            result.append((format_value(bound) if bound != '+Inf' else bound, total))
+        return result
+
+
+def format_value(value):
+    """數值轉為 Prometheus 文字格式"""
+    if isinstance(value, float):
+        return str(int(value)) if value.is_integer() else repr(value)
+    return str(value)
+
+
+def format_labels(labels):
+    """標籤字典轉為 {key="value",...}"""
+    if not labels:
+        return ''
+    parts = []
+    for key, value in labels.items():
+        value = str(value).replace('\\', '\\\\').replace('\n', '\\n').replace('"', '\\"')
+        parts.append(f'{key}="{value}"')
+    return '{' + ','.join(parts) + '}'
+
+
+class Metrics:
+    """
+    指標登錄表（執行緒安全）
+
+    - observe_request：路由延遲與回應大小（由 create_app 的請求 hook 記錄）
+    - record_fs：檔案系統呼叫次數（由 BaseReader 在讀取目錄 / stat 時記錄）
+    - record_cache：快取命中與未命中（由 BaseReader.get_cached 記錄）
+    - add_collector：輸出時才取值的量測（快取大小、single-flight 統計等）
+    """
+
+    def __init__(self):
+        """初始化"""
+        self._lock = threading.Lock()
+        self.requests = {}      # (route, method, status) -> 次數
+        self.latency = {}       # (route, method) -> Histogram
+        self.response_size = {}  # (route, method) -> Histogram
+        self.fs_calls = {}      # op -> 次數
+        self.cache_results = {}  # (cache, result) -> 次數
+        self.collectors = {}    # 名稱 -> 量測函數
+
+    def reset(self):
+        """清除累計的請求、檔案系統與快取指標（保留量測函數）"""
+        with self._lock:
+            self.requests.clear()
+            self.latency.clear()
+            self.response_size.clear()
+            self.fs_calls.clear()
+            self.cache_results.clear()
+
+    def observe_request(self, route, method, status, seconds, size=None):
+        """
+        記錄一個請求
+
+        Args:
+            route: 路由規則（例如 /manga/api/list，避免以實際路徑產生過多標籤）
+            method: HTTP 方法
+            status: 狀態碼
+            seconds: 處理時間（秒）
+            size: 回應大小（位元組；串流回應為 None）
+        """
+        with self._lock:
+            key = (route, method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            histogram = self.latency.get((route, method))
+            if histogram is None:
+                histogram = self.latency[(route, method)] = Histogram(LATENCY_BUCKETS)
+            histogram.observe(seconds)
+            if size is not None:
+                histogram = self.response_size.get((route, method))
+                if histogram is None:
+                    histogram = self.response_size[(route, method)] = Histogram(SIZE_BUCKETS)
+                histogram.observe(size)
+
+    def record_fs(self, op, count=1):
+        """
+        記錄檔案系統呼叫
+
+        Args:
+            op: 呼叫種類（listdir / scandir / iterdir / stat）
+            count: 次數
+        """
+        with self._lock:
+            self.fs_calls[op] = self.fs_calls.get(op, 0) + count
+
+    def record_cache(self, cache, hit):
+        """
+        記錄快取查詢結果
+
+        Args:
+            cache: 快取名稱（快取鍵的前綴，例如 manifest）
+            hit: 是否命中
+        """
+        key = (cache, 'hit' if hit else 'miss')
+        with self._lock:
+            self.cache_results[key] = self.cache_results.get(key, 0) + 1
+
+    def add_collector(self, name, collector):
+        """
+        加入輸出時呼叫的量測函數（同名時取代，重新建立應用不會重複輸出）
+
+        Args:
+            name: 量測名稱
+            collector: 無參數函數，返回 [(指標名稱, 類型, 說明, [(標籤字典, 值)])]
+        """
+        self.collectors[name] = collector
+
+    def render(self):
+        """
+        輸出 Prometheus 文字格式
+
+        Returns:
+            str: 指標內容
+        """
+        families = []
+        with self._lock:
+            families.append(('reader_http_requests_total', 'counter', '請求次數', [
+                ({'route': route, 'method': method, 'status': status}, count)
+                for (route, method, status), count in sorted(self.requests.items())
+            ]))
+            families.append(self._histogram_family(
+                'reader_http_request_duration_seconds', '請求處理時間（秒）', self.latency
+            ))
+            families.append(self._histogram_family(
+                'reader_http_response_size_bytes', '回應大小（位元組，不含串流回應）', self.response_size
+            ))
+            families.append(('reader_fs_calls_total', 'counter', '檔案系統呼叫次數', [
+                ({'op': op}, count) for op, count in sorted(self.fs_calls.items())
+            ]))
+            families.append(('reader_cache_requests_total', 'counter', '快取查詢次數', [
+                ({'cache': cache, 'result': result}, count)
+                for (cache, result), count in sorted(self.cache_results.items())
+            ]))
+            ratios = []
+            for cache in sorted({cache for cache, _ in self.cache_results}):
+                hits = self.cache_results.get((cache, 'hit'), 0)
+                total = hits + self.cache_results.get((cache, 'miss'), 0)
+                ratios.append(({'cache': cache}, hits / total))
+            families.append(('reader_cache_hit_ratio', 'gauge', '快取命中率', ratios))
+
+        for collector in list(self.collectors.values()):
+            try:
+                families.extend(collector())
+            except Exception:
+                logger.exception("收集指標失敗")
+
+        lines = []
+        for name, kind, description, samples in families:
+            lines.append(f"# HELP {name} {description}")
+            lines.append(f"# TYPE {name} {kind}")
+            for labels, value in samples:
+                labels = dict(labels)
+                sample_name = labels.pop('__name__', name)  # 直方圖的 _bucket / _sum / _count
+                lines.append(f"{sample_name}{format_labels(labels)} {format_value(value)}")
+        return '\n'.join(lines) + '\n'
+
+    @staticmethod
+    def _histogram_family(name, description, histograms):
+        """直方圖轉為 _bucket / _sum / _count 樣本"""
+        samples = []
+        for (route, method), histogram in sorted(histograms.items()):
+            labels = {'route': route, 'method': method}
+            for bound, count in histogram.cumulative():
+                samples.append(({'__name__': f'{name}_bucket', **labels, 'le': bound}, count))
+            samples.append(({'__name__': f'{name}_sum', **labels}, histogram.sum))
+            samples.append(({'__name__': f'{name}_count', **labels}, histogram.count))
+        return name, 'histogram', description, samples
+
+
+# 進程共用的指標登錄表
+metrics = Metrics()
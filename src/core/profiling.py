@@ -0,0 +1,248 @@
+"""
+效能診斷工具（預設關閉，由 [debug] 設定啟用）
+
+- 單一請求的 cProfile 分析：報告存成 .prof（可用 snakeviz 等工具開啟）並可取得文字摘要
+- tracemalloc 記憶體快照：與上一次快照比較找出持續成長的配置位置，並統計各服務記憶體快取的組成
+"""
+
+import cProfile
+import io
+import ipaddress
+import pstats
+import re
+import sys
+import threading
+import time
+import tracemalloc
+from pathlib import Path
+
+
+def is_debug_request(debug_config, remote_addr, token=None):
+    """
+    判斷請求是否可使用診斷功能：本機連線，或帶有與設定相符的管理權杖
+
+    Args:
+        debug_config: 配置的 debug 區段
+        remote_addr: 用戶端位址
+        token: 請求帶的權杖（X-Debug-Token 標頭）
+
+    Returns:
+        bool: 是否允許
+    """
+    admin_token = debug_config.get('token')
+    if admin_token and token == admin_token:
+        return True
+    try:
+        return ipaddress.ip_address(remote_addr or '').is_loopback
+    except ValueError:
+        return False
+
+
+class ProfileStore:
+    """
+    cProfile 報告儲存
+    同一時間只分析一個請求（cProfile 無法多個同時啟用），只保留最近的報告
+    """
+
+    # 報告名稱只允許的字元（避免路徑穿越）
+    NAME_PATTERN = re.compile(r'^[\w.-]+\.prof$')
+
+    def __init__(self, directory, keep=20, sort='cumulative', limit=40):
+        """
+        初始化
+
+        Args:
+            directory: 報告目錄
+            keep: 最多保留的報告數
+            sort: 文字摘要的排序欄位（pstats 排序鍵）
+            limit: 文字摘要列出的函數數
+        """
+        self.directory = Path(directory)
+        self.keep = keep
+        self.sort = sort
+        self.limit = limit
+        self._busy = threading.Lock()
+
+    def start(self):
+        """
+        開始分析目前執行緒
+
+        Returns:
+            cProfile.Profile: 分析器；已有其他請求在分析時返回 None
+        """
+        if not self._busy.acquire(blocking=False):
+            return None
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:  # 其他分析工具已啟用
+            self._busy.release()
+            return None
+        return profiler
+
+    def stop(self, profiler, label):
+        """
+        結束分析並儲存報告
+
+        Args:
+            profiler: start 返回的分析器
+            label: 報告標籤（例如路由名稱）
+
+        Returns:
+            str: 報告名稱
+        """
+        try:
+            profiler.disable()
+        finally:
+            self._busy.release()
+
+        safe_label = re.sub(r'[^\w-]+', '_', label).strip('_')[:60] or 'request'
+        name = f"{time.strftime('%Y%m%d-%H%M%S')}-{int(time.time() * 1000) % 1000:03d}-{safe_label}.prof"
+        self.directory.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(self.directory / name))
+        self._prune()
+        return name
+
+    def _prune(self):
+        """刪除超過保留數量的舊報告"""
+        reports = sorted(self.directory.glob('*.prof'))
+        for path in reports[:-self.keep]:
+            try:
+                path.unlink()
+            except OSError:
+                pass
+
+    def list(self):
+        """
+        Returns:
+            list: 報告名稱（新的在前）
+        """
+        if not self.directory.exists():
+            return []
+        return sorted((path.name for path in self.directory.glob('*.prof')), reverse=True)
+
+    def render(self, name, sort=None, limit=None):
+        """
+        產生報告的文字摘要
+
+        Args:
+            name: 報告名稱
+            sort: 排序欄位（預設為初始化時的設定）
+            limit: 列出的函數數
+
+        Returns:
+            str: 摘要；報告不存在時返回 None
+        """
+        if not self.NAME_PATTERN.match(name):
+            return None
+        path = self.directory / name
+        if not path.exists():
+            return None
+        output = io.StringIO()
+        stats = pstats.Stats(str(path), stream=output)
+        stats.strip_dirs().sort_stats(sort or self.sort).print_stats(limit or self.limit)
+        return output.getvalue()
+
+
+def deep_sizeof(value, seen=None):
+    """
+    估計物件（含內部 dict / list / tuple / set）的記憶體大小
+
+    Returns:
+        int: 位元組數
+    """
+    if seen is None:
+        seen = set()
+    if id(value) in seen:
+        return 0
+    seen.add(id(value))
+    size = sys.getsizeof(value)
+    if isinstance(value, dict):
+        size += sum(deep_sizeof(k, seen) + deep_sizeof(v, seen) for k, v in value.items())
+    elif isinstance(value, (list, tuple, set, frozenset)):
+        size += sum(deep_sizeof(item, seen) for item in value)
+    return size
+
+
+def summarize_cache(cache):
+    """
+    統計記憶體快取的組成（依快取鍵前綴分組）
+
+    Args:
+        cache: BaseReader.cache
+
+    Returns:
+        dict: {前綴: {'entries': 項目數, 'bytes': 估計大小}}
+    """
+    summary = {}
+    for key, value in list(cache.items()):
+        group = summary.setdefault(str(key).split('_', 1)[0], {'entries': 0, 'bytes': 0})
+        group['entries'] += 1
+        group['bytes'] += deep_sizeof(key) + deep_sizeof(value)
+    return summary
+
+
+class MemoryTracker:
+    """
+    tracemalloc 快照比較
+    第一次取快照時才開始追蹤（追蹤會增加記憶體與 CPU 負擔），之後每次與上一次快照比較
+    """
+
+    def __init__(self, frames=1):
+        """
+        初始化
+
+        Args:
+            frames: 每個配置記錄的呼叫堆疊深度
+        """
+        self.frames = frames
+        self._previous = None
+        self._lock = threading.Lock()
+
+    def snapshot(self, limit=20):
+        """
+        取得快照並與上一次比較
+
+        Args:
+            limit: 列出的配置位置數
+
+        Returns:
+            dict: {'tracing', 'current_bytes', 'peak_bytes', 'top', 'growth'}
+        """
+        with self._lock:
+            if not tracemalloc.is_tracing():
+                tracemalloc.start(self.frames)
+            snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, '<frozen importlib._bootstrap>'),
+            ))
+            current, peak = tracemalloc.get_traced_memory()
+
+            top = [
+                {'location': str(stat.traceback), 'bytes': stat.size, 'count': stat.count}
+                for stat in snapshot.statistics('lineno')[:limit]
+            ]
+            growth = []
+            if self._previous is not None:
+                growth = [
+                    {'location': str(stat.traceback), 'bytes': stat.size, 'bytes_diff': stat.size_diff,
+                     'count_diff': stat.count_diff}
+                    for stat in snapshot.compare_to(self._previous, 'lineno')[:limit]
+                    if stat.size_diff
+                ]
+            self._previous = snapshot
+
+        return {
+            'tracing': True,
+            'current_bytes': current,
+            'peak_bytes': peak,
+            'top': top,
+            'growth': growth
+        }
+
+    def stop(self):
+        """停止追蹤並清除快照"""
+        with self._lock:
+            self._previous = None
+            if tracemalloc.is_tracing():
+                tracemalloc.stop()
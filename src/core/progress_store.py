@@ -0,0 +1,220 @@
+"""
+閱讀進度模組
+記錄每個章節最後閱讀的頁碼，以及每部作品最後閱讀的章節
+
+閱讀器滾動時會頻繁回報進度，因此更新只寫入記憶體，
+由背景計時器批次寫回檔案（寫入合併），多 worker 時以檔案鎖合併彼此的進度
+"""
+
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+from pathlib import Path
+from typing import Dict, Optional
+
+from .file_lock import FileLock
+
+logger = logging.getLogger(__name__)
+
+
+class ProgressStore:
+    """閱讀進度儲存"""
+
+    def __init__(self, storage_path: str = "./data/progress.json", flush_interval: float = 5.0,
+                 lock_timeout: float = 10.0):
+        """
+        初始化閱讀進度儲存
+
+        Args:
+            storage_path: JSON 儲存檔案路徑
+            flush_interval: 批次寫回檔案的間隔秒數
+            lock_timeout: 取得跨進程檔案鎖的最長等待秒數
+        """
+        self.storage_path = Path(storage_path)
+        self.flush_interval = flush_interval
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(self.storage_path.with_name(self.storage_path.name + '.lock'),
+                                   timeout=lock_timeout)
+        self._file_signature = None
+        self._dirty = {}  # {(category, chapter_path): 進度記錄}，尚未寫回的更新
+        self._timer = None
+        self.data = self._load()
+
+    # ------------------------------------------------------------------
+    # 檔案讀寫
+    # ------------------------------------------------------------------
+
+    def _get_file_signature(self):
+        """獲取進度檔案簽章，用於判斷是否被其他進程修改"""
+        try:
+            stat = os.stat(self.storage_path)
+            return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except OSError:
+            return None
+
+    def _read_file(self) -> Dict:
+        """讀取進度檔案，失敗時返回空結構"""
+        self._file_signature = self._get_file_signature()
+        if not self.storage_path.exists():
+            return {}
+        try:
+            with open(self.storage_path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except Exception as e:
+            logger.warning("載入進度檔案失敗: %s", e)
+            return {}
+
+    def _load(self) -> Dict:
+        """載入進度資料，並套用尚未寫回的本地更新"""
+        data = self._read_file()
+        for (category, chapter_path), record in self._dirty.items():
+            self._merge_record(data, category, chapter_path, record)
+        return data
+
+    def _reload_if_changed(self):
+        """檔案簽章改變時重新載入"""
+        if self._get_file_signature() != self._file_signature:
+            self.data = self._load()
+
+    def _write_file(self, data: Dict):
+        """寫入暫存檔後原子替換"""
+        self.storage_path.parent.mkdir(parents=True, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(
+            prefix=self.storage_path.name + '.',
+            suffix='.tmp',
+            dir=str(self.storage_path.parent)
+        )
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                json.dump(data, f, ensure_ascii=False)
+            os.replace(tmp_path, self.storage_path)
+        except Exception:
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            raise
+        self._file_signature = self._get_file_signature()
+
+    @staticmethod
+    def _merge_record(data: Dict, category: str, chapter_path: str, record: Dict):
+        """把一筆章節進度合併進資料（較新的記錄優先）"""
+        category_data = data.setdefault(category, {'chapters': {}, 'works': {}})
+        chapters = category_data.setdefault('chapters', {})
+        works = category_data.setdefault('works', {})
+
+        current = chapters.get(chapter_path)
+        if current is None or current.get('updated_at', 0) <= record['updated_at']:
+            chapters[chapter_path] = record
+
+        work = chapter_path.split('/', 1)[0]
+        current_work = works.get(work)
+        if current_work is None or current_work.get('updated_at', 0) <= record['updated_at']:
+            works[work] = {'chapter': chapter_path, 'updated_at': record['updated_at']}
+
+    def flush(self):
+        """
+        把記憶體中的更新批次寫回檔案
+
+        Returns:
+            int: 寫回的記錄數
+        """
+        with self._lock:
+            if self._timer is not None:
+                self._timer.cancel()
+                self._timer = None
+            if not self._dirty:
+                return 0
+
+            pending = self._dirty
+            try:
+                with self._file_lock:
+                    # 鎖內重新讀取檔案，合併其他 worker 的進度後再寫入
+                    data = self._read_file()
+                    for (category, chapter_path), record in pending.items():
+                        self._merge_record(data, category, chapter_path, record)
+                    self._write_file(data)
+            except Exception:
+                logger.exception("儲存進度檔案失敗")
+                self._schedule_flush()
+                return 0
+
+            self._dirty = {}
+            self.data = data
+            return len(pending)
+
+    def _schedule_flush(self):
+        """啟動批次寫回計時器（已有計時器時不重複啟動）"""
+        if self._timer is None:
+            self._timer = threading.Timer(self.flush_interval, self.flush)
+            self._timer.daemon = True
+            self._timer.start()
+
+    # ------------------------------------------------------------------
+    # 公開介面
+    # ------------------------------------------------------------------
+
+    def set_progress(self, category: str, chapter_path: str, page: int, total: Optional[int] = None) -> Dict:
+        """
+        記錄章節閱讀進度（只寫入記憶體，稍後批次寫回）
+
+        Args:
+            category: 類別 (manga/gallery)
+            chapter_path: 章節路徑（相對路徑）
+            page: 目前頁碼（從1開始）
+            total: 章節總頁數（可選）
+
+        Returns:
+            dict: 儲存的進度記錄
+        """
+        record = {'page': max(1, int(page)), 'updated_at': time.time()}
+        if total is not None:
+            record['total'] = int(total)
+
+        with self._lock:
+            self._dirty[(category, chapter_path)] = record
+            self._merge_record(self.data, category, chapter_path, record)
+            self._schedule_flush()
+        return record
+
+    def get_progress(self, category: str, chapter_path: str) -> Optional[Dict]:
+        """
+        獲取章節閱讀進度
+
+        Args:
+            category: 類別 (manga/gallery)
+            chapter_path: 章節路徑（相對路徑）
+
+        Returns:
+            dict: {'page', 'total', 'updated_at'}，沒有記錄時返回 None
+        """
+        with self._lock:
+            self._reload_if_changed()
+            return self.data.get(category, {}).get('chapters', {}).get(chapter_path)
+
+    def get_continue_point(self, category: str, work_path: str) -> Optional[Dict]:
+        """
+        獲取作品的「繼續閱讀」位置
+
+        Args:
+            category: 類別 (manga/gallery)
+            work_path: 作品路徑（資料夾名稱）
+
+        Returns:
+            dict: {'chapter', 'page', 'total', 'updated_at'}，沒有記錄時返回 None
+        """
+        with self._lock:
+            self._reload_if_changed()
+            category_data = self.data.get(category, {})
+            work = category_data.get('works', {}).get(work_path)
+            if not work:
+                return None
+
+            chapter = category_data.get('chapters', {}).get(work['chapter'], {})
+            return {
+                'chapter': work['chapter'],
+                'page': chapter.get('page', 1),
+                'total': chapter.get('total'),
+                'updated_at': work['updated_at']
+            }
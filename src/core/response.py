@@ -0,0 +1,154 @@
+"""
+JSON 回應工具
+兩個 Blueprint 共用的 JSON 回應：可選用 orjson 加速序列化，
+並依 Accept-Encoding 協商 brotli / gzip 壓縮（大型章節圖片列表含大量重複路徑，壓縮率很高）；
+以及整庫匯出用的 NDJSON 串流回應
+"""
+
+import gzip
+import json
+
+from flask import Response, request, stream_with_context
+
+try:
+    import orjson
+except ImportError:  # 選用相依套件
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # 選用相依套件
+    brotli = None
+
+
+# 回應設定（由 app.py 呼叫 configure_responses 覆寫）
+response_config = {
+    'compression': True,          # 是否壓縮 JSON 回應
+    'compression_min_bytes': 1024,  # 小於此大小不壓縮（壓縮收益不足以抵銷成本）
+    'gzip_level': 5,
+    'brotli_quality': 4
+}
+
+
+def configure_responses(config=None):
+    """
+    套用回應設定
+
+    Args:
+        config: performance 設定字典（json_compression、compression_min_bytes）
+    """
+    if not config:
+        return
+    if 'json_compression' in config:
+        response_config['compression'] = bool(config['json_compression'])
+    if 'compression_min_bytes' in config:
+        response_config['compression_min_bytes'] = int(config['compression_min_bytes'])
+
+
+def dumps_json(data):
+    """
+    序列化為 UTF-8 JSON（有 orjson 時使用 orjson）
+
+    Args:
+        data: 可序列化的資料
+
+    Returns:
+        bytes: JSON 位元組
+    """
+    if orjson is not None:
+        return orjson.dumps(data)
+    return json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+
+
+def choose_encoding(accept_encoding):
+    """
+    依 Accept-Encoding 選擇壓縮格式（優先 brotli，其次 gzip）
+
+    Args:
+        accept_encoding: Accept-Encoding 標頭值
+
+    Returns:
+        str: 'br'、'gzip' 或 None
+    """
+    accepted = {}
+    for part in (accept_encoding or '').split(','):
+        token, _, params = part.strip().partition(';')
+        token = token.strip().lower()
+        if not token:
+            continue
+        quality = 1.0
+        params = params.strip()
+        if params.startswith('q='):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[token] = quality
+
+    if brotli is not None and accepted.get('br', 0) > 0:
+        return 'br'
+    if accepted.get('gzip', 0) > 0:
+        return 'gzip'
+    return None
+
+
+def compress_body(body, encoding):
+    """以指定格式壓縮回應內容"""
+    if encoding == 'br':
+        return brotli.compress(body, quality=response_config['brotli_quality'])
+    return gzip.compress(body, compresslevel=response_config['gzip_level'])
+
+
+def json_response(data, status=200, headers=None):
+    """
+    建立 JSON 回應（取代 jsonify）
+
+    Args:
+        data: 可序列化的資料
+        status: HTTP 狀態碼
+        headers: 額外的回應標頭
+
+    Returns:
+        Response: Flask 回應物件
+    """
+    body = dumps_json(data)
+    response = Response(body, status=status, mimetype='application/json')
+    if headers:
+        response.headers.update(headers)
+
+    if not response_config['compression']:
+        return response
+
+    # 不論是否壓縮，快取都需依 Accept-Encoding 區分
+    response.vary.add('Accept-Encoding')
+    if len(body) < response_config['compression_min_bytes']:
+        return response
+
+    encoding = choose_encoding(request.headers.get('Accept-Encoding'))
+    if encoding:
+        response.set_data(compress_body(body, encoding))
+        response.headers['Content-Encoding'] = encoding
+    return response
+
+
+def ndjson_response(records, filename=None):
+    """
+    建立 NDJSON 串流回應（每筆記錄一行 JSON，邊產生邊送出）
+
+    Args:
+        records: 產生字典記錄的可迭代物件（通常為產生器）
+        filename: 下載檔名（可選，設定 Content-Disposition）
+
+    Returns:
+        Response: 串流回應
+    """
+    def generate():
+        for record in records:
+            yield dumps_json(record) + b'\n'
+
+    response = Response(stream_with_context(generate()), mimetype='application/x-ndjson')
+    response.headers['Cache-Control'] = 'no-cache'
+    response.headers['X-Accel-Buffering'] = 'no'  # 避免反向代理緩衝
+    if filename:
+        response.headers['Content-Disposition'] = f'attachment; filename="{filename}"'
+    return response
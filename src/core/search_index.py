@@ -0,0 +1,214 @@
+"""
+名稱搜尋索引
+以 trigram（三字元組）倒排索引支援作品名稱的子字串與前綴搜尋
+"""
+
+import bisect
+import threading
+import unicodedata
+
+
+def normalize_text(text):
+    """
+    搜尋用正規化：NFKC（全形轉半形、相容字元合併）後做 casefold
+
+    Args:
+        text: 原始字串
+
+    Returns:
+        str: 正規化後的字串
+    """
+    return unicodedata.normalize('NFKC', text).casefold()
+
+
+class NgramIndex:
+    """
+    Trigram 倒排索引
+
+    - 長度 >= 3 的查詢：取查詢的所有 trigram，交集倒排列表後再驗證子字串
+    - 長度 1~2 的查詢（中日韓文常見）：在所有名稱串接成的單一字串上以 str.find 掃描，
+      仍是 C 層級速度，不需為短查詢額外建立 bigram / unigram 索引
+    - 名稱增刪時增量更新倒排列表
+    - 每筆項目以唯一鍵識別，可另外指定被搜尋的文字（例如以章節路徑為鍵、章節名稱為文字）
+    """
+
+    GRAM_SIZE = 3
+    # 名稱之間的分隔字元（正規化後的名稱不會包含）
+    SEPARATOR = '\x00'
+
+    def __init__(self):
+        """初始化索引"""
+        self._lock = threading.RLock()
+        self._ids = {}         # 鍵 -> id
+        self._names = {}       # id -> 鍵
+        self._normalized = {}  # id -> 正規化文字
+        self._postings = {}    # trigram -> id 集合
+        self._next_id = 0
+
+        # 短查詢用的串接字串（名稱變動時延遲重建）
+        self._blob = None
+        self._blob_offsets = []
+        self._blob_ids = []
+
+    def __len__(self):
+        return len(self._ids)
+
+    def _grams(self, text):
+        """獲取字串的所有 trigram"""
+        size = self.GRAM_SIZE
+        return {text[i:i + size] for i in range(len(text) - size + 1)}
+
+    def add(self, name, text=None):
+        """
+        加入項目（已存在時忽略）
+
+        Args:
+            name: 項目鍵
+            text: 被搜尋的文字（預設為鍵本身）
+        """
+        with self._lock:
+            if name in self._ids:
+                return
+            item_id = self._next_id
+            self._next_id += 1
+            normalized = normalize_text(name if text is None else text)
+
+            self._ids[name] = item_id
+            self._names[item_id] = name
+            self._normalized[item_id] = normalized
+            for gram in self._grams(normalized):
+                self._postings.setdefault(gram, set()).add(item_id)
+            self._blob = None
+
+    def remove(self, name):
+        """移除名稱（不存在時忽略）"""
+        with self._lock:
+            item_id = self._ids.pop(name, None)
+            if item_id is None:
+                return
+            del self._names[item_id]
+            normalized = self._normalized.pop(item_id)
+            for gram in self._grams(normalized):
+                postings = self._postings.get(gram)
+                if postings is not None:
+                    postings.discard(item_id)
+                    if not postings:
+                        del self._postings[gram]
+            self._blob = None
+
+    def update(self, added=(), removed=()):
+        """
+        批次增刪項目
+
+        Args:
+            added: 新增的鍵，或 {鍵: 被搜尋的文字} 字典
+            removed: 移除的鍵
+        """
+        with self._lock:
+            for name in removed:
+                self.remove(name)
+            if isinstance(added, dict):
+                for name, text in added.items():
+                    self.add(name, text)
+            else:
+                for name in added:
+                    self.add(name)
+
+    def _build_blob(self):
+        """重建短查詢用的串接字串與位移表"""
+        offsets = []
+        ids = []
+        parts = []
+        position = 0
+        for item_id, normalized in self._normalized.items():
+            offsets.append(position)
+            ids.append(item_id)
+            parts.append(normalized)
+            position += len(normalized) + 1
+        self._blob = self.SEPARATOR.join(parts)
+        self._blob_offsets = offsets
+        self._blob_ids = ids
+
+    def _scan_short(self, query):
+        """在串接字串中掃描短查詢，返回符合的 id 集合"""
+        if self._blob is None:
+            self._build_blob()
+        blob = self._blob
+        offsets = self._blob_offsets
+        matches = set()
+        start = blob.find(query)
+        while start != -1:
+            index = bisect.bisect_right(offsets, start) - 1
+            matches.add(self._blob_ids[index])
+            # 同一名稱只需記一次，直接跳到下一個名稱
+            next_start = offsets[index + 1] if index + 1 < len(offsets) else len(blob)
+            start = blob.find(query, next_start)
+        return matches
+
+    def _candidates(self, query):
+        """獲取包含查詢字串的 id 集合"""
+        if len(query) < self.GRAM_SIZE:
+            return self._scan_short(query)
+
+        postings = []
+        for gram in self._grams(query):
+            ids = self._postings.get(gram)
+            if not ids:
+                return set()
+            postings.append(ids)
+
+        # 從最短的倒排列表開始交集
+        postings.sort(key=len)
+        result = set(postings[0])
+        for ids in postings[1:]:
+            result &= ids
+            if not result:
+                return result
+
+        return {item_id for item_id in result if query in self._normalized[item_id]}
+
+    def search(self, query, prefix=False, limit=None, sort_key=None):
+        """
+        搜尋名稱並依相關度排序
+
+        排序：完全相符 > 前綴相符 > 單字開頭相符 > 其他子字串，
+        同級再依出現位置、名稱長度、名稱排序鍵排序
+
+        Args:
+            query: 搜尋字串
+            prefix: 是否只返回前綴相符的結果
+            limit: 最多返回筆數（None 表示全部）
+            sort_key: 同分時的鍵排序函數
+
+        Returns:
+            list: 依相關度排序的鍵列表
+        """
+        query = normalize_text(query).replace(self.SEPARATOR, '').strip()
+        if not query:
+            return []
+
+        with self._lock:
+            scored = []
+            for item_id in self._candidates(query):
+                normalized = self._normalized[item_id]
+                position = normalized.find(query)
+                if prefix and position != 0:
+                    continue
+
+                if normalized == query:
+                    rank = 0
+                elif position == 0:
+                    rank = 1
+                elif not normalized[position - 1].isalnum():
+                    rank = 2
+                else:
+                    rank = 3
+                scored.append((rank, position, len(normalized), self._names[item_id]))
+
+        if sort_key:
+            scored.sort(key=lambda item: (item[0], item[1], item[2], sort_key(item[3])))
+        else:
+            scored.sort()
+
+        names = [item[3] for item in scored]
+        return names[:limit] if limit is not None else names
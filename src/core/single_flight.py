@@ -0,0 +1,76 @@
+"""
+Single-flight 請求合併
+同一個鍵同時有多個請求時只執行一次計算，其餘請求等待並共用結果
+（例如多個分頁同時開啟同一章節、多個用戶端同時載入冷快取的列表頁）
+"""
+
+import threading
+
+
+class _Call:
+    """進行中的計算"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """
+    以鍵合併並行的計算
+
+    - 第一個請求執行計算，計算期間到達的同鍵請求等待同一個結果（例外也一併拋出）
+    - 計算完成後立即移除記錄，之後的請求會重新計算（結果的快取由呼叫端負責）
+    - 共用的結果不應被呼叫端修改
+    """
+
+    def __init__(self):
+        """初始化"""
+        self._lock = threading.Lock()
+        self._calls = {}
+        self.executed = 0   # 實際執行的計算次數
+        self.coalesced = 0  # 等待其他請求結果的次數
+
+    def do(self, key, fn, *args, **kwargs):
+        """
+        執行計算（同鍵已有進行中的計算時等待其結果）
+
+        Args:
+            key: 合併用的鍵
+            fn: 計算函數
+            *args, **kwargs: 傳給計算函數的參數
+
+        Returns:
+            計算結果
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+                self.executed += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+
+        try:
+            call.result = fn(*args, **kwargs)
+            return call.result
+        except BaseException as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                self._calls.pop(key, None)
+            call.done.set()
+
+    def in_flight(self):
+        """進行中的計算數"""
+        with self._lock:
+            return len(self._calls)
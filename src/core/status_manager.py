@@ -4,8 +4,17 @@
 """
 
 import json
+import logging
+import os
+import tempfile
+import threading
+from contextlib import contextmanager
 from pathlib import Path
-from typing import Dict, List
+from typing import Dict, List, Optional, Tuple
+
+from .file_lock import FileLock
+
+logger = logging.getLogger(__name__)
 
 
 class StatusManager:
@@ -20,18 +29,82 @@ class StatusManager:
     CATEGORY_MANGA = "manga"
     CATEGORY_GALLERY = "gallery"
     
-    def __init__(self, storage_path: str = "./data/status.json"):
+    def __init__(self, storage_path: str = "./data/status.json", lock_timeout: float = 10.0):
         """
         初始化狀態管理器
         
+        多 worker 部署時，每個進程各自持有一份 self.data：
+        - 寫入時以旁路 .lock 檔案做跨進程互斥，並在鎖內先重新讀取最新檔案再修改
+        - 讀取時比對檔案簽章（mtime/size/inode），有變動才重新載入
+        - 進程內以 RLock 保護，適用多執行緒伺服器
+        
         Args:
             storage_path: JSON 儲存檔案路徑
+            lock_timeout: 取得跨進程檔案鎖的最長等待秒數
         """
         self.storage_path = Path(storage_path)
+        self.lock_path = self.storage_path.with_name(self.storage_path.name + '.lock')
+        self._lock = threading.RLock()
+        self._file_lock = FileLock(self.lock_path, timeout=lock_timeout)
+        self._file_signature = None
+        self._listeners = []
         self.data = self._load()
     
+    def add_listener(self, callback):
+        """
+        註冊狀態事件監聽器
+        
+        事件格式：
+        - {'type': 'status', 'category', 'path', 'old_status', 'status'}：單一項目狀態變更
+        - {'type': 'reload'}：偵測到其他進程修改檔案，所有狀態都可能改變
+        
+        Args:
+            callback: 接收事件字典的函數
+        """
+        if callback not in self._listeners:
+            self._listeners.append(callback)
+    
+    def _notify(self, event: Dict):
+        """通知所有監聽器（監聽器錯誤不影響狀態操作）"""
+        for callback in list(self._listeners):
+            try:
+                callback(event)
+            except Exception:
+                logger.exception("狀態事件處理失敗")
+    
+    def _get_file_signature(self) -> Optional[Tuple[int, int, int]]:
+        """獲取狀態檔案簽章，用於判斷是否被其他進程修改"""
+        try:
+            stat = os.stat(self.storage_path)
+            return (stat.st_mtime_ns, stat.st_size, stat.st_ino)
+        except OSError:
+            return None
+    
+    def _reload_if_changed(self) -> bool:
+        """
+        檔案簽章改變時重新載入（每次僅一次 stat，成本很低）
+        
+        呼叫端需持有 self._lock；reload 事件由呼叫端在釋放鎖之後發出，
+        避免監聽器在持鎖期間回呼 set_status 或阻塞其他進程
+        
+        Returns:
+            是否重新載入
+        """
+        if self._get_file_signature() != self._file_signature:
+            self.data = self._load()
+            return True
+        return False
+    
+    def refresh(self):
+        """檢查狀態檔案是否被其他進程修改，有則重新載入並發出 reload 事件"""
+        with self._lock:
+            reloaded = self._reload_if_changed()
+        if reloaded:
+            self._notify({'type': 'reload'})
+    
     def _load(self) -> Dict:
         """載入狀態資料"""
+        self._file_signature = self._get_file_signature()
         if self.storage_path.exists():
             try:
                 with open(self.storage_path, 'r', encoding='utf-8') as f:
@@ -45,7 +118,7 @@ class StatusManager:
                                 data[category][self.STATUS_REVIEWED] = []
                     return data
             except Exception as e:
-                print(f"載入狀態檔案失敗: {e}")
+                logger.warning("載入狀態檔案失敗: %s", e)
                 return self._get_empty_structure()
         else:
             return self._get_empty_structure()
@@ -64,15 +137,64 @@ class StatusManager:
         }
     
     def _save(self):
-        """儲存狀態資料"""
+        """儲存狀態資料（寫入暫存檔後原子替換，其他進程不會讀到寫一半的檔案）"""
         try:
             # 確保目錄存在
             self.storage_path.parent.mkdir(parents=True, exist_ok=True)
             
-            with open(self.storage_path, 'w', encoding='utf-8') as f:
-                json.dump(self.data, f, ensure_ascii=False, indent=2)
-        except Exception as e:
-            print(f"儲存狀態檔案失敗: {e}")
+            fd, tmp_path = tempfile.mkstemp(
+                prefix=self.storage_path.name + '.',
+                suffix='.tmp',
+                dir=str(self.storage_path.parent)
+            )
+            try:
+                with os.fdopen(fd, 'w', encoding='utf-8') as f:
+                    json.dump(self.data, f, ensure_ascii=False, indent=2)
+                os.replace(tmp_path, self.storage_path)
+            except Exception:
+                if os.path.exists(tmp_path):
+                    os.remove(tmp_path)
+                raise
+            
+            self._file_signature = self._get_file_signature()
+        except Exception:
+            logger.exception("儲存狀態檔案失敗")
+    
+    @contextmanager
+    def _transaction(self):
+        """
+        寫入交易：進程內鎖 + 跨進程檔案鎖，鎖內先同步最新檔案再修改並儲存
+        
+        鎖內重新載入時，reload 事件在兩個鎖都釋放後才發出
+        
+        Yields:
+            Dict: 可直接修改的狀態資料
+        """
+        reloaded = False
+        try:
+            with self._lock:
+                with self._file_lock:
+                    reloaded = self._reload_if_changed()
+                    yield self.data
+                    self._save()
+        finally:
+            if reloaded:
+                self._notify({'type': 'reload'})
+    
+    def _lookup_status(self, category: str, item_path: str) -> str:
+        """依目前記憶體中的資料查詢狀態（呼叫端需持有 self._lock）"""
+        category_data = self.data.get(category)
+        if category_data is None:
+            return self.STATUS_UNREVIEWED
+        
+        # 優先檢查是否收藏
+        if item_path in category_data.get(self.STATUS_FAVORITE, []):
+            return self.STATUS_FAVORITE
+        elif item_path in category_data.get(self.STATUS_REVIEWED, []):
+            return self.STATUS_REVIEWED
+        else:
+            # 不在任何列表中，視為未審核
+            return self.STATUS_UNREVIEWED
     
     def get_status(self, category: str, item_path: str) -> str:
         """
@@ -88,19 +210,9 @@ class StatusManager:
             - reviewed: 在 reviewed 列表中
             - unreviewed: 不在任何列表中（虛擬狀態）
         """
-        if category not in self.data:
-            return self.STATUS_UNREVIEWED
-        
-        category_data = self.data[category]
-        
-        # 優先檢查是否收藏
-        if item_path in category_data.get(self.STATUS_FAVORITE, []):
-            return self.STATUS_FAVORITE
-        elif item_path in category_data.get(self.STATUS_REVIEWED, []):
-            return self.STATUS_REVIEWED
-        else:
-            # 不在任何列表中，視為未審核
-            return self.STATUS_UNREVIEWED
+        self.refresh()
+        with self._lock:
+            return self._lookup_status(category, item_path)
     
     def set_status(self, category: str, item_path: str, status: str) -> bool:
         """
@@ -114,29 +226,39 @@ class StatusManager:
         Returns:
             是否設定成功
         """
-        if category not in self.data:
-            self.data[category] = {
-                self.STATUS_FAVORITE: [],
-                self.STATUS_REVIEWED: []
-            }
-        
-        category_data = self.data[category]
-        
-        # 從所有狀態列表中移除
-        for status_key in [self.STATUS_FAVORITE, self.STATUS_REVIEWED]:
-            if status_key in category_data and item_path in category_data[status_key]:
-                category_data[status_key].remove(item_path)
-        
-        # 添加到新狀態（unreviewed 不需要添加，因為是虛擬狀態）
-        if status == self.STATUS_FAVORITE:
-            if item_path not in category_data[self.STATUS_FAVORITE]:
-                category_data[self.STATUS_FAVORITE].append(item_path)
-        elif status == self.STATUS_REVIEWED:
-            if item_path not in category_data[self.STATUS_REVIEWED]:
-                category_data[self.STATUS_REVIEWED].append(item_path)
-        # unreviewed 狀態：從所有列表中移除（已在上面完成）
+        try:
+            with self._transaction() as data:
+                if category not in data:
+                    data[category] = {
+                        self.STATUS_FAVORITE: [],
+                        self.STATUS_REVIEWED: []
+                    }
+                
+                category_data = data[category]
+                old_status = self._lookup_status(category, item_path)
+                
+                # 從所有狀態列表中移除
+                for status_key in [self.STATUS_FAVORITE, self.STATUS_REVIEWED]:
+                    if status_key in category_data and item_path in category_data[status_key]:
+                        category_data[status_key].remove(item_path)
+                
+                # 添加到新狀態（unreviewed 不需要添加，因為是虛擬狀態）
+                if status == self.STATUS_FAVORITE:
+                    category_data.setdefault(self.STATUS_FAVORITE, []).append(item_path)
+                elif status == self.STATUS_REVIEWED:
+                    category_data.setdefault(self.STATUS_REVIEWED, []).append(item_path)
+                # unreviewed 狀態：從所有列表中移除（已在上面完成）
+        except TimeoutError as e:
+            logger.warning("設定狀態失敗: %s", e)
+            return False
         
-        self._save()
+        self._notify({
+            'type': 'status',
+            'category': category,
+            'path': item_path,
+            'old_status': old_status,
+            'status': status
+        })
         return True
     
     def get_items_by_status(self, category: str, status: str) -> List[str]:
@@ -150,20 +272,43 @@ class StatusManager:
         Returns:
             項目路徑列表
         """
-        if category not in self.data:
-            return []
+        self.refresh()
+        with self._lock:
+            if category not in self.data:
+                return []
+            
+            category_data = self.data[category]
+            
+            if status == self.STATUS_FAVORITE:
+                return list(category_data.get(self.STATUS_FAVORITE, []))
+            elif status == self.STATUS_REVIEWED:
+                return list(category_data.get(self.STATUS_REVIEWED, []))
+            elif status == self.STATUS_UNREVIEWED:
+                # unreviewed 是虛擬狀態，需要在外部判斷
+                return []
+            else:
+                return []
+    
+    def get_status_counts(self, category: str) -> Dict[str, int]:
+        """
+        獲取某類別各狀態列表的項目數量
         
-        category_data = self.data[category]
+        注意：這是狀態檔案中的記錄數（可能包含已刪除的作品或章節路徑），
+        對應作品庫的實際數量請使用 LibraryIndex.get_status_counts
         
-        if status == self.STATUS_FAVORITE:
-            return category_data.get(self.STATUS_FAVORITE, [])
-        elif status == self.STATUS_REVIEWED:
-            return category_data.get(self.STATUS_REVIEWED, [])
-        elif status == self.STATUS_UNREVIEWED:
-            # unreviewed 是虛擬狀態，需要在外部判斷
-            return []
-        else:
-            return []
+        Args:
+            category: 類別 (manga/gallery)
+            
+        Returns:
+            狀態到數量的映射字典
+        """
+        self.refresh()
+        with self._lock:
+            category_data = self.data.get(category, {})
+            return {
+                self.STATUS_FAVORITE: len(category_data.get(self.STATUS_FAVORITE, [])),
+                self.STATUS_REVIEWED: len(category_data.get(self.STATUS_REVIEWED, []))
+            }
     
     def filter_by_status(self, category: str, items: List, status: str) -> List:
         """
@@ -199,18 +344,20 @@ class StatusManager:
         Returns:
             項目路徑到狀態的映射字典
         """
-        if category not in self.data:
-            return {}
-        
-        status_map = {}
-        category_data = self.data[category]
-        
-        # 收藏
-        for item in category_data.get(self.STATUS_FAVORITE, []):
-            status_map[item] = self.STATUS_FAVORITE
-        
-        # 已審核
-        for item in category_data.get(self.STATUS_REVIEWED, []):
-            status_map[item] = self.STATUS_REVIEWED
-        
-        return status_map
+        self.refresh()
+        with self._lock:
+            if category not in self.data:
+                return {}
+            
+            status_map = {}
+            category_data = self.data[category]
+            
+            # 收藏
+            for item in category_data.get(self.STATUS_FAVORITE, []):
+                status_map[item] = self.STATUS_FAVORITE
+            
+            # 已審核
+            for item in category_data.get(self.STATUS_REVIEWED, []):
+                status_map[item] = self.STATUS_REVIEWED
+            
+            return status_map
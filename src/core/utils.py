@@ -2,6 +2,8 @@
 共用工具函數
 """
 
+import base64
+import json
 import os
 import urllib.parse
 from pathlib import Path
@@ -49,3 +51,47 @@ def formatPathForUrl(path_obj):
     # 將路徑轉換為字符串並統一使用正斜線
     path_str = str(path_obj).replace(os.sep, '/')
     return path_str
+
+
+def encodeCursor(data):
+    """
+    將分頁位置編碼為不透明的游標字串（URL 安全的 base64）
+    
+    Args:
+        data: 游標內容字典，例如 {'after': 上一頁最後一個名稱, 'value': 排序欄位值} 或 {'offset': 位移}
+        
+    Returns:
+        str: 游標字串
+    """
+    raw = json.dumps(data, ensure_ascii=False, separators=(',', ':')).encode('utf-8')
+    return base64.urlsafe_b64encode(raw).decode('ascii').rstrip('=')
+
+
+def decodeCursor(cursor):
+    """
+    解碼游標字串
+    
+    Args:
+        cursor: encodeCursor 產生的游標字串
+        
+    Returns:
+        dict: 游標內容（'after' 為字串、'value' 為數值或 'offset' 為非負整數）
+        
+    Raises:
+        ValueError: 游標格式無效
+    """
+    try:
+        padded = cursor + '=' * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded.encode('ascii')).decode('utf-8'))
+    except Exception as e:
+        raise ValueError(f"無效的游標: {cursor}") from e
+    
+    if not isinstance(data, dict):
+        raise ValueError(f"無效的游標: {cursor}")
+    if 'after' in data and not isinstance(data['after'], str):
+        raise ValueError(f"無效的游標: {cursor}")
+    if 'offset' in data and (not isinstance(data['offset'], int) or data['offset'] < 0):
+        raise ValueError(f"無效的游標: {cursor}")
+    if 'value' in data and not isinstance(data['value'], (int, float)):
+        raise ValueError(f"無效的游標: {cursor}")
+    return data
@@ -3,9 +3,11 @@ Gallery 路由 Blueprint
 定義所有 Gallery 相關的 HTTP 路由
 """
 
-from flask import Blueprint, render_template, jsonify, request, send_file, make_response
+from flask import Blueprint, render_template, request, send_file
 from pathlib import Path
-from core.utils import parsePath
+from config import get_frontend_config
+from core.response import json_response, ndjson_response
+from core.utils import decodeCursor
 
 # 創建 Blueprint
 gallery_bp = Blueprint(
@@ -18,6 +20,7 @@ gallery_bp = Blueprint(
 # 服務實例（將在 app.py 中初始化）
 gallery_service = None
 status_manager = None
+progress_store = None
 # 配置（將在 app.py 中初始化）
 gallery_config = {
     'per_page': 6,
@@ -25,7 +28,7 @@ gallery_config = {
 }
 
 
-def init_service(service, config=None, status_mgr=None):
+def init_service(service, config=None, status_mgr=None, progress=None):
     """
     初始化服務實例
     
@@ -33,10 +36,12 @@ def init_service(service, config=None, status_mgr=None):
         service: GalleryService 實例
         config: Gallery 配置字典
         status_mgr: StatusManager 實例
+        progress: ProgressStore 實例
     """
-    global gallery_service, gallery_config, status_manager
+    global gallery_service, gallery_config, status_manager, progress_store
     gallery_service = service
     status_manager = status_mgr
+    progress_store = progress
     if config:
         gallery_config.update(config)
 
@@ -65,7 +70,38 @@ def get_list():
     per_page = request.args.get('per_page', default_per_page, type=int)
     skip_chapters = request.args.get('skip_chapters', str(default_skip_chapters).lower()).lower() == 'true'
     search_keyword = request.args.get('search', None)
+    search_match = request.args.get('match', 'substring')  # 名稱搜尋方式（substring / prefix）
+    if search_match not in gallery_service.SEARCH_MATCH_MODES:
+        return json_response({'error': '不支援的搜尋方式'}), 400
     status_filter = request.args.get('status', None)  # 狀態篩選
+    artist = request.args.get('artist', None)  # 作者篩選
+    # 精選篩選（filter_tag 為舊版參數：指定精選標記檔案名稱）
+    marker = gallery_service.config.get('gallery', {}).get('special_tag_marker', '.special')
+    featured_only = (request.args.get('featured', 'false').lower() == 'true'
+                     or request.args.get('filter_tag') == marker)
+    
+    # 排序（name 為自然排序；其他欄位由索引的統計欄位排序，預設遞減）
+    sort = request.args.get('sort', 'name')
+    if sort != 'name' and sort not in gallery_service.index.SORT_COLUMNS:
+        return json_response({'error': '不支援的排序欄位'}), 400
+    descending = request.args.get('order', 'desc').lower() != 'asc'
+    
+    # 欄位選擇與章節預覽上限（只計算並回傳列表頁實際顯示的內容，完整章節由詳情 API 延遲載入）
+    try:
+        fields = gallery_service.parse_list_fields(request.args.get('fields'))
+    except ValueError as e:
+        return json_response({'error': str(e)}), 400
+    chapter_limit = request.args.get('chapter_limit', None, type=int)
+    if chapter_limit is not None:
+        chapter_limit = max(1, chapter_limit)
+    
+    # 游標分頁（提供 cursor 時忽略 page）
+    cursor = None
+    if request.args.get('cursor'):
+        try:
+            cursor = decodeCursor(request.args['cursor'])
+        except ValueError:
+            return json_response({'error': '無效的分頁游標'}), 400
     
     result = gallery_service.get_gallery_list(
         page=page, 
@@ -73,25 +109,70 @@ def get_list():
         skip_chapters=skip_chapters,
         search_keyword=search_keyword,
         status_filter=status_filter,
+        status_manager=status_manager,
+        artist=artist,
+        featured_only=featured_only,
+        cursor=cursor,
+        sort=sort,
+        descending=descending,
+        fields=fields,
+        chapter_limit=chapter_limit,
+        search_match=search_match
+    )
+    return json_response(result)
+
+
+@gallery_bp.route('/api/artists')
+def get_artists():
+    """API：獲取作者列表與作品數量"""
+    return json_response({'artists': gallery_service.get_artists()})
+
+
+@gallery_bp.route('/api/export')
+def export_library():
+    """
+    API：以 NDJSON 串流匯出整個作品庫（單一請求取得全部作品，記憶體用量固定）
+    
+    chapters=true 時輸出章節記錄，images=true 時章節記錄附上圖片檔名
+    """
+    include_chapters = request.args.get('chapters', 'false').lower() == 'true'
+    include_images = request.args.get('images', 'false').lower() == 'true'
+    records = gallery_service.iter_export(
+        include_chapters=include_chapters or include_images,
+        include_images=include_images,
         status_manager=status_manager
     )
-    return jsonify(result)
+    return ndjson_response(records, filename='gallery.ndjson')
+
+
+@gallery_bp.route('/api/details', methods=['POST'])
+def get_details():
+    """
+    API：批次獲取多部作品詳情（列表頁一次請求取得多張卡片的章節列表）
+    
+    請求內容：{"paths": [作品路徑, ...]}
+    """
+    data = request.get_json(silent=True) or {}
+    paths = data.get('paths')
+    if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+        return json_response({'error': '無效的作品路徑列表'}), 400
+    if len(paths) > gallery_service.DETAIL_BATCH_LIMIT:
+        return json_response({'error': f'一次最多查詢 {gallery_service.DETAIL_BATCH_LIMIT} 部作品'}), 400
+    
+    details = gallery_service.get_work_details(paths)
+    return json_response({
+        'works': [detail for detail in details.values() if detail is not None],
+        'missing': [path for path, detail in details.items() if detail is None]
+    })
 
 
 @gallery_bp.route('/api/<path:gallery_path>')
 def get_detail(gallery_path):
     """API：獲取 Gallery 詳情"""
-    parsed_path = parsePath(gallery_path)
-    full_path = gallery_service.root_path / parsed_path
-    if not full_path.exists():
-        return jsonify({'error': 'Gallery作品不存在'}), 404
-    
-    work_info = {
-        'name': full_path.name,
-        'path': gallery_path,
-        'chapters': gallery_service.get_chapters(full_path)
-    }
-    return jsonify(work_info)
+    work_info = gallery_service.get_work_detail(gallery_path)
+    if work_info is None:
+        return json_response({'error': 'Gallery作品不存在'}), 404
+    return json_response(work_info)
 
 
 @gallery_bp.route('/api/detail/<path:gallery_path>')
@@ -102,32 +183,61 @@ def get_detail_alt(gallery_path):
 
 @gallery_bp.route('/api/chapter/<path:chapter_path>')
 def get_chapter_images(chapter_path):
-    """API：獲取 Gallery 章節圖片列表和導航信息（優化版 - 一次性返回所有 URL）"""
-    # 一次性獲取所有圖片 URL（快速模式）
-    images = gallery_service.get_chapter_images(chapter_path)
+    """
+    API：獲取 Gallery 章節圖片列表和導航信息（優化版 - 一次性返回所有 URL）
+    
+    format=manifest 時回傳精簡清單（基底路徑 + 檔名陣列，columns=bytes 可附帶檔案大小），
+    由前端展開成完整路徑；否則回傳完整路徑列表
+    """
     navigation = gallery_service.get_chapter_navigation(chapter_path)
     
-    response = make_response(jsonify({
+    if request.args.get('format') == 'manifest':
+        columns = [c for c in request.args.get('columns', '').split(',') if c]
+        manifest = gallery_service.get_chapter_manifest_by_path(chapter_path, columns)
+        return json_response({
+            'manifest': manifest,
+            'total': len(manifest['files']),
+            'navigation': navigation
+        }, headers={'Cache-Control': 'public, max-age=300'})
+    
+    # 一次性獲取所有圖片 URL（快速模式）
+    images = gallery_service.get_chapter_images(chapter_path)
+    # API 快取 5 分鐘（圖片列表不太會變）
+    return json_response({
         'images': images,
         'total': len(images),
         'navigation': navigation
-    }))
-    # API 快取 5 分鐘（圖片列表不太會變）
-    response.headers['Cache-Control'] = 'public, max-age=300'
-    return response
+    }, headers={'Cache-Control': 'public, max-age=300'})
+
+
+@gallery_bp.route('/api/reader-bootstrap/<path:chapter_path>')
+def reader_bootstrap(chapter_path):
+    """
+    API：閱讀器啟動資料（Gallery）
+    
+    一次回傳前端配置、精簡章節清單、導航、相關狀態與閱讀進度，
+    閱讀器開啟時只需一次請求即可顯示第一頁
+    """
+    columns = [c for c in request.args.get('columns', '').split(',') if c]
+    
+    data = gallery_service.get_reader_bootstrap(chapter_path, status_manager=status_manager, columns=columns)
+    if data is None:
+        return json_response({'error': '作品不存在'}), 404
+    data['config'] = get_frontend_config(gallery_service.config)
+    data['progress'] = progress_store.get_progress('gallery', chapter_path) if progress_store else None
+    return json_response(data)
 
 
 @gallery_bp.route('/image/<path:image_path>')
 def serve_image(image_path):
     """提供 Gallery 圖片檔案（帶快取）"""
-    parsed_path = parsePath(image_path)
-    full_path = gallery_service.root_path / parsed_path
-    if not full_path.exists():
-        return jsonify({'error': '圖片不存在'}), 404
+    full_path = gallery_service.resolve_path(image_path)
+    if full_path is None or not full_path.is_file():
+        return json_response({'error': '圖片不存在'}), 404
     
     response = send_file(str(full_path))
     # 添加快取頭，讓瀏覽器快取圖片 1 天
-    response.headers['Cache-Control'] = 'public, max-age=86400'
+    response.headers['Cache-Control'] = gallery_service.IMAGE_CACHE_CONTROL
     return response
 
 
@@ -137,30 +247,75 @@ def reader_page(chapter_path):
     return render_template('gallery/reader.html', chapter_path=chapter_path, category='gallery')
 
 
+@gallery_bp.route('/api/status/counts', methods=['GET'])
+def get_status_counts():
+    """API：獲取 Gallery 各狀態數量（篩選分頁用）"""
+    return json_response(gallery_service.get_status_counts(status_manager))
+
+
 @gallery_bp.route('/api/status/<path:work_path>', methods=['GET'])
 def get_status(work_path):
     """API：獲取 Gallery 作品狀態"""
     if not status_manager:
-        return jsonify({'status': 'reviewed'}), 200
+        return json_response({'status': 'reviewed'}), 200
     
     status = status_manager.get_status('gallery', work_path)
-    return jsonify({'status': status})
+    return json_response({'status': status})
 
 
 @gallery_bp.route('/api/status/<path:work_path>', methods=['POST'])
 def set_status(work_path):
     """API：設定 Gallery 作品狀態"""
     if not status_manager:
-        return jsonify({'error': '狀態管理器未初始化'}), 500
+        return json_response({'error': '狀態管理器未初始化'}), 500
     
     data = request.get_json()
     new_status = data.get('status')
     
     if new_status not in ['favorite', 'unreviewed', 'reviewed']:
-        return jsonify({'error': '無效的狀態'}), 400
+        return json_response({'error': '無效的狀態'}), 400
     
     success = status_manager.set_status('gallery', work_path, new_status)
     if success:
-        return jsonify({'success': True, 'status': new_status})
+        return json_response({'success': True, 'status': new_status})
     else:
-        return jsonify({'error': '設定失敗'}), 500
+        return json_response({'error': '設定失敗'}), 500
+
+
+@gallery_bp.route('/api/progress/<path:chapter_path>', methods=['GET'])
+def get_progress(chapter_path):
+    """API：獲取 Gallery 章節閱讀進度"""
+    if not progress_store:
+        return json_response({'progress': None})
+    
+    return json_response({'progress': progress_store.get_progress('gallery', chapter_path)})
+
+
+@gallery_bp.route('/api/progress/<path:chapter_path>', methods=['POST'])
+def set_progress(chapter_path):
+    """API：記錄 Gallery 章節閱讀進度（寫入合併，稍後批次寫回）"""
+    if not progress_store:
+        return json_response({'error': '進度儲存未初始化'}), 500
+    
+    # sendBeacon 送出的內容類型可能是 text/plain，因此強制解析 JSON
+    data = request.get_json(force=True, silent=True) or {}
+    page = data.get('page')
+    total = data.get('total')
+    # bool 是 int 的子類別，需另外排除
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in (page, total)) \
+            or not 1 <= page <= total:
+        return json_response({'error': '無效的頁碼'}), 400
+    if not gallery_service.has_chapter(chapter_path):
+        return json_response({'error': '章節不存在'}), 404
+    
+    record = progress_store.set_progress('gallery', chapter_path, page, total)
+    return json_response({'success': True, 'progress': record})
+
+
+@gallery_bp.route('/api/continue/<path:work_path>')
+def get_continue_point(work_path):
+    """API：獲取 Gallery 作品的繼續閱讀位置（章節與頁碼）"""
+    if not progress_store:
+        return json_response({'continue': None})
+    
+    return json_response({'continue': progress_store.get_continue_point('gallery', work_path)})
@@ -3,15 +3,51 @@ Gallery 服務層
 處理 Gallery 相關的業務邏輯
 """
 
+import logging
+from functools import partial
 from pathlib import Path
 from core.base_reader import BaseReader
+from core.metadata_index import extract_gallery_metadata
 from core.utils import parsePath, formatPathForUrl
 
+logger = logging.getLogger(__name__)
+
 
 class GalleryService(BaseReader):
     """Gallery 服務類別，繼承自 BaseReader"""
     
-    def get_gallery_list(self, page=1, per_page=6, skip_chapters=False, status_filter=None, status_manager=None, search_keyword=None):
+    CATEGORY = 'gallery'
+    
+    # Gallery 圖片不常變動，讓瀏覽器快取 1 天
+    IMAGE_CACHE_CONTROL = 'public, max-age=86400'
+    
+    # 列表 API 可選的欄位（含中繼資料欄位）
+    LIST_FIELDS = BaseReader.LIST_FIELDS + ('pixiv_id', 'artist', 'featured')
+    
+    def get_metadata_extractor(self):
+        """
+        Gallery 作品中繼資料：從 `<pixiv id>-<artist>` 命名解析 ID 與作者，並檢查精選標記檔案
+        
+        Returns:
+            callable: 中繼資料擷取函數
+        """
+        marker_file = self.config.get('gallery', {}).get('special_tag_marker', '.special')
+        return partial(extract_gallery_metadata, marker_file=marker_file)
+    
+    def get_artists(self):
+        """
+        獲取所有作者與其作品數量（由中繼資料索引計算，不掃描檔案系統）
+        
+        Returns:
+            list: [{'artist': 作者, 'count': 作品數}]，依作品數遞減排序
+        """
+        counts = self.index.get_metadata_counts('artist')
+        artists = [{'artist': artist, 'count': count} for artist, count in counts.items()]
+        return sorted(artists, key=lambda x: (-x['count'], self.natural_sort_key(x['artist'])))
+    
+    def get_gallery_list(self, page=1, per_page=6, skip_chapters=False, status_filter=None, status_manager=None, search_keyword=None,
+                         artist=None, featured_only=False, cursor=None, sort=None, descending=True, fields=None, chapter_limit=None,
+                         search_match='substring'):
         """
         獲取所有 Gallery 作品列表
         
@@ -22,6 +58,14 @@ class GalleryService(BaseReader):
             status_filter: 狀態篩選 (favorite/unreviewed/reviewed)
             status_manager: 狀態管理器實例
             search_keyword: 搜尋關鍵字（用於名稱模糊搜尋）
+            artist: 作者篩選（不分大小寫）
+            featured_only: 是否只顯示有精選標記的作品
+            cursor: 已解碼的分頁游標（提供時忽略 page）
+            sort: 排序欄位（name/mtime/ctime/bytes/images/chapters）
+            descending: 欄位排序是否遞減
+            fields: 要計算與回傳的欄位集合（None 表示全部，見 LIST_FIELDS）
+            chapter_limit: 每部作品最多回傳的章節數（None 表示全部）
+            search_match: 名稱搜尋方式（substring 子字串 / prefix 前綴）
             
         Returns:
             dict: 包含作品列表和分頁信息的字典
@@ -31,68 +75,44 @@ class GalleryService(BaseReader):
             return self._empty_result(page, per_page)
         
         try:
-            # 獲取所有作品目錄
-            all_dirs = [d for d in self.root_path.iterdir() if d.is_dir()]
+            # 作者 / 精選篩選為中繼資料索引查詢
+            metadata_filters = {}
+            if artist:
+                metadata_filters['artist'] = artist
+            if featured_only:
+                metadata_filters['featured'] = True
             
-            # 應用狀態篩選
-            if status_filter and status_manager:
-                all_dirs = status_manager.filter_by_status('gallery', all_dirs, status_filter)
+            # 先判斷再取頁：統計欄位在兩者之間建立完成時，只會讓前端多重新載入一次
+            sort_pending = self.is_sort_pending(sort)
             
-            # 如果有搜尋關鍵字，先在全部資料中搜尋
-            if search_keyword:
-                search_keyword_lower = search_keyword.lower()
-                all_dirs = [d for d in all_dirs if search_keyword_lower in d.name.lower()]
-            
-            total_count = len(all_dirs)
-            
-            # 排序
-            all_dirs.sort(key=lambda x: self.natural_sort_key(x.name))
-            
-            # 分頁
-            start_idx = (page - 1) * per_page
-            end_idx = start_idx + per_page
-            page_dirs = all_dirs[start_idx:end_idx]
+            # 獲取本頁作品目錄（狀態、中繼資料篩選、名稱搜尋與分頁由索引處理，搜尋結果依相關度排序）
+            page_dirs, total_count, next_cursor = self.get_work_page(
+                page, per_page, cursor, status_filter, status_manager, search_keyword, metadata_filters, sort, descending,
+                search_match=search_match
+            )
             
             for work_dir in page_dirs:
                 try:
-                    # 使用緩存鍵
-                    cache_key = f"gallery_{work_dir}_{skip_chapters}"
+                    # 使用緩存鍵（不同欄位選擇與章節上限分開緩存）
+                    cache_key = f"gallery_{work_dir}_{skip_chapters}_{self.fields_cache_key(fields, chapter_limit)}"
                     
-                    if cache_key in self.cache:
-                        work_info = self.cache[cache_key]
-                    else:
-                        if skip_chapters:
-                            # 快速模式：不載入章節詳情，直接統計圖片數
-                            chapters = []
-                            chapter_count = self._count_images_fast(work_dir)
-                        else:
-                            # 完整模式：載入章節詳情
-                            chapters = self.get_chapters(work_dir)
-                            chapter_count = len(chapters)
-                        
-                        cover_image = self.get_cover_image(work_dir)
-                        
-                        work_info = {
-                            'name': work_dir.name,
-                            'path': formatPathForUrl(work_dir.relative_to(self.root_path)),
-                            'chapters': chapters,
-                            'chapter_count': chapter_count,
-                            'cover_image': cover_image
-                        }
-                        
-                        # 緩存結果（最多緩存100個）
-                        if len(self.cache) < 100:
-                            self.cache[cache_key] = work_info
+                    # 緩存結果（最多緩存100個；並行請求同一作品時只建立一次）
+                    work_info = self.get_cached(cache_key, lambda work_dir=work_dir: self._build_work_info(
+                        work_dir, skip_chapters, fields, chapter_limit
+                    ))
                     
-                    # 添加狀態信息（不緩存，因為會變動）
-                    if status_manager:
-                        work_info_copy = work_info.copy()
+                    # 添加狀態與中繼資料（不緩存，因為會變動）
+                    work_info_copy = work_info.copy()
+                    metadata = self.index.get_metadata(work_dir.name)
+                    if metadata:
+                        work_info_copy.update(
+                            (key, value) for key, value in metadata.items() if self.wants_field(fields, key)
+                        )
+                    if status_manager and self.wants_field(fields, 'status'):
                         work_info_copy['status'] = status_manager.get_status('gallery', work_dir.name)
-                        works.append(work_info_copy)
-                    else:
-                        works.append(work_info)
-                except Exception as e:
-                    print(f"處理 Gallery 作品 {work_dir.name} 時出錯: {e}")
+                    works.append(work_info_copy)
+                except Exception:
+                    logger.exception("處理 Gallery 作品 %s 時出錯", work_dir.name)
                     continue
             
             return {
@@ -100,12 +120,45 @@ class GalleryService(BaseReader):
                 'total': total_count,
                 'page': page,
                 'per_page': per_page,
-                'total_pages': (total_count + per_page - 1) // per_page
+                'total_pages': (total_count + per_page - 1) // per_page,
+                'next_cursor': next_cursor,
+                'sort_pending': sort_pending
             }
-        except Exception as e:
-            print(f"獲取 Gallery 列表時出錯: {e}")
+        except Exception:
+            logger.exception("獲取 Gallery 列表時出錯")
             return self._empty_result(page, per_page)
     
+    def _build_work_info(self, work_dir, skip_chapters, fields, chapter_limit):
+        """
+        建立列表中單部作品的資訊（只計算 fields 要求的欄位）
+        
+        Returns:
+            dict: 作品資訊
+        """
+        work_info = {}
+        if self.wants_field(fields, 'name'):
+            work_info['name'] = work_dir.name
+        if self.wants_field(fields, 'path'):
+            work_info['path'] = formatPathForUrl(work_dir.relative_to(self.root_path))
+        
+        if not skip_chapters and self.wants_field(fields, 'chapters'):
+            # 完整模式：載入章節詳情
+            chapters, chapter_count = self.get_chapter_preview(work_dir, chapter_limit)
+            work_info['chapters'] = chapters
+            if chapter_limit is not None:
+                work_info['has_more_chapters'] = chapter_count > len(chapters)
+        elif self.wants_field(fields, 'chapters') or self.wants_field(fields, 'chapter_count'):
+            # 快速模式：不載入章節詳情，直接統計圖片數
+            if self.wants_field(fields, 'chapters'):
+                work_info['chapters'] = []
+            chapter_count = self._count_images_fast(work_dir)
+        
+        if self.wants_field(fields, 'chapter_count'):
+            work_info['chapter_count'] = chapter_count
+        if self.wants_field(fields, 'cover_image'):
+            work_info['cover_image'] = self.get_cover_image(work_dir)
+        return work_info
+    
     def get_chapters(self, work_path):
         """
         獲取 Gallery 作品的章節列表
@@ -117,33 +170,59 @@ class GalleryService(BaseReader):
         Returns:
             list: 章節列表（通常只有一個）
         """
+        chapters, _ = self.get_chapter_preview(work_path)
+        return chapters
+    
+    def get_chapter_preview(self, work_path, limit=None):
+        """
+        獲取 Gallery 作品的前幾個章節（自然排序）
+        章節總數只計算含有圖片的子資料夾（與完整章節列表一致），因此會讀取每個子資料夾的圖片清單（清單有快取）
+        
+        Args:
+            work_path: 作品目錄路徑
+            limit: 最多回傳的章節數（None 表示全部）
+            
+        Returns:
+            tuple: (章節列表, 章節總數)
+        """
+        # 多個請求同時載入同一作品時只讀取一次目錄
+        key = f"chapters_{work_path}_{limit}"
+        return self.flight.do(key, self._load_chapter_preview, work_path, limit)
+    
+    def _load_chapter_preview(self, work_path, limit):
+        """讀取 Gallery 作品的前幾個章節（見 get_chapter_preview）"""
         chapters = []
         work_path = Path(work_path)
         
         # 檢查是否有子資料夾
-        subdirs = [d for d in work_path.iterdir() if d.is_dir()]
+        subdirs = self.get_chapter_dirs(work_path)
         
+        chapter_count = 0
         if subdirs:
-            # 有子資料夾（不常見）
+            # 有子資料夾（不常見）；章節數只計算含有圖片的子資料夾，超過上限的只計數不回傳
             for subdir in subdirs:
-                images = self.get_images_in_dir(subdir)
-                if images:
+                image_count = self.count_images_in_dir(subdir)
+                if not image_count:
+                    continue
+                chapter_count += 1
+                if limit is None or len(chapters) < limit:
                     chapters.append({
                         'name': subdir.name,
                         'path': formatPathForUrl(subdir.relative_to(self.root_path)),
-                        'image_count': len(images)
+                        'image_count': image_count
                     })
         else:
             # 沒有子資料夾，直接檢查圖片（Gallery 典型模式）
-            images = self.get_images_in_dir(work_path)
-            if images:
+            image_count = self.count_images_in_dir(work_path)
+            if image_count:
+                chapter_count = 1
                 chapters.append({
                     'name': work_path.name,  # 使用資料夾名稱
                     'path': formatPathForUrl(work_path.relative_to(self.root_path)),
-                    'image_count': len(images)
+                    'image_count': image_count
                 })
         
-        return sorted(chapters, key=lambda x: self.natural_sort_key(x['name']))
+        return chapters, chapter_count
     
     def get_chapter_images(self, chapter_path):
         """
@@ -155,10 +234,8 @@ class GalleryService(BaseReader):
         Returns:
             list: 圖片路徑列表
         """
-        parsed_path = parsePath(chapter_path)
-        full_path = self.root_path / parsed_path
-        
-        if not full_path.exists():
+        full_path = self.resolve_path(chapter_path)
+        if full_path is None or not full_path.exists():
             return []
         
         # get_images_in_dir 已內建快取
@@ -176,8 +253,9 @@ class GalleryService(BaseReader):
         Returns:
             tuple: (圖片列表, 總數)
         """
-        parsed_path = parsePath(chapter_path)
-        full_path = self.root_path / parsed_path
+        full_path = self.resolve_path(chapter_path)
+        if full_path is None:
+            return [], 0
         return self.get_images_in_dir_paginated(full_path, offset=offset, limit=limit)
     
     def get_chapter_navigation(self, chapter_path):
@@ -195,8 +273,18 @@ class GalleryService(BaseReader):
         if cache_key in self.cache:
             return self.cache[cache_key]
         
+        # 同一章節的並行請求只計算一次
+        return self.flight.do(cache_key, self._build_chapter_navigation, chapter_path, cache_key)
+    
+    def _build_chapter_navigation(self, chapter_path, cache_key):
+        """計算章節導航信息並寫入快取（見 get_chapter_navigation）"""
+        if cache_key in self.cache:
+            return self.cache[cache_key]
+        
+        full_path = self.resolve_path(chapter_path)
+        if full_path is None:
+            return {'prev': None, 'next': None, 'manga_name': ''}
         parsed_path = parsePath(chapter_path)
-        full_path = self.root_path / parsed_path
         
         # 獲取作品目錄（章節的父目錄）
         work_path = full_path.parent
@@ -254,6 +342,37 @@ class GalleryService(BaseReader):
         
         return result
     
+    def get_reader_bootstrap(self, chapter_path, status_manager=None, columns=()):
+        """
+        獲取閱讀器開啟作品所需的全部資料（取代多次依序請求）
+        
+        Args:
+            chapter_path: 章節路徑（相對路徑）
+            status_manager: 狀態管理器實例
+            columns: 章節清單的逐圖欄位
+            
+        Returns:
+            dict: {'manifest', 'total', 'navigation', 'status'}，status 為作品的狀態；章節不存在時返回 None
+        """
+        # 先確認章節存在，不為不存在的路徑產生導航
+        full_path = self.resolve_path(chapter_path)
+        if full_path is None or not full_path.is_dir():
+            return None
+        
+        manifest = self._get_existing_chapter_manifest(full_path, chapter_path, columns)
+        navigation = self.get_chapter_navigation(chapter_path)
+        
+        status = 'unreviewed'
+        if status_manager and navigation.get('manga_name'):
+            status = status_manager.get_status('gallery', navigation['manga_name'])
+        
+        return {
+            'manifest': manifest,
+            'total': len(manifest['files']),
+            'navigation': navigation,
+            'status': status
+        }
+    
     def _empty_result(self, page, per_page):
         """返回空結果"""
         return {
@@ -261,5 +380,6 @@ class GalleryService(BaseReader):
             'total': 0,
             'page': page,
             'per_page': per_page,
-            'total_pages': 0
+            'total_pages': 0,
+            'next_cursor': None
         }
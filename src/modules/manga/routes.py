@@ -3,9 +3,11 @@
 定義所有漫畫相關的 HTTP 路由
 """
 
-from flask import Blueprint, render_template, jsonify, request, send_file
+from flask import Blueprint, render_template, request, send_file
 from pathlib import Path
-from core.utils import parsePath
+from config import get_frontend_config
+from core.response import json_response, ndjson_response
+from core.utils import decodeCursor
 
 # 創建 Blueprint
 manga_bp = Blueprint(
@@ -18,19 +20,22 @@ manga_bp = Blueprint(
 # 服務實例（將在 app.py 中初始化）
 manga_service = None
 status_manager = None
+progress_store = None
 
 
-def init_service(service, status_mgr=None):
+def init_service(service, status_mgr=None, progress=None):
     """
     初始化服務實例
     
     Args:
         service: MangaService 實例
         status_mgr: StatusManager 實例
+        progress: ProgressStore 實例
     """
-    global manga_service, status_manager
+    global manga_service, status_manager, progress_store
     manga_service = service
     status_manager = status_mgr
+    progress_store = progress
 
 
 @manga_bp.route('/')
@@ -49,6 +54,33 @@ def get_list():
     skip_chapters = request.args.get('skip_chapters', 'false').lower() == 'true'  # 預設載入章節
     status_filter = request.args.get('status', None)  # 狀態篩選
     favorite_only = request.args.get('favorite_only', 'false').lower() == 'true'  # 只顯示收藏章節
+    search_keyword = request.args.get('search', None)
+    search_match = request.args.get('match', 'substring')  # 名稱搜尋方式（substring / prefix）
+    if search_match not in manga_service.SEARCH_MATCH_MODES:
+        return json_response({'error': '不支援的搜尋方式'}), 400
+    
+    # 排序（name 為自然排序；其他欄位由索引的統計欄位排序，預設遞減）
+    sort = request.args.get('sort', 'name')
+    if sort != 'name' and sort not in manga_service.index.SORT_COLUMNS:
+        return json_response({'error': '不支援的排序欄位'}), 400
+    descending = request.args.get('order', 'desc').lower() != 'asc'
+    
+    # 欄位選擇與章節預覽上限（只計算並回傳列表頁實際顯示的內容，完整章節由詳情 API 延遲載入）
+    try:
+        fields = manga_service.parse_list_fields(request.args.get('fields'))
+    except ValueError as e:
+        return json_response({'error': str(e)}), 400
+    chapter_limit = request.args.get('chapter_limit', None, type=int)
+    if chapter_limit is not None:
+        chapter_limit = max(1, chapter_limit)
+    
+    # 游標分頁（提供 cursor 時忽略 page）
+    cursor = None
+    if request.args.get('cursor'):
+        try:
+            cursor = decodeCursor(request.args['cursor'])
+        except ValueError:
+            return json_response({'error': '無效的分頁游標'}), 400
     
     result = manga_service.get_manga_list(
         page=page, 
@@ -56,25 +88,73 @@ def get_list():
         skip_chapters=skip_chapters,
         status_filter=status_filter,
         status_manager=status_manager,
-        favorite_only=favorite_only
+        favorite_only=favorite_only,
+        search_keyword=search_keyword,
+        cursor=cursor,
+        sort=sort,
+        descending=descending,
+        fields=fields,
+        chapter_limit=chapter_limit,
+        search_match=search_match
+    )
+    return json_response(result)
+
+
+@manga_bp.route('/api/chapters/search')
+def search_chapters():
+    """API：跨所有漫畫搜尋章節名稱（回傳章節與所屬漫畫）"""
+    keyword = request.args.get('q', '')
+    limit = max(1, min(request.args.get('limit', 50, type=int), 200))
+    return json_response(manga_service.search_chapters(keyword, limit=limit))
+
+
+@manga_bp.route('/api/export')
+def export_library():
+    """
+    API：以 NDJSON 串流匯出整個作品庫（單一請求取得全部作品，記憶體用量固定）
+    
+    chapters=true 時輸出章節記錄，images=true 時章節記錄附上圖片檔名
+    """
+    include_chapters = request.args.get('chapters', 'false').lower() == 'true'
+    include_images = request.args.get('images', 'false').lower() == 'true'
+    records = manga_service.iter_export(
+        include_chapters=include_chapters or include_images,
+        include_images=include_images,
+        status_manager=status_manager
     )
-    return jsonify(result)
+    return ndjson_response(records, filename='manga.ndjson')
+
+
+@manga_bp.route('/api/details', methods=['POST'])
+def get_details():
+    """
+    API：批次獲取多部作品詳情（列表頁一次請求取得多張卡片的章節列表）
+    
+    請求內容：{"paths": [作品路徑, ...], "favorite_only": false}
+    """
+    data = request.get_json(silent=True) or {}
+    paths = data.get('paths')
+    if not isinstance(paths, list) or not all(isinstance(p, str) for p in paths):
+        return json_response({'error': '無效的作品路徑列表'}), 400
+    if len(paths) > manga_service.DETAIL_BATCH_LIMIT:
+        return json_response({'error': f'一次最多查詢 {manga_service.DETAIL_BATCH_LIMIT} 部作品'}), 400
+    favorite_only = bool(data.get('favorite_only'))
+    
+    details = manga_service.get_work_details(paths, favorite_only=favorite_only, status_manager=status_manager)
+    return json_response({
+        'works': [detail for detail in details.values() if detail is not None],
+        'missing': [path for path, detail in details.items() if detail is None]
+    })
 
 
 @manga_bp.route('/api/<path:manga_path>')
 def get_detail(manga_path):
-    """API：獲取漫畫詳情"""
-    parsed_path = parsePath(manga_path)
-    full_path = manga_service.root_path / parsed_path
-    if not full_path.exists():
-        return jsonify({'error': '漫畫不存在'}), 404
-    
-    manga_info = {
-        'name': full_path.name,
-        'path': manga_path,
-        'chapters': manga_service.get_chapters(full_path)
-    }
-    return jsonify(manga_info)
+    """API：獲取漫畫詳情（列表只回傳章節預覽時，由此載入完整章節列表）"""
+    favorite_only = request.args.get('favorite_only', 'false').lower() == 'true'
+    work_info = manga_service.get_work_detail(manga_path, favorite_only=favorite_only, status_manager=status_manager)
+    if work_info is None:
+        return json_response({'error': '漫畫不存在'}), 404
+    return json_response(work_info)
 
 
 @manga_bp.route('/api/detail/<path:manga_path>')
@@ -85,63 +165,140 @@ def get_detail_alt(manga_path):
 
 @manga_bp.route('/api/chapter/<path:chapter_path>')
 def get_chapter_images(chapter_path):
-    """API：獲取漫畫章節圖片列表和導航信息"""
+    """
+    API：獲取漫畫章節圖片列表和導航信息
+    
+    format=manifest 時回傳精簡清單（基底路徑 + 檔名陣列，columns=bytes 可附帶檔案大小），
+    由前端展開成完整路徑；否則回傳完整路徑列表
+    """
     favorite_only = request.args.get('favorite_only', 'false').lower() == 'true'
     
-    images = manga_service.get_chapter_images(chapter_path)
     navigation = manga_service.get_chapter_navigation(
         chapter_path, 
         favorite_only=favorite_only,
         status_manager=status_manager
     )
     
-    return jsonify({
+    if request.args.get('format') == 'manifest':
+        columns = [c for c in request.args.get('columns', '').split(',') if c]
+        manifest = manga_service.get_chapter_manifest_by_path(chapter_path, columns)
+        return json_response({
+            'manifest': manifest,
+            'total': len(manifest['files']),
+            'navigation': navigation
+        })
+    
+    images = manga_service.get_chapter_images(chapter_path)
+    return json_response({
         'images': images,
         'navigation': navigation
     })
 
 
+@manga_bp.route('/api/reader-bootstrap/<path:chapter_path>')
+def reader_bootstrap(chapter_path):
+    """
+    API：閱讀器啟動資料（漫畫）
+    
+    一次回傳前端配置、精簡章節清單、導航、相關狀態與閱讀進度，
+    閱讀器開啟時只需一次請求即可顯示第一頁
+    """
+    favorite_only = request.args.get('favorite_only', 'false').lower() == 'true'
+    columns = [c for c in request.args.get('columns', '').split(',') if c]
+    
+    data = manga_service.get_reader_bootstrap(chapter_path, favorite_only=favorite_only, status_manager=status_manager, columns=columns)
+    if data is None:
+        return json_response({'error': '章節不存在'}), 404
+    data['config'] = get_frontend_config(manga_service.config)
+    data['progress'] = progress_store.get_progress('manga', chapter_path) if progress_store else None
+    return json_response(data)
+
+
 @manga_bp.route('/image/<path:image_path>')
 def serve_image(image_path):
     """提供漫畫圖片檔案"""
-    parsed_path = parsePath(image_path)
-    full_path = manga_service.root_path / parsed_path
-    if not full_path.exists():
-        return jsonify({'error': '圖片不存在'}), 404
+    full_path = manga_service.resolve_path(image_path)
+    if full_path is None or not full_path.is_file():
+        return json_response({'error': '圖片不存在'}), 404
     
     return send_file(str(full_path))
 
 
+@manga_bp.route('/api/status/counts', methods=['GET'])
+def get_status_counts():
+    """API：獲取漫畫各狀態數量（篩選分頁用）"""
+    return json_response(manga_service.get_status_counts(status_manager))
+
+
 @manga_bp.route('/api/status/<path:manga_path>', methods=['GET'])
 def get_status(manga_path):
     """API：獲取漫畫狀態"""
     if not status_manager:
-        return jsonify({'status': 'reviewed'}), 200
+        return json_response({'status': 'reviewed'}), 200
     
     status = status_manager.get_status('manga', manga_path)
-    return jsonify({'status': status})
+    return json_response({'status': status})
 
 
 @manga_bp.route('/api/status/<path:manga_path>', methods=['POST'])
 def set_status(manga_path):
     """API：設定漫畫狀態"""
     if not status_manager:
-        return jsonify({'error': '狀態管理器未初始化'}), 500
+        return json_response({'error': '狀態管理器未初始化'}), 500
     
     data = request.get_json()
     new_status = data.get('status')
     
     if new_status not in ['favorite', 'unreviewed', 'reviewed']:
-        return jsonify({'error': '無效的狀態'}), 400
+        return json_response({'error': '無效的狀態'}), 400
     
     success = status_manager.set_status('manga', manga_path, new_status)
     if success:
-        return jsonify({'success': True, 'status': new_status})
+        return json_response({'success': True, 'status': new_status})
     else:
-        return jsonify({'error': '設定失敗'}), 500
+        return json_response({'error': '設定失敗'}), 500
 
 
 @manga_bp.route('/reader/<path:chapter_path>')
 def reader_page(chapter_path):
     """漫畫閱讀器頁面"""
     return render_template('manga/reader.html', chapter_path=chapter_path, category='manga')
+
+
+@manga_bp.route('/api/progress/<path:chapter_path>', methods=['GET'])
+def get_progress(chapter_path):
+    """API：獲取漫畫章節閱讀進度"""
+    if not progress_store:
+        return json_response({'progress': None})
+    
+    return json_response({'progress': progress_store.get_progress('manga', chapter_path)})
+
+
+@manga_bp.route('/api/progress/<path:chapter_path>', methods=['POST'])
+def set_progress(chapter_path):
+    """API：記錄漫畫章節閱讀進度（寫入合併，稍後批次寫回）"""
+    if not progress_store:
+        return json_response({'error': '進度儲存未初始化'}), 500
+    
+    # sendBeacon 送出的內容類型可能是 text/plain，因此強制解析 JSON
+    data = request.get_json(force=True, silent=True) or {}
+    page = data.get('page')
+    total = data.get('total')
+    # bool 是 int 的子類別，需另外排除
+    if not all(isinstance(value, int) and not isinstance(value, bool) for value in (page, total)) \
+            or not 1 <= page <= total:
+        return json_response({'error': '無效的頁碼'}), 400
+    if not manga_service.has_chapter(chapter_path):
+        return json_response({'error': '章節不存在'}), 404
+    
+    record = progress_store.set_progress('manga', chapter_path, page, total)
+    return json_response({'success': True, 'progress': record})
+
+
+@manga_bp.route('/api/continue/<path:manga_path>')
+def get_continue_point(manga_path):
+    """API：獲取漫畫的繼續閱讀位置（章節與頁碼）"""
+    if not progress_store:
+        return json_response({'continue': None})
+    
+    return json_response({'continue': progress_store.get_continue_point('manga', manga_path)})
@@ -3,15 +3,77 @@
 處理漫畫相關的業務邏輯
 """
 
+import logging
 from pathlib import Path
 from core.base_reader import BaseReader
+from core.chapter_index import ChapterIndex
 from core.utils import parsePath, formatPathForUrl
 
+logger = logging.getLogger(__name__)
+
 
 class MangaService(BaseReader):
     """漫畫服務類別，繼承自 BaseReader"""
     
-    def get_manga_list(self, page=1, per_page=6, skip_chapters=False, status_filter=None, status_manager=None, favorite_only=False):
+    CATEGORY = 'manga'
+    
+    # 列表 API 可選的欄位
+    LIST_FIELDS = BaseReader.LIST_FIELDS + ('url_link',)
+    
+    def __init__(self, root_path, image_extensions, config=None):
+        """
+        初始化漫畫服務
+        
+        Args:
+            root_path: 漫畫根目錄路徑
+            image_extensions: 支援的圖片格式集合
+            config: 配置字典（可選）
+        """
+        super().__init__(root_path, image_extensions, config)
+        performance_config = self.config.get('performance', {})
+        self.chapter_index = ChapterIndex(  # 全域章節名稱索引（首次搜尋時建立）
+            self.index,
+            sort_key=self.natural_sort_key,
+            refresh_ttl=performance_config.get('metadata_refresh_seconds', 30)
+        )
+    
+    def export_snapshot(self):
+        """匯出作品索引、章節清單快取與全域章節索引"""
+        state = super().export_snapshot()
+        state['chapters'] = self.chapter_index.export_state()
+        return state
+
+    def restore_snapshot(self, state):
+        """載入啟動快照（含全域章節索引）"""
+        restored = super().restore_snapshot(state)
+        restored['chapters'] = self.chapter_index.restore_state(state.get('chapters'))
+        return restored
+
+    def search_chapters(self, keyword, limit=50):
+        """
+        跨所有漫畫搜尋章節名稱
+        
+        Args:
+            keyword: 搜尋關鍵字（章節名稱子字串，不分大小寫、全半形）
+            limit: 最多返回筆數
+            
+        Returns:
+            dict: {'results': [{'manga': {...}, 'chapter': {...}}], 'total': 符合總數}
+        """
+        if not keyword or not keyword.strip():
+            return {'results': [], 'total': 0}
+        
+        hits = self.chapter_index.search(keyword)
+        results = []
+        for manga_name, chapter_name in hits[:limit]:
+            results.append({
+                'manga': {'name': manga_name, 'path': manga_name},
+                'chapter': {'name': chapter_name, 'path': f"{manga_name}/{chapter_name}"}
+            })
+        return {'results': results, 'total': len(hits)}
+    
+    def get_manga_list(self, page=1, per_page=6, skip_chapters=False, status_filter=None, status_manager=None, favorite_only=False, search_keyword=None,
+                       cursor=None, sort=None, descending=True, fields=None, chapter_limit=None, search_match='substring'):
         """
         獲取所有漫畫列表
         
@@ -22,6 +84,13 @@ class MangaService(BaseReader):
             status_filter: 狀態篩選 (favorite/unreviewed/reviewed)
             status_manager: 狀態管理器實例
             favorite_only: 是否只顯示收藏的章節
+            search_keyword: 搜尋關鍵字（用於名稱模糊搜尋）
+            cursor: 已解碼的分頁游標（提供時忽略 page）
+            sort: 排序欄位（name/mtime/ctime/bytes/images/chapters）
+            descending: 欄位排序是否遞減
+            fields: 要計算與回傳的欄位集合（None 表示全部，見 LIST_FIELDS）
+            chapter_limit: 每部漫畫最多回傳的章節數（None 表示全部；其餘章節由詳情 API 延遲載入）
+            search_match: 名稱搜尋方式（substring 子字串 / prefix 前綴）
             
         Returns:
             dict: 包含漫畫列表和分頁信息的字典
@@ -31,71 +100,34 @@ class MangaService(BaseReader):
             return self._empty_result(page, per_page)
         
         try:
-            # 獲取所有漫畫目錄
-            all_dirs = [d for d in self.root_path.iterdir() if d.is_dir()]
-            
-            # 應用狀態篩選
-            if status_filter and status_manager:
-                all_dirs = status_manager.filter_by_status('manga', all_dirs, status_filter)
-            
-            total_count = len(all_dirs)
+            # 先判斷再取頁：統計欄位在兩者之間建立完成時，只會讓前端多重新載入一次
+            sort_pending = self.is_sort_pending(sort)
             
-            # 排序
-            all_dirs.sort(key=lambda x: self.natural_sort_key(x.name))
-            
-            # 分頁
-            start_idx = (page - 1) * per_page
-            end_idx = start_idx + per_page
-            page_dirs = all_dirs[start_idx:end_idx]
+            # 獲取本頁漫畫目錄（狀態篩選、名稱搜尋與分頁由索引處理，搜尋結果依相關度排序）
+            page_dirs, total_count, next_cursor = self.get_work_page(
+                page, per_page, cursor, status_filter, status_manager, search_keyword, sort=sort, descending=descending,
+                search_match=search_match
+            )
             
             for manga_dir in page_dirs:
                 try:
-                    # 使用緩存鍵
-                    cache_key = f"manga_{manga_dir}_{skip_chapters}_{favorite_only}"
+                    # 使用緩存鍵（不同欄位選擇與章節上限分開緩存）
+                    cache_key = f"manga_{manga_dir}_{skip_chapters}_{favorite_only}_{self.fields_cache_key(fields, chapter_limit)}"
                     
-                    if cache_key in self.cache:
-                        manga_info = self.cache[cache_key]
-                    else:
-                        if skip_chapters:
-                            # 快速模式：不載入章節詳情
-                            chapters = []
-                            # 檢查是否有子資料夾
-                            subdirs = [d for d in manga_dir.iterdir() if d.is_dir()]
-                            chapter_count = len(subdirs) if subdirs else 0
-                        else:
-                            # 完整模式：載入章節詳情
-                            chapters = self.get_chapters(
-                                manga_dir, 
-                                favorite_only=favorite_only,
-                                status_manager=status_manager
-                            )
-                            chapter_count = len(chapters)
-                        
-                        cover_image = self.get_cover_image(manga_dir)
-                        url_link = self.get_url_link(manga_dir)
-                        
-                        manga_info = {
-                            'name': manga_dir.name,
-                            'path': formatPathForUrl(manga_dir.relative_to(self.root_path)),
-                            'chapters': chapters,
-                            'chapter_count': chapter_count,
-                            'cover_image': cover_image,
-                            'url_link': url_link
-                        }
-                        
-                        # 緩存結果（最多緩存100個）
-                        if len(self.cache) < 100:
-                            self.cache[cache_key] = manga_info
+                    # 緩存結果（最多緩存100個；並行請求同一部漫畫時只建立一次）
+                    manga_info = self.get_cached(cache_key, lambda manga_dir=manga_dir: self._build_manga_info(
+                        manga_dir, skip_chapters, favorite_only, status_manager, fields, chapter_limit
+                    ))
                     
                     # 添加狀態信息（不緩存，因為會變動）
-                    if status_manager:
+                    if status_manager and self.wants_field(fields, 'status'):
                         manga_info_copy = manga_info.copy()
                         manga_info_copy['status'] = status_manager.get_status('manga', manga_dir.name)
                         mangas.append(manga_info_copy)
                     else:
                         mangas.append(manga_info)
-                except Exception as e:
-                    print(f"處理漫畫 {manga_dir.name} 時出錯: {e}")
+                except Exception:
+                    logger.exception("處理漫畫 %s 時出錯", manga_dir.name)
                     continue
             
             return {
@@ -103,12 +135,50 @@ class MangaService(BaseReader):
                 'total': total_count,
                 'page': page,
                 'per_page': per_page,
-                'total_pages': (total_count + per_page - 1) // per_page
+                'total_pages': (total_count + per_page - 1) // per_page,
+                'next_cursor': next_cursor,
+                'sort_pending': sort_pending
             }
-        except Exception as e:
-            print(f"獲取漫畫列表時出錯: {e}")
+        except Exception:
+            logger.exception("獲取漫畫列表時出錯")
             return self._empty_result(page, per_page)
     
+    def _build_manga_info(self, manga_dir, skip_chapters, favorite_only, status_manager, fields, chapter_limit):
+        """
+        建立列表中單部漫畫的資訊（只計算 fields 要求的欄位）
+        
+        Returns:
+            dict: 漫畫資訊
+        """
+        manga_info = {}
+        if self.wants_field(fields, 'name'):
+            manga_info['name'] = manga_dir.name
+        if self.wants_field(fields, 'path'):
+            manga_info['path'] = formatPathForUrl(manga_dir.relative_to(self.root_path))
+        
+        if not skip_chapters and self.wants_field(fields, 'chapters'):
+            # 完整模式：載入章節詳情（有上限時只統計前幾個章節的圖片）
+            chapters, chapter_count = self.get_chapter_preview(
+                manga_dir, chapter_limit, favorite_only=favorite_only, status_manager=status_manager
+            )
+            manga_info['chapters'] = chapters
+            if chapter_limit is not None:
+                manga_info['has_more_chapters'] = chapter_count > len(chapters)
+        elif self.wants_field(fields, 'chapters') or self.wants_field(fields, 'chapter_count'):
+            # 快速模式：不讀取章節內容，章節數以章節目錄數估計（空章節會使數量略多；
+            # 精確數量由完整模式或詳情 API 提供），每部漫畫的成本與章節數無關
+            if self.wants_field(fields, 'chapters'):
+                manga_info['chapters'] = []
+            chapter_count = len(self.get_chapter_dirs(manga_dir))
+        
+        if self.wants_field(fields, 'chapter_count'):
+            manga_info['chapter_count'] = chapter_count
+        if self.wants_field(fields, 'cover_image'):
+            manga_info['cover_image'] = self.get_cover_image(manga_dir)
+        if self.wants_field(fields, 'url_link'):
+            manga_info['url_link'] = self.get_url_link(manga_dir)
+        return manga_info
+    
     def get_chapters(self, manga_path, favorite_only=False, status_manager=None):
         """
         獲取漫畫的章節列表
@@ -121,32 +191,56 @@ class MangaService(BaseReader):
         Returns:
             list: 章節列表
         """
-        chapters = []
-        manga_path = Path(manga_path)
+        chapters, _ = self.get_chapter_preview(manga_path, favorite_only=favorite_only, status_manager=status_manager)
+        return chapters
+    
+    def get_chapter_preview(self, manga_path, limit=None, favorite_only=False, status_manager=None):
+        """
+        獲取漫畫的前幾個章節（自然排序）
+        章節總數只計算含有圖片的章節（與完整章節列表一致），因此會讀取每個章節的圖片清單（清單有快取）
         
-        # 檢查是否有子資料夾（章節）
-        subdirs = [d for d in manga_path.iterdir() if d.is_dir()]
+        Args:
+            manga_path: 漫畫目錄路徑
+            limit: 最多回傳的章節數（None 表示全部）
+            favorite_only: 是否只顯示收藏的章節
+            status_manager: 狀態管理器實例
+            
+        Returns:
+            tuple: (章節列表, 章節總數)
+        """
+        # 多個請求同時載入同一部漫畫時只讀取一次目錄
+        key = f"chapters_{manga_path}_{limit}_{favorite_only}"
+        return self.flight.do(key, self._load_chapter_preview, manga_path, limit, favorite_only, status_manager)
+    
+    def _load_chapter_preview(self, manga_path, limit, favorite_only, status_manager):
+        """讀取漫畫的前幾個章節（見 get_chapter_preview）"""
+        candidates = []
+        for chapter_dir in self.get_chapter_dirs(manga_path):
+            chapter_path = formatPathForUrl(chapter_dir.relative_to(self.root_path))
+            
+            # 如果啟用只顯示收藏，則檢查章節狀態（不需讀取章節內容）
+            if favorite_only and status_manager:
+                chapter_status = status_manager.get_status('manga', chapter_path)
+                if chapter_status != 'favorite':
+                    continue
+            candidates.append((chapter_dir, chapter_path))
         
-        if subdirs:
-            # 有章節資料夾
-            for chapter_dir in subdirs:
-                images = self.get_images_in_dir(chapter_dir)
-                if images:
-                    chapter_path = formatPathForUrl(chapter_dir.relative_to(self.root_path))
-                    
-                    # 如果啟用只顯示收藏，則檢查章節狀態
-                    if favorite_only and status_manager:
-                        chapter_status = status_manager.get_status('manga', chapter_path)
-                        if chapter_status != 'favorite':
-                            continue
-                    
-                    chapters.append({
-                        'name': chapter_dir.name,
-                        'path': chapter_path,
-                        'image_count': len(images)
-                    })
+        chapters = []
+        chapter_count = 0
+        for chapter_dir, chapter_path in candidates:
+            image_count = self.count_images_in_dir(chapter_dir)
+            if not image_count:
+                continue
+            chapter_count += 1
+            # 超過上限的章節只計數不回傳
+            if limit is None or len(chapters) < limit:
+                chapters.append({
+                    'name': chapter_dir.name,
+                    'path': chapter_path,
+                    'image_count': image_count
+                })
         
-        return sorted(chapters, key=lambda x: self.natural_sort_key(x['name']))
+        return chapters, chapter_count
     
     def get_chapter_images(self, chapter_path):
         """
@@ -158,17 +252,11 @@ class MangaService(BaseReader):
         Returns:
             list: 圖片路徑列表
         """
-        print(f"[DEBUG] 請求章節圖片: {chapter_path}")
-        # 使用 parsePath 解析路徑
-        parsed_path = parsePath(chapter_path)
-        full_path = self.root_path / parsed_path
-        print(f"[DEBUG] 解析後路徑: {parsed_path}")
-        print(f"[DEBUG] 完整路徑: {full_path}")
-        print(f"[DEBUG] 路徑是否存在: {full_path.exists()}")
+        full_path = self.resolve_path(chapter_path)
+        if full_path is None:
+            return []
         images = self.get_images_in_dir(full_path)
-        print(f"[DEBUG] 找到圖片數量: {len(images)}")
-        for img in images[:5]:  # 只顯示前5張
-            print(f"[DEBUG] 圖片: {img}")
+        logger.debug("chapter_images path=%s resolved=%s count=%d", chapter_path, full_path, len(images))
         return images
     
     def get_chapter_navigation(self, chapter_path, favorite_only=False, status_manager=None):
@@ -183,8 +271,10 @@ class MangaService(BaseReader):
         Returns:
             dict: 導航信息
         """
+        full_path = self.resolve_path(chapter_path)
+        if full_path is None:
+            return {'prev': None, 'next': None, 'manga_name': ''}
         parsed_path = parsePath(chapter_path)
-        full_path = self.root_path / parsed_path
         
         # 獲取漫畫目錄（章節的父目錄）
         manga_path = full_path.parent
@@ -231,6 +321,53 @@ class MangaService(BaseReader):
             'current_index': current_index + 1  # 顯示時從1開始
         }
     
+    def get_reader_bootstrap(self, chapter_path, favorite_only=False, status_manager=None, columns=()):
+        """
+        獲取閱讀器開啟章節所需的全部資料（取代多次依序請求）
+        
+        Args:
+            chapter_path: 章節路徑（相對路徑）
+            favorite_only: 是否只顯示收藏的章節
+            status_manager: 狀態管理器實例
+            columns: 章節清單的逐圖欄位
+            
+        Returns:
+            dict: {'manifest', 'total', 'navigation', 'chapters', 'statuses'}，
+                  chapters 為章節選單列表，statuses 為選單各章節（含當前章節）的狀態；
+                  章節不存在時返回 None
+        """
+        # 先確認章節存在，導航與章節選單才會讀取漫畫目錄
+        full_path = self.resolve_path(chapter_path)
+        if full_path is None or not full_path.is_dir():
+            return None
+        
+        manifest = self._get_existing_chapter_manifest(full_path, chapter_path, columns)
+        navigation = self.get_chapter_navigation(chapter_path, favorite_only=favorite_only, status_manager=status_manager)
+        chapters = self.get_chapters(full_path.parent)
+        
+        # 一次取得整個類別的狀態，不逐章節查詢
+        all_statuses = status_manager.get_all_statuses('manga') if status_manager else {}
+        statuses = {
+            chapter['path']: all_statuses.get(chapter['path'], 'unreviewed')
+            for chapter in chapters
+        }
+        current = navigation.get('current_chapter')
+        if current:
+            statuses.setdefault(current['path'], all_statuses.get(current['path'], 'unreviewed'))
+        
+        # 章節選單：只顯示收藏時使用收藏章節（沒有收藏章節時使用全部章節，與導航一致）
+        if favorite_only:
+            favorite_chapters = [c for c in chapters if statuses[c['path']] == 'favorite']
+            chapters = favorite_chapters or chapters
+        
+        return {
+            'manifest': manifest,
+            'total': len(manifest['files']),
+            'navigation': navigation,
+            'chapters': chapters,
+            'statuses': statuses
+        }
+    
     def get_url_link(self, manga_path):
         """
         獲取漫畫資料夾中的網際網路捷徑連結
@@ -264,7 +401,7 @@ class MangaService(BaseReader):
                         return url
                         
         except Exception as e:
-            print(f"讀取 URL 文件時出錯 ({manga_path.name}): {e}")
+            logger.warning("讀取 URL 文件時出錯 (%s): %s", manga_path.name, e)
         
         return None
     
@@ -275,5 +412,6 @@ class MangaService(BaseReader):
             'total': 0,
             'page': page,
             'per_page': per_page,
-            'total_pages': 0
+            'total_pages': 0,
+            'next_cursor': None
         }
@@ -0,0 +1,119 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+正式環境啟動器
+先建立應用並預熱作品索引，再啟動 worker
+
+- 有安裝 gunicorn（Linux / macOS）：preload 模式，索引載入完成後才 fork worker，
+  worker 以寫入時複製共用索引記憶體；SIGHUP 平順重啟 worker，SIGTERM 等待處理中的請求後關閉
+- 有安裝 waitress（Windows 等不支援 fork 的環境）：單一進程多執行緒
+- 都沒有：退回 Flask 內建伺服器（多執行緒，僅適合測試）
+
+用法：
+    python serve.py [--host HOST] [--port PORT] [--workers N] [--threads N]
+"""
+
+import argparse
+import logging
+
+from app import create_app, register_exit_hooks, warm_up
+from config import load_config
+
+try:
+    from gunicorn.app.base import BaseApplication
+except ImportError:  # 選用相依套件
+    BaseApplication = None
+
+try:
+    import waitress
+except ImportError:  # 選用相依套件
+    waitress = None
+
+logger = logging.getLogger(__name__)
+
+
+def parse_args(server_config):
+    """
+    解析命令列參數（預設值取自 [server] 設定）
+
+    Args:
+        server_config: 配置的 server 區段
+
+    Returns:
+        argparse.Namespace: 參數
+    """
+    parser = argparse.ArgumentParser(description='本地漫畫閱讀器（正式環境啟動器）')
+    parser.add_argument('--host', default=server_config.get('host', '127.0.0.1'))
+    parser.add_argument('--port', type=int, default=server_config.get('port', 5000))
+    parser.add_argument('--workers', type=int, default=server_config.get('workers', 2),
+                        help='worker 進程數（gunicorn）')
+    parser.add_argument('--threads', type=int, default=server_config.get('threads', 8),
+                        help='每個 worker 的執行緒數（SSE 連線會各佔用一個執行緒）')
+    parser.add_argument('--graceful-timeout', type=int, default=server_config.get('graceful_timeout', 30),
+                        help='重啟 / 關閉時等待處理中請求的秒數')
+    parser.add_argument('--warm-stats', action='store_true',
+                        help='啟動時一併建立排序用統計欄位')
+    return parser.parse_args()
+
+
+def run_gunicorn(app, args):
+    """以 gunicorn preload 模式啟動（master 已持有預熱的應用，fork 後直接使用）"""
+    progress_store = app.extensions['reader']['progress_store']
+    index_snapshot = app.extensions['reader']['index_snapshot']
+    if index_snapshot is not None:
+        # master 只持有啟動時的索引，由 worker 保存請求期間建立的快取
+        index_snapshot.save_on_exit = False
+
+    def worker_exit(server, worker):
+        """worker 結束前寫回尚未儲存的閱讀進度與啟動快照"""
+        progress_store.flush()
+        if index_snapshot is not None:
+            index_snapshot.save()
+
+    options = {
+        'bind': f"{args.host}:{args.port}",
+        'workers': args.workers,
+        'worker_class': 'gthread',  # SSE 為長連線，需要多執行緒 worker
+        'threads': args.threads,
+        'preload_app': True,
+        'graceful_timeout': args.graceful_timeout,
+        'timeout': 120,
+        'worker_exit': worker_exit
+    }
+
+    class ReaderApplication(BaseApplication):
+        """以既有應用實例啟動的 gunicorn 應用"""
+
+        def load_config(self):
+            for key, value in options.items():
+                self.cfg.set(key, value)
+
+        def load(self):
+            return app
+
+    ReaderApplication().run()
+
+
+def main():
+    """啟動正式環境伺服器"""
+    config = load_config()
+    args = parse_args(config.get('server', {}))
+
+    app = create_app(config)
+    register_exit_hooks(app)
+    warm_up(app, stats=args.warm_stats or None)
+
+    logger.info("服務器地址: http://%s:%s", args.host, args.port)
+    if BaseApplication is not None:
+        logger.info("gunicorn：%d 個 worker × %d 執行緒（kill -HUP 平順重啟）", args.workers, args.threads)
+        run_gunicorn(app, args)
+    elif waitress is not None:
+        logger.info("waitress：%d 執行緒", args.threads)
+        waitress.serve(app, host=args.host, port=args.port, threads=args.threads)
+    else:
+        logger.warning("未安裝 gunicorn 或 waitress，改用 Flask 內建伺服器（僅適合測試）")
+        app.run(host=args.host, port=args.port, threaded=True, debug=False)
+
+
+if __name__ == '__main__':
+    main()
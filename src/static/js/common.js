@@ -9,6 +9,21 @@ function escapeHtml(text) {
     return div.innerHTML;
 }
 
+// 章節清單格式版本（需與後端 BaseReader.MANIFEST_VERSION 一致）
+const CHAPTER_MANIFEST_VERSION = 1;
+
+// 將章節清單（基底路徑 + 檔名陣列）展開為完整圖片路徑
+function expandChapterManifest(manifest) {
+    if (!manifest || manifest.version !== CHAPTER_MANIFEST_VERSION) {
+        throw new Error('不支援的章節清單版本');
+    }
+    const prefix = manifest.base ? `${manifest.base}/` : '';
+    return manifest.files.map(name => prefix + name);
+}
+
+// 列表回傳 sort_pending（排序欄位尚在建立）時重新載入的間隔（毫秒）
+const SORT_PENDING_RETRY_MS = 2000;
+
 // 節流函數
 function throttle(func, limit) {
     let inThrottle;
@@ -54,3 +69,108 @@ function hideError() {
         errorDiv.style.display = 'none';
     }
 }
+
+// 伺服器事件類型（連線的分頁需接收所有類型再轉送，各分頁的處理函數可能不同）
+const SERVER_EVENT_TYPES = ['status', 'reload', 'library'];
+const SERVER_EVENTS_CHANNEL = 'reader-server-events';
+// 沒有即時事件時的輪詢間隔，以及伺服器拒絕連線後重新嘗試的間隔（毫秒）
+const SERVER_EVENTS_POLL_MS = 30000;
+const SERVER_EVENTS_RETRY_MS = 60000;
+
+// 建立 SSE 連線：onEvent(type, data) 接收事件，onState(live) 在連線建立 / 被拒絕時呼叫
+// 伺服器拒絕連線（連線數已達上限）時 EventSource 不會自動重連，改為定期重新嘗試
+function openServerEventSource(onEvent, onState) {
+    const source = new EventSource('/api/events');
+    SERVER_EVENT_TYPES.forEach(type => {
+        source.addEventListener(type, (e) => {
+            let data;
+            try {
+                data = JSON.parse(e.data);
+            } catch (error) {
+                console.warn('無法解析伺服器事件:', error);
+                return;
+            }
+            onEvent(type, data);
+        });
+    });
+    source.addEventListener('open', () => onState(true));
+    source.addEventListener('error', () => {
+        if (source.readyState === EventSource.CLOSED) {
+            onState(false);
+            setTimeout(() => openServerEventSource(onEvent, onState), SERVER_EVENTS_RETRY_MS);
+        }
+    });
+}
+
+// 訂閱伺服器事件（SSE），handlers 為 { 事件類型: 處理函數 }
+// - 同一瀏覽器的分頁共用一條連線：以 Web Locks 選出一個分頁連線，事件經 BroadcastChannel 轉送，
+//   該分頁關閉時鎖自動釋放，由下一個分頁接手（執行緒伺服器上每條 SSE 連線佔用一個執行緒）
+// - 沒有即時事件（不支援 EventSource 或伺服器連線數已達上限）時定期呼叫 reload 處理函數
+// 返回 { live }：live 為 true 表示目前有即時事件
+function subscribeServerEvents(handlers) {
+    const subscription = { live: false };
+    let pollTimer = null;
+
+    const dispatch = (type, data) => {
+        const handler = handlers[type];
+        if (!handler) return;
+        try {
+            handler(data);
+        } catch (error) {
+            console.warn('無法處理伺服器事件:', error);
+        }
+    };
+
+    const setLive = (live) => {
+        const recovered = live && pollTimer !== null;
+        subscription.live = live;
+        if (live) {
+            if (pollTimer !== null) {
+                clearInterval(pollTimer);
+                pollTimer = null;
+            }
+            // 輪詢期間可能錯過事件，恢復連線後重新載入一次
+            if (recovered) dispatch('reload', { type: 'reload' });
+        } else if (pollTimer === null) {
+            pollTimer = setInterval(() => dispatch('reload', { type: 'reload' }), SERVER_EVENTS_POLL_MS);
+        }
+    };
+
+    if (typeof EventSource === 'undefined') {
+        setLive(false);
+        return subscription;
+    }
+    // Web Locks 僅在安全來源（HTTPS / localhost）可用，否則每個分頁各自連線（受伺服器上限保護）
+    if (typeof BroadcastChannel === 'undefined' || !navigator.locks) {
+        openServerEventSource(dispatch, setLive);
+        return subscription;
+    }
+
+    const channel = new BroadcastChannel(SERVER_EVENTS_CHANNEL);
+    let leaderState = null;  // 本分頁為連線分頁時的連線狀態
+    channel.addEventListener('message', (e) => {
+        const message = e.data || {};
+        if (message.kind === 'event') {
+            dispatch(message.type, message.data);
+        } else if (message.kind === 'state') {
+            setLive(message.live);
+        } else if (message.kind === 'hello' && leaderState !== null) {
+            channel.postMessage({ kind: 'state', live: leaderState });
+        }
+    });
+
+    // 取得鎖的分頁負責連線，鎖持有到分頁關閉
+    navigator.locks.request(SERVER_EVENTS_CHANNEL, () => new Promise(() => {
+        openServerEventSource((type, data) => {
+            dispatch(type, data);
+            channel.postMessage({ kind: 'event', type, data });
+        }, (live) => {
+            leaderState = live;
+            setLive(live);
+            channel.postMessage({ kind: 'state', live });
+        });
+    }));
+    // 詢問連線分頁目前的狀態
+    channel.postMessage({ kind: 'hello' });
+    return subscription;
+}
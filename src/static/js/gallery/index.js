@@ -6,14 +6,21 @@ let allWorks = [];
 let config = {};
 let currentPage = 1;
 let totalPages = 1;
+let currentSort = 'name';  // 排序欄位（name 為自然排序，其他欄位由伺服器索引遞減排序）
+let nextCursor = null;  // 下一頁游標（無限滾動使用，新增作品不會造成結果位移）
 let isLoading = false;
+let serverEvents = null;  // 伺服器事件訂閱（live 為 true 時有即時事件）
 let currentStatusFilter = 'all';  // 改為狀態篩選
 let currentSearchKeyword = '';
+let currentArtistFilter = '';  // 作者篩選（點擊卡片上的作者名稱設定）
+let featuredOnly = false;  // 只顯示精選作品
 let searchDebounceTimer = null;
 
 const API_PREFIX = '/gallery/api';
 const IMAGE_PREFIX = '/gallery/image/';
 const READER_PREFIX = '/gallery/reader/';
+// 列表只請求卡片實際顯示的欄位
+const LIST_FIELDS = 'name,path,cover_image,chapter_count,status,artist,featured';
 
 // 頁面載入時初始化
 document.addEventListener('DOMContentLoaded', async () => {
@@ -21,6 +28,8 @@ document.addEventListener('DOMContentLoaded', async () => {
     applyConfig();
     bindEvents();
     loadWorks();
+    loadStatusCounts();
+    bindServerEvents();
 });
 
 // 應用配置
@@ -52,24 +61,55 @@ function bindEvents() {
     });
 
     // 篩選按鈕事件
-    document.querySelectorAll('.filter-btn').forEach(btn => {
+    document.querySelectorAll('.filter-btn[data-status]').forEach(btn => {
         btn.addEventListener('click', (e) => {
             // 移除所有 active 類
-            document.querySelectorAll('.filter-btn').forEach(b => b.classList.remove('active'));
-            // 添加 active 到點擊的按鈕
-            e.target.classList.add('active');
+            document.querySelectorAll('.filter-btn[data-status]').forEach(b => b.classList.remove('active'));
+            // 添加 active 到點擊的按鈕（按鈕內含計數 span，使用 btn 而非 e.target）
+            btn.classList.add('active');
             // 設置當前篩選
-            currentStatusFilter = e.target.dataset.status;
+            currentStatusFilter = btn.dataset.status;
             // 重新載入
             currentPage = 1;
             loadWorks();
         });
     });
 
+    // 精選篩選切換
+    document.getElementById('featuredToggle').addEventListener('click', (e) => {
+        featuredOnly = !featuredOnly;
+        e.currentTarget.classList.toggle('active', featuredOnly);
+        currentPage = 1;
+        loadWorks();
+    });
+
+    // 清除作者篩選
+    document.getElementById('artistFilter').addEventListener('click', () => {
+        setArtistFilter('');
+    });
+
+    // 排序選單
+    document.getElementById('sortSelect').addEventListener('change', (e) => {
+        currentSort = e.target.value;
+        currentPage = 1;
+        loadWorks();
+    });
+
     // 滾動事件（無限滾動）
     window.addEventListener('scroll', throttle(handleScroll, 200));
 }
 
+// 設定作者篩選（空字串表示清除）
+function setArtistFilter(artist) {
+    currentArtistFilter = artist;
+    const artistBtn = document.getElementById('artistFilter');
+    artistBtn.textContent = artist ? `🎨 ${artist} ✕` : '';
+    artistBtn.title = artist ? '清除作者篩選' : '';
+    artistBtn.style.display = artist ? '' : 'none';
+    currentPage = 1;
+    loadWorks();
+}
+
 // 載入作品列表
 async function loadWorks(page = 1, append = false) {
     if (isLoading) return;
@@ -85,17 +125,30 @@ async function loadWorks(page = 1, append = false) {
         const perPage = (config.gallery && config.gallery.per_page) || 6;
 
         // 使用配置的每頁數量
-        let url = `${API_PREFIX}/list?page=${page}&per_page=${perPage}`;
+        let url = `${API_PREFIX}/list?per_page=${perPage}&fields=${LIST_FIELDS}`;
+        // 附加下一頁時使用游標，否則使用頁碼
+        url += append && nextCursor ? `&cursor=${encodeURIComponent(nextCursor)}` : `&page=${page}`;
 
         // 添加狀態篩選參數
         if (currentStatusFilter && currentStatusFilter !== 'all') {
             url += `&status=${currentStatusFilter}`;
         }
 
+        // 作者 / 精選篩選（伺服器端中繼資料索引）
+        if (currentArtistFilter) {
+            url += `&artist=${encodeURIComponent(currentArtistFilter)}`;
+        }
+        if (featuredOnly) {
+            url += `&featured=true`;
+        }
+
         // 如果有搜尋關鍵字，加入參數
         if (currentSearchKeyword) {
             url += `&search=${encodeURIComponent(currentSearchKeyword)}`;
         }
+        if (currentSort !== 'name') {
+            url += `&sort=${currentSort}`;
+        }
 
         const response = await fetch(url);
         if (!response.ok) {
@@ -106,6 +159,15 @@ async function loadWorks(page = 1, append = false) {
         const works = data.mangas || [];  // API 回傳 mangas 欄位
         currentPage = data.page || 1;
         totalPages = data.total_pages || 1;
+        nextCursor = data.next_cursor || null;
+
+        // 排序欄位仍在伺服器背景建立時先以名稱排序顯示，稍後重新載入
+        if (data.sort_pending && !append) {
+            const pendingSort = currentSort;
+            setTimeout(() => {
+                if (currentSort === pendingSort) loadWorks();
+            }, SORT_PENDING_RETRY_MS);
+        }
 
         if (append) {
             allWorks = allWorks.concat(works);
@@ -154,6 +216,13 @@ function displayWorks(works) {
             </div>
         `;
 
+        // 作者（點擊後篩選同作者作品）
+        const artistHtml = work.artist ? `
+            <div class="work-artist" data-artist="${escapeHtml(work.artist)}"
+                 onclick="event.stopPropagation(); setArtistFilter(this.dataset.artist)"
+                 title="只顯示此作者的作品">🎨 ${escapeHtml(work.artist)}</div>
+        ` : '';
+
         return `
             <div class="work-card" onclick="openWork('${work.path}')">
                 <div class="work-cover">
@@ -165,7 +234,8 @@ function displayWorks(works) {
                         ${favoriteStar}
                     </button>
                 </div>
-                <div class="work-title">${escapeHtml(work.name)}</div>
+                <div class="work-title">${work.featured ? '✨ ' : ''}${escapeHtml(work.name)}</div>
+                ${artistHtml}
                 ${imageCountHtml}
             </div>
         `;
@@ -217,14 +287,66 @@ function updatePaginationInfo(data) {
     infoDiv.innerHTML = `
         <div style="margin-bottom: 10px;">
             顯示 ${allWorks.length} / ${data.total} 個作品
-            ${data.total > allWorks.length ? `<button onclick="loadMore()" style="margin-left: 10px; padding: 8px 16px; background: #667eea; color: white; border: none; border-radius: 5px; cursor: pointer;">載入更多</button>` : ''}
+            ${nextCursor ? `<button onclick="loadMore()" style="margin-left: 10px; padding: 8px 16px; background: #667eea; color: white; border: none; border-radius: 5px; cursor: pointer;">載入更多</button>` : ''}
         </div>
     `;
 }
 
+// 載入篩選分頁的各狀態數量
+async function loadStatusCounts() {
+    try {
+        const response = await fetch(`${API_PREFIX}/status/counts`);
+        if (!response.ok) return;
+
+        const counts = await response.json();
+        document.querySelectorAll('.filter-btn').forEach(btn => {
+            const countSpan = btn.querySelector('.filter-count');
+            const count = counts[btn.dataset.status];
+            if (countSpan && count !== undefined) {
+                countSpan.textContent = `(${count})`;
+            }
+        });
+    } catch (error) {
+        console.warn('無法載入狀態數量:', error);
+    }
+}
+
+// 訂閱伺服器事件：其他分頁或裝置的狀態變更會即時反映在卡片與計數上
+function bindServerEvents() {
+    serverEvents = subscribeServerEvents({
+        status: (event) => {
+            if (event.category !== 'gallery') return;
+            applyStatusChange(event.path, event.status);
+            loadStatusCounts();
+        },
+        reload: () => loadStatusCounts(),
+        library: (event) => {
+            if (event.category === 'gallery') {
+                loadStatusCounts();
+            }
+        }
+    });
+}
+
+// 套用狀態變更到本地資料與卡片按鈕
+function applyStatusChange(path, status) {
+    const work = allWorks.find(item => item.path === path);
+    if (work) {
+        work.status = status;
+    }
+
+    const isFavorite = status === 'favorite';
+    document.querySelectorAll('.work-favorite-btn').forEach(btn => {
+        if (btn.dataset.path === path) {
+            btn.textContent = isFavorite ? '★' : '☆';
+            btn.title = isFavorite ? '取消收藏' : '加入收藏';
+        }
+    });
+}
+
 // 載入更多
 function loadMore() {
-    if (currentPage < totalPages) {
+    if (nextCursor) {
         loadWorks(currentPage + 1, true);
     }
 }
@@ -235,7 +357,7 @@ function handleScroll() {
         return;
     }
 
-    if (currentPage >= totalPages) {
+    if (!nextCursor) {
         return;
     }
 
@@ -253,10 +375,9 @@ async function toggleCardFavorite(workPath, buttonElement) {
     buttonElement.classList.add('loading');
 
     try {
-        // 獲取當前狀態
-        const response = await fetch(`${API_PREFIX}/status/${encodeURIComponent(workPath)}`);
-        const currentData = await response.json();
-        const isFavorite = currentData.status === 'favorite';
+        // 使用本地狀態（由 SSE 事件保持同步），不需要再查詢一次
+        const work = allWorks.find(w => w.path === workPath);
+        const isFavorite = work ? work.status === 'favorite' : false;
 
         // 切換狀態：如果已收藏則改為未審核，否則設為收藏
         const newStatus = isFavorite ? 'unreviewed' : 'favorite';
@@ -270,14 +391,12 @@ async function toggleCardFavorite(workPath, buttonElement) {
         });
 
         if (updateResponse.ok) {
-            // 更新按鈕顯示
-            buttonElement.textContent = isFavorite ? '☆' : '★';
-            buttonElement.title = isFavorite ? '加入收藏' : '取消收藏';
-
-            // 更新 allWorks 陣列中的狀態
-            const work = allWorks.find(w => w.path === workPath);
-            if (work) {
-                work.status = newStatus;
+            // 更新按鈕顯示與本地狀態
+            applyStatusChange(workPath, newStatus);
+
+            // 沒有 SSE 時自行更新篩選分頁計數（有 SSE 時由事件觸發）
+            if (!serverEvents || !serverEvents.live) {
+                loadStatusCounts();
             }
 
             // 如果當前在收藏篩選頁，且剛剛取消了收藏，需要重新載入列表
@@ -10,7 +10,7 @@ class GalleryReader {
         this.chapterPath = decodeURIComponent(pathParts.slice(3).join('/'));
 
         // 設置 API 端點
-        this.apiChapterEndpoint = '/gallery/api/chapter/';
+        this.apiBootstrapEndpoint = '/gallery/api/reader-bootstrap/';
         this.imagePrefix = '/gallery/image/';
 
         this.allImageUrls = [];  // 所有圖片 URL
@@ -22,23 +22,19 @@ class GalleryReader {
         this.batchSize = 5;  // 每批渲染 5 張
         this.preloadCount = 8;  // 預載入接下來的 8 張
         this.preloadedSet = new Set();  // 追蹤已預載入的圖片
+        this.isFavorite = false;  // 當前作品是否已收藏（由 SSE 事件保持同步）
+        this.startIndex = 0;  // 起始圖片索引（繼續閱讀時從儲存的頁碼開始）
+        this.reportedPage = 0;  // 最後回報給伺服器的頁碼
+        this.pendingPage = 0;
+        this.progressTimer = null;
 
-        this.initializeElements();
-        this.loadConfig().then(() => {
-            this.bindEvents();
-            this.loadAllImageUrls();
-        });
-    }
+        // URL 指定的起始頁（例如 ?page=12），優先於儲存的進度
+        const pageParam = parseInt(new URLSearchParams(window.location.search).get('page'));
+        this.requestedPage = pageParam > 0 ? pageParam : 0;
 
-    async loadConfig() {
-        try {
-            const response = await fetch('/api/config');
-            if (response.ok) {
-                this.config = await response.json();
-            }
-        } catch (error) {
-            console.warn('無法載入配置:', error);
-        }
+        this.initializeElements();
+        this.bindEvents();
+        this.loadAllImageUrls();
     }
 
     initializeElements() {
@@ -57,25 +53,85 @@ class GalleryReader {
     bindEvents() {
         // 鍵盤事件
         document.addEventListener('keydown', (e) => this.handleKeyboard(e));
+
+        // 滾動時記錄閱讀進度
+        this.imageContainer.addEventListener('scroll', throttle(() => {
+            this.reportProgress(this.getCurrentIndex() + 1);
+        }, 500));
+
+        // 離開頁面時送出最後的閱讀進度
+        window.addEventListener('pagehide', () => this.sendProgress(true));
+    }
+
+    getCurrentIndex() {
+        // 以二分搜尋找出位於視窗中心的圖片（子元素依索引排列，避免逐一計算位置）
+        const items = this.imagesContainer.children;
+        if (items.length === 0) return 0;
+
+        const containerRect = this.imageContainer.getBoundingClientRect();
+        const centerY = containerRect.top + containerRect.height / 2;
+        let low = 0;
+        let high = items.length - 1;
+        while (low < high) {
+            const mid = Math.ceil((low + high) / 2);
+            if (items[mid].getBoundingClientRect().top <= centerY) {
+                low = mid;
+            } else {
+                high = mid - 1;
+            }
+        }
+        return parseInt(items[low].dataset.index) || 0;
+    }
+
+    reportProgress(page) {
+        // 只記錄最新頁碼，最多每 2 秒送出一次（伺服器端會再合併寫入）
+        this.pendingPage = page;
+        if (this.progressTimer) return;
+        this.progressTimer = setTimeout(() => {
+            this.progressTimer = null;
+            this.sendProgress(false);
+        }, 2000);
+    }
+
+    sendProgress(useBeacon) {
+        if (!this.pendingPage || this.pendingPage === this.reportedPage) return;
+
+        const url = `/gallery/api/progress/${encodeURIComponent(this.chapterPath)}`;
+        const body = JSON.stringify({ page: this.pendingPage, total: this.totalImages });
+        this.reportedPage = this.pendingPage;
+
+        if (useBeacon && navigator.sendBeacon) {
+            navigator.sendBeacon(url, body);
+        } else {
+            fetch(url, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: body
+            }).catch(error => console.warn('無法儲存閱讀進度:', error));
+        }
     }
 
     async loadAllImageUrls() {
         try {
             // 一次性載入所有圖片 URL
-            const apiUrl = `${this.apiChapterEndpoint}${encodeURIComponent(this.chapterPath)}`;
-            const response = await fetch(apiUrl);
+            // 單一請求取得配置、精簡章節清單（基底路徑 + 檔名）、導航、作品狀態與閱讀進度
+            const response = await fetch(`${this.apiBootstrapEndpoint}${encodeURIComponent(this.chapterPath)}`);
             if (!response.ok) throw new Error('章節不存在');
 
             const data = await response.json();
-            this.allImageUrls = data.images || [];
+            this.config = data.config || {};
+            this.allImageUrls = data.manifest ? expandChapterManifest(data.manifest) : (data.images || []);
             this.totalImages = data.total || this.allImageUrls.length;
             this.navigation = data.navigation || null;
+            const savedPage = this.requestedPage || (data.progress && data.progress.page) || 0;
+            this.startIndex = Math.min(Math.max(savedPage - 1, 0), Math.max(this.totalImages - 1, 0));
 
             this.updateChapterInfo();
             this.updateNavigationButtons();
             this.createAllPlaceholders();
             this.setupLazyLoading();
-            this.loadFavoriteStatus();
+            this.updateFavoriteButton(data.status === 'favorite');
+            this.bindServerEvents();
 
         } catch (error) {
             this.showError();
@@ -102,9 +158,7 @@ class GalleryReader {
         this.favoriteBtn.classList.add('loading');
 
         try {
-            const response = await fetch(`/gallery/api/status/${this.navigation.manga_name}`);
-            const currentData = await response.json();
-            const isFavorite = currentData.status === 'favorite';
+            const isFavorite = this.isFavorite;
 
             // 切換狀態：如果已收藏則改為未審核，否則設為收藏
             const newStatus = isFavorite ? 'unreviewed' : 'favorite';
@@ -127,7 +181,21 @@ class GalleryReader {
         }
     }
 
+    bindServerEvents() {
+        // 其他分頁修改當前作品的收藏狀態時同步按鈕
+        subscribeServerEvents({
+            status: (event) => {
+                if (event.category !== 'gallery' || !this.navigation) return;
+                if (event.path === this.navigation.manga_name) {
+                    this.updateFavoriteButton(event.status === 'favorite');
+                }
+            },
+            reload: () => this.loadFavoriteStatus()
+        });
+    }
+
     updateFavoriteButton(isFavorite) {
+        this.isFavorite = isFavorite;
         this.favoriteStar.textContent = isFavorite ? '★' : '☆';
         this.favoriteBtn.title = isFavorite ? '取消收藏' : '加入收藏';
     }
@@ -185,11 +253,11 @@ class GalleryReader {
         this.loadingElement.style.display = 'none';
         this.imagesContainer.innerHTML = '';
 
-        // 立即載入前 5 張，其餘用佔位符
-        const initialLoadCount = Math.min(5, this.totalImages);
+        // 從起始頁開始立即載入 5 張，其餘（包含起始頁之前）用佔位符
+        const initialEnd = Math.min(this.startIndex + 5, this.totalImages);
 
         for (let i = 0; i < this.totalImages; i++) {
-            if (i < initialLoadCount) {
+            if (i >= this.startIndex && i < initialEnd) {
                 // 前幾張直接載入（不用等 IntersectionObserver）
                 this.createImageElement(this.allImageUrls[i], i);
             } else {
@@ -197,10 +265,18 @@ class GalleryReader {
             }
         }
 
-        this.loadedImages = initialLoadCount;
+        this.loadedImages = initialEnd - this.startIndex;
+
+        // 繼續閱讀：直接捲動到起始頁
+        if (this.startIndex > 0) {
+            const startElement = this.imagesContainer.querySelector(`[data-index="${this.startIndex}"]`);
+            if (startElement) {
+                this.imageContainer.scrollTop = startElement.offsetTop - this.imageContainer.offsetTop;
+            }
+        }
 
         // 預載入接下來的圖片
-        this.preloadNextImages(initialLoadCount);
+        this.preloadNextImages(initialEnd);
     }
 
     createImageElement(imagePath, index) {
@@ -290,7 +366,13 @@ class GalleryReader {
                 img.src = 'data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" width="400" height="300"><text x="50%" y="50%" text-anchor="middle" fill="%23999">載入失敗</text></svg>';
             };
 
+            const placeholderHeight = placeholder.offsetHeight;
             img.onload = () => {
+                // 視窗上方的圖片載入後高度改變，補償捲動位置避免畫面跳動（繼續閱讀時）
+                if (index < this.startIndex &&
+                    img.getBoundingClientRect().top < this.imageContainer.getBoundingClientRect().top) {
+                    this.imageContainer.scrollTop += img.offsetHeight - placeholderHeight;
+                }
                 // 圖片載入成功後，預載入接下來的幾張
                 this.preloadNextImages(index + 1);
             };
@@ -6,13 +6,22 @@ let allMangas = [];
 let config = {};
 let currentPage = 1;
 let totalPages = 1;
+let currentSort = 'name';  // 排序欄位（name 為自然排序，其他欄位由伺服器索引遞減排序）
+let nextCursor = null;  // 下一頁游標（無限滾動使用，新增作品不會造成結果位移）
 let isLoading = false;
+let serverEvents = null;  // 伺服器事件訂閱（live 為 true 時有即時事件）
 let currentFilter = 'all';  // 當前篩選狀態
+let currentSearchKeyword = '';
+let searchDebounceTimer = null;
 let favoriteOnly = false;  // 只顯示收藏章節
+let pendingDetails = new Map();  // 等待批次請求的作品詳情（作品路徑 -> resolve 函數列表）
+let detailFlushTimer = null;
 
 const API_PREFIX = '/manga/api';
 const IMAGE_PREFIX = '/manga/image/';
 const READER_PREFIX = '/manga/reader/';
+// 列表只請求卡片實際顯示的欄位
+const LIST_FIELDS = 'name,path,cover_image,url_link,chapters,chapter_count,status';
 
 // 頁面載入時初始化
 document.addEventListener('DOMContentLoaded', async () => {
@@ -21,6 +30,8 @@ document.addEventListener('DOMContentLoaded', async () => {
     bindEvents();
     loadFavoriteOnlySetting();
     loadMangas();
+    loadStatusCounts();
+    bindServerEvents();
 });
 
 // 應用配置
@@ -33,9 +44,18 @@ function applyConfig() {
 
 // 綁定事件
 function bindEvents() {
-    // 搜尋事件
+    // 搜尋事件 - 防抖後呼叫 API 搜尋全部資料（伺服器端使用名稱索引）
+    const searchDebounceMs = (config.ui && config.ui.search_delay) || 300;
     document.getElementById('searchInput').addEventListener('input', (e) => {
-        filterMangas(e.target.value);
+        const searchTerm = e.target.value.trim();
+
+        if (searchDebounceTimer) {
+            clearTimeout(searchDebounceTimer);
+        }
+
+        searchDebounceTimer = setTimeout(() => {
+            searchMangas(searchTerm);
+        }, searchDebounceMs);
     });
 
     // 篩選按鈕事件
@@ -43,10 +63,10 @@ function bindEvents() {
         btn.addEventListener('click', (e) => {
             // 移除所有 active 類
             document.querySelectorAll('.filter-btn').forEach(b => b.classList.remove('active'));
-            // 添加 active 到點擊的按鈕
-            e.target.classList.add('active');
+            // 添加 active 到點擊的按鈕（按鈕內含計數 span，使用 btn 而非 e.target）
+            btn.classList.add('active');
             // 設置當前篩選
-            currentFilter = e.target.dataset.status;
+            currentFilter = btn.dataset.status;
             // 重新載入
             currentPage = 1;
             loadMangas();
@@ -64,6 +84,13 @@ function bindEvents() {
         });
     }
 
+    // 排序選單
+    document.getElementById('sortSelect').addEventListener('change', (e) => {
+        currentSort = e.target.value;
+        currentPage = 1;
+        loadMangas();
+    });
+
     // 滾動事件（無限滾動）
     window.addEventListener('scroll', throttle(handleScroll, 200));
 }
@@ -80,13 +107,23 @@ async function loadMangas(page = 1, append = false) {
 
     try {
         // 構建 API URL，包含狀態篩選和只顯示收藏章節
-        let url = `${API_PREFIX}/list?page=${page}&per_page=6&skip_chapters=false`;
+        // 每部漫畫只載入前幾個章節（其餘章節點擊後由詳情 API 延遲載入）
+        const chapterLimit = (config.ui && config.ui.max_chapters_display) || 5;
+        let url = `${API_PREFIX}/list?per_page=6&skip_chapters=false&fields=${LIST_FIELDS}&chapter_limit=${chapterLimit}`;
+        // 附加下一頁時使用游標，否則使用頁碼
+        url += append && nextCursor ? `&cursor=${encodeURIComponent(nextCursor)}` : `&page=${page}`;
         if (currentFilter && currentFilter !== 'all') {
             url += `&status=${currentFilter}`;
         }
         if (favoriteOnly) {
             url += `&favorite_only=true`;
         }
+        if (currentSearchKeyword) {
+            url += `&search=${encodeURIComponent(currentSearchKeyword)}`;
+        }
+        if (currentSort !== 'name') {
+            url += `&sort=${currentSort}`;
+        }
 
         const response = await fetch(url);
         if (!response.ok) {
@@ -97,6 +134,15 @@ async function loadMangas(page = 1, append = false) {
         const mangas = data.mangas || [];
         currentPage = data.page || 1;
         totalPages = data.total_pages || 1;
+        nextCursor = data.next_cursor || null;
+
+        // 排序欄位仍在伺服器背景建立時先以名稱排序顯示，稍後重新載入
+        if (data.sort_pending && !append) {
+            const pendingSort = currentSort;
+            setTimeout(() => {
+                if (currentSort === pendingSort) loadMangas();
+            }, SORT_PENDING_RETRY_MS);
+        }
 
         if (append) {
             allMangas = allMangas.concat(mangas);
@@ -150,21 +196,7 @@ function displayMangas(mangas) {
         const favoriteStar = isFavorite ? '★' : '☆';
         const favoriteTitle = isFavorite ? '取消收藏' : '加入收藏';
 
-        let chaptersHtml = '';
-        if (manga.chapters && manga.chapters.length > 0) {
-            chaptersHtml = manga.chapters.map(chapter => `
-                <div class="chapter-item" onclick="event.stopPropagation(); openChapter('${chapter.path}')">
-                    <span class="chapter-name">${escapeHtml(chapter.name)}</span>
-                    <span class="chapter-count">${chapter.image_count}頁</span>
-                </div>
-            `).join('');
-        } else if (manga.chapter_count > 0) {
-            chaptersHtml = `
-                <div class="chapter-item" style="justify-content: center; cursor: default;">
-                    <span class="chapter-name">共 ${manga.chapter_count} 個章節</span>
-                </div>
-            `;
-        }
+        const chaptersHtml = renderChapterItems(manga);
 
         return `
             <div class="manga-card" onclick="openManga('${manga.path}')">
@@ -178,7 +210,7 @@ function displayMangas(mangas) {
                     </button>
                 </div>
                 <div class="manga-title">${escapeHtml(manga.name)}</div>
-                <div class="chapter-list">
+                <div class="chapter-list" data-path="${escapeHtml(manga.path)}">
                     ${chaptersHtml || '<div style="text-align: center; color: #999;">點擊查看詳情</div>'}
                 </div>
             </div>
@@ -188,38 +220,181 @@ function displayMangas(mangas) {
     grid.innerHTML = mangaCards.join('');
 }
 
-// 打開漫畫
+// 產生章節列表 HTML（列表只含章節預覽時附上「顯示全部」項目）
+function renderChapterItems(manga) {
+    if (manga.chapters && manga.chapters.length > 0) {
+        let html = manga.chapters.map(chapter => `
+            <div class="chapter-item" onclick="event.stopPropagation(); openChapter('${chapter.path}')">
+                <span class="chapter-name">${escapeHtml(chapter.name)}</span>
+                <span class="chapter-count">${chapter.image_count}頁</span>
+            </div>
+        `).join('');
+        if (manga.has_more_chapters) {
+            html += `
+                <div class="chapter-item chapter-more" onclick="event.stopPropagation(); loadAllChapters('${escapeHtml(manga.path)}')">
+                    <span class="chapter-name">顯示全部 ${manga.chapter_count} 個章節…</span>
+                </div>
+            `;
+        }
+        return html;
+    }
+    if (manga.chapter_count > 0) {
+        return `
+            <div class="chapter-item" style="justify-content: center; cursor: default;">
+                <span class="chapter-name">共 ${manga.chapter_count} 個章節</span>
+            </div>
+        `;
+    }
+    return '';
+}
+
+// 獲取作品詳情：同一事件循環內的請求合併為一次批次請求（/api/details）
+function fetchDetail(mangaPath) {
+    return new Promise(resolve => {
+        if (!pendingDetails.has(mangaPath)) {
+            pendingDetails.set(mangaPath, []);
+        }
+        pendingDetails.get(mangaPath).push(resolve);
+        if (!detailFlushTimer) {
+            detailFlushTimer = setTimeout(flushDetailRequests, 0);
+        }
+    });
+}
+
+// 送出等待中的作品詳情請求
+async function flushDetailRequests() {
+    const pending = pendingDetails;
+    pendingDetails = new Map();
+    detailFlushTimer = null;
+
+    const details = new Map();
+    try {
+        const response = await fetch(`${API_PREFIX}/details`, {
+            method: 'POST',
+            headers: { 'Content-Type': 'application/json' },
+            body: JSON.stringify({ paths: Array.from(pending.keys()), favorite_only: favoriteOnly })
+        });
+        if (response.ok) {
+            const data = await response.json();
+            (data.works || []).forEach(work => details.set(work.path, work));
+        }
+    } catch (error) {
+        console.error('獲取章節信息失敗:', error);
+    }
+
+    pending.forEach((resolvers, mangaPath) => {
+        resolvers.forEach(resolve => resolve(details.get(mangaPath) || null));
+    });
+}
+
+// 延遲載入漫畫的完整章節列表（只更新該卡片）
+async function loadAllChapters(mangaPath) {
+    const manga = allMangas.find(m => m.path === mangaPath);
+    if (!manga) return;
+
+    const detail = await fetchDetail(mangaPath);
+    if (!detail) return;
+
+    manga.chapters = detail.chapters || [];
+    manga.chapter_count = manga.chapters.length;
+    manga.has_more_chapters = false;
+
+    const list = Array.from(document.querySelectorAll('.chapter-list'))
+        .find(el => el.dataset.path === mangaPath);
+    if (list) {
+        list.innerHTML = renderChapterItems(manga);
+    }
+}
+
+// 打開漫畫（有閱讀記錄時直接從上次的章節與頁碼繼續）
 async function openManga(mangaPath) {
     const manga = allMangas.find(m => m.path === mangaPath);
     if (!manga) return;
 
+    try {
+        const response = await fetch(`${API_PREFIX}/continue/${encodeURIComponent(mangaPath)}`);
+        if (response.ok) {
+            const data = await response.json();
+            if (data.continue) {
+                openChapter(data.continue.chapter, data.continue.page);
+                return;
+            }
+        }
+    } catch (error) {
+        console.warn('無法載入閱讀進度:', error);
+    }
+
     if (manga.chapters && manga.chapters.length > 0) {
         openChapter(manga.chapters[0].path);
         return;
     }
 
+    const detail = await fetchDetail(mangaPath);
+    if (!detail) {
+        alert('無法打開此漫畫，請稍後再試');
+    } else if (detail.chapters && detail.chapters.length > 0) {
+        openChapter(detail.chapters[0].path);
+    } else {
+        alert('此漫畫沒有可用的章節');
+    }
+}
+
+// 打開章節（可指定起始頁）
+function openChapter(chapterPath, page) {
+    const query = page > 1 ? `?page=${page}` : '';
+    window.open(`${READER_PREFIX}${encodeURIComponent(chapterPath)}${query}`, '_blank');
+}
+
+// 搜尋功能 - 呼叫 API 搜尋全部資料
+function searchMangas(searchTerm) {
+    currentSearchKeyword = searchTerm;
+    currentPage = 1;
+    allMangas = [];
+    loadMangas(1, false);
+    searchChapters(searchTerm);
+}
+
+// 章節搜尋 - 跨所有漫畫搜尋章節名稱（伺服器端章節索引）
+async function searchChapters(searchTerm) {
+    const container = document.getElementById('chapterResults');
+    if (!searchTerm) {
+        container.style.display = 'none';
+        container.innerHTML = '';
+        return;
+    }
+
     try {
-        const response = await fetch(`${API_PREFIX}/detail/${encodeURIComponent(mangaPath)}`);
-        if (!response.ok) throw new Error('無法獲取章節信息');
+        const response = await fetch(`${API_PREFIX}/chapters/search?q=${encodeURIComponent(searchTerm)}&limit=20`);
+        if (!response.ok) return;
 
-        const detail = await response.json();
-        if (detail.chapters && detail.chapters.length > 0) {
-            openChapter(detail.chapters[0].path);
-        } else {
-            alert('此漫畫沒有可用的章節');
+        const data = await response.json();
+        // 回應抵達前搜尋字串已改變時忽略
+        if (searchTerm !== currentSearchKeyword) return;
+
+        if (!data.results || data.results.length === 0) {
+            container.style.display = 'none';
+            container.innerHTML = '';
+            return;
         }
+
+        const items = data.results.map(hit => `
+            <div class="chapter-result" data-path="${escapeHtml(hit.chapter.path)}">
+                <span class="chapter-result-name">${escapeHtml(hit.chapter.name)}</span>
+                <span class="chapter-result-manga">${escapeHtml(hit.manga.name)}</span>
+            </div>
+        `);
+        const more = data.total > data.results.length ? `（顯示前 ${data.results.length} 筆）` : '';
+        container.innerHTML = `<div class="chapter-results-title">📖 章節 ${data.total} 筆${more}</div>${items.join('')}`;
+        container.querySelectorAll('.chapter-result').forEach(item => {
+            item.addEventListener('click', () => openChapter(item.dataset.path));
+        });
+        container.style.display = 'block';
     } catch (error) {
-        console.error('獲取章節信息失敗:', error);
-        alert('無法打開此漫畫，請稍後再試');
+        console.warn('章節搜尋失敗:', error);
     }
 }
 
-// 打開章節
-function openChapter(chapterPath) {
-    window.open(`${READER_PREFIX}${encodeURIComponent(chapterPath)}`, '_blank');
-}
-
-// 搜尋功能
+// 本地過濾功能（保留備用）
 function filterMangas(searchTerm) {
     const filtered = allMangas.filter(manga =>
         manga.name.toLowerCase().includes(searchTerm.toLowerCase()) ||
@@ -244,25 +419,77 @@ function updatePaginationInfo(data) {
     infoDiv.innerHTML = `
         <div style="margin-bottom: 10px;">
             顯示 ${allMangas.length} / ${data.total} 個項目
-            ${data.total > allMangas.length ? `<button onclick="loadMore()" style="margin-left: 10px; padding: 8px 16px; background: #667eea; color: white; border: none; border-radius: 5px; cursor: pointer;">載入更多</button>` : ''}
+            ${nextCursor ? `<button onclick="loadMore()" style="margin-left: 10px; padding: 8px 16px; background: #667eea; color: white; border: none; border-radius: 5px; cursor: pointer;">載入更多</button>` : ''}
         </div>
     `;
 }
 
+// 載入篩選分頁的各狀態數量
+async function loadStatusCounts() {
+    try {
+        const response = await fetch(`${API_PREFIX}/status/counts`);
+        if (!response.ok) return;
+
+        const counts = await response.json();
+        document.querySelectorAll('.filter-btn').forEach(btn => {
+            const countSpan = btn.querySelector('.filter-count');
+            const count = counts[btn.dataset.status];
+            if (countSpan && count !== undefined) {
+                countSpan.textContent = `(${count})`;
+            }
+        });
+    } catch (error) {
+        console.warn('無法載入狀態數量:', error);
+    }
+}
+
+// 訂閱伺服器事件：其他分頁或裝置的狀態變更會即時反映在卡片與計數上
+function bindServerEvents() {
+    serverEvents = subscribeServerEvents({
+        status: (event) => {
+            if (event.category !== 'manga') return;
+            applyStatusChange(event.path, event.status);
+            loadStatusCounts();
+        },
+        reload: () => loadStatusCounts(),
+        library: (event) => {
+            if (event.category === 'manga') {
+                loadStatusCounts();
+            }
+        }
+    });
+}
+
+// 套用狀態變更到本地資料與卡片按鈕
+function applyStatusChange(path, status) {
+    const manga = allMangas.find(item => item.path === path);
+    if (manga) {
+        manga.status = status;
+    }
+
+    const isFavorite = status === 'favorite';
+    document.querySelectorAll('.manga-favorite-btn').forEach(btn => {
+        if (btn.dataset.path === path) {
+            btn.textContent = isFavorite ? '★' : '☆';
+            btn.title = isFavorite ? '取消收藏' : '加入收藏';
+        }
+    });
+}
+
 // 載入更多
 function loadMore() {
-    if (currentPage < totalPages) {
+    if (nextCursor) {
         loadMangas(currentPage + 1, true);
     }
 }
 
 // 處理滾動（無限滾動）
 function handleScroll() {
-    if (isLoading || document.getElementById('searchInput').value.trim() !== '') {
+    if (isLoading) {
         return;
     }
 
-    if (currentPage >= totalPages) {
+    if (!nextCursor) {
         return;
     }
 
@@ -280,10 +507,9 @@ async function toggleCardFavorite(mangaPath, buttonElement) {
     buttonElement.classList.add('loading');
 
     try {
-        // 獲取當前狀態
-        const response = await fetch(`${API_PREFIX}/status/${encodeURIComponent(mangaPath)}`);
-        const currentData = await response.json();
-        const isFavorite = currentData.status === 'favorite';
+        // 使用本地狀態（由 SSE 事件保持同步），不需要再查詢一次
+        const manga = allMangas.find(m => m.path === mangaPath);
+        const isFavorite = manga ? manga.status === 'favorite' : false;
 
         // 切換狀態：如果已收藏則改為未審核，否則設為收藏
         const newStatus = isFavorite ? 'unreviewed' : 'favorite';
@@ -297,14 +523,12 @@ async function toggleCardFavorite(mangaPath, buttonElement) {
         });
 
         if (updateResponse.ok) {
-            // 更新按鈕顯示
-            buttonElement.textContent = isFavorite ? '☆' : '★';
-            buttonElement.title = isFavorite ? '加入收藏' : '取消收藏';
-
-            // 更新 allMangas 陣列中的狀態
-            const manga = allMangas.find(m => m.path === mangaPath);
-            if (manga) {
-                manga.status = newStatus;
+            // 更新按鈕顯示與本地狀態
+            applyStatusChange(mangaPath, newStatus);
+
+            // 沒有 SSE 時自行更新篩選分頁計數（有 SSE 時由事件觸發）
+            if (!serverEvents || !serverEvents.live) {
+                loadStatusCounts();
             }
 
             // 如果當前在收藏篩選頁，且剛剛取消了收藏，需要重新載入列表
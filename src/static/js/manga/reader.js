@@ -10,23 +10,29 @@ class MangaReader {
         this.chapterPath = decodeURIComponent(pathParts.slice(3).join('/'));
 
         // 設置 API 端點
-        this.apiChapterEndpoint = '/manga/api/chapter/';
+        this.apiBootstrapEndpoint = '/manga/api/reader-bootstrap/';
         this.imagePrefix = '/manga/image/';
 
         this.images = [];
         this.navigation = null;
         this.config = {};
         this.favoriteOnly = false;  // 只顯示收藏章節
+        this.isFavorite = false;  // 當前章節是否已收藏（由 SSE 事件保持同步）
+        this.startIndex = 0;  // 起始圖片索引（繼續閱讀時從儲存的頁碼開始）
+        this.reportedPage = 0;  // 最後回報給伺服器的頁碼
+        this.progressTimer = null;
+
+        // URL 指定的起始頁（例如 ?page=12），優先於儲存的進度
+        const pageParam = parseInt(new URLSearchParams(window.location.search).get('page'));
+        this.requestedPage = pageParam > 0 ? pageParam : 0;
         this.allChapters = [];  // 所有章節列表
         this.maxImageWidth = 0;  // 最大圖片寬度
 
         this.initializeElements();
         this.calculateMaxImageWidth();
-        this.loadConfig().then(() => {
-            this.loadFavoriteOnlySetting();
-            this.bindEvents();
-            this.loadImages();
-        });
+        this.loadFavoriteOnlySetting();
+        this.bindEvents();
+        this.loadImages();
     }
 
     calculateMaxImageWidth() {
@@ -37,17 +43,6 @@ class MangaReader {
         console.log(`計算最大圖片寬度: ${this.maxImageWidth}px (視窗寬度: ${viewportWidth}px × 50%)`);
     }
 
-    async loadConfig() {
-        try {
-            const response = await fetch('/api/config');
-            if (response.ok) {
-                this.config = await response.json();
-            }
-        } catch (error) {
-            console.warn('無法載入配置:', error);
-        }
-    }
-
     initializeElements() {
         this.loadingElement = document.getElementById('loading');
         this.errorElement = document.getElementById('error');
@@ -72,6 +67,9 @@ class MangaReader {
             this.updatePageInfo();
         });
 
+        // 離開頁面時送出最後的閱讀進度
+        window.addEventListener('pagehide', () => this.sendProgress(true));
+
         // 點擊外部關閉選單
         document.addEventListener('click', (e) => {
             if (!e.target.closest('.chapter-menu-container')) {
@@ -134,7 +132,8 @@ class MangaReader {
 
     async loadImages() {
         try {
-            let apiUrl = `${this.apiChapterEndpoint}${encodeURIComponent(this.chapterPath)}`;
+            // 單一請求取得配置、精簡章節清單（基底路徑 + 檔名）、導航、章節狀態與閱讀進度
+            let apiUrl = `${this.apiBootstrapEndpoint}${encodeURIComponent(this.chapterPath)}`;
             if (this.favoriteOnly) {
                 apiUrl += `?favorite_only=true`;
             }
@@ -143,58 +142,54 @@ class MangaReader {
             if (!response.ok) throw new Error('章節不存在');
 
             const data = await response.json();
-            this.images = data.images || [];
+            this.config = data.config || {};
+            this.images = data.manifest ? expandChapterManifest(data.manifest) : (data.images || []);
             this.navigation = data.navigation || null;
+            const savedPage = this.requestedPage || (data.progress && data.progress.page) || 0;
+            this.startIndex = Math.min(Math.max(savedPage - 1, 0), Math.max(this.images.length - 1, 0));
 
             this.updateChapterInfo();
             this.updateNavigationButtons();
             this.displayAllImages();
-            this.loadFavoriteStatus();
-            this.loadAllChapters();
+
+            const statuses = data.statuses || {};
+            if (this.navigation && this.navigation.current_chapter) {
+                this.updateFavoriteButton(statuses[this.navigation.current_chapter.path] === 'favorite');
+            }
+            this.allChapters = data.chapters || [];
+            this.renderChapterMenu();
+            this.bindServerEvents();
 
         } catch (error) {
             this.showError();
         }
     }
 
-    async loadAllChapters() {
-        if (!this.navigation || !this.navigation.manga_name) return;
-
-        try {
-            // 獲取漫畫的所有章節
-            const mangaPath = this.chapterPath.split('/').slice(0, -1).join('/');
-            let apiUrl = `/manga/api/detail/${encodeURIComponent(mangaPath)}`;
-            
-            const response = await fetch(apiUrl);
-            if (!response.ok) return;
-
-            const data = await response.json();
-            let chapters = data.chapters || [];
+    reportProgress(page) {
+        // 滾動時頻繁觸發，這裡只記錄最新頁碼，最多每 2 秒送出一次（伺服器端會再合併寫入）
+        this.pendingPage = page;
+        if (this.progressTimer) return;
+        this.progressTimer = setTimeout(() => {
+            this.progressTimer = null;
+            this.sendProgress(false);
+        }, 2000);
+    }
 
-            // 如果啟用只顯示收藏，則篩選收藏的章節
-            if (this.favoriteOnly) {
-                const favoriteChapters = [];
-                for (const chapter of chapters) {
-                    try {
-                        const statusResponse = await fetch(`/manga/api/status/${encodeURIComponent(chapter.path)}`);
-                        if (statusResponse.ok) {
-                            const statusData = await statusResponse.json();
-                            if (statusData.status === 'favorite') {
-                                favoriteChapters.push(chapter);
-                            }
-                        }
-                    } catch (e) {
-                        console.warn('無法檢查章節狀態:', e);
-                    }
-                }
-                chapters = favoriteChapters.length > 0 ? favoriteChapters : chapters;
-            }
+    sendProgress(useBeacon) {
+        if (!this.pendingPage || this.pendingPage === this.reportedPage) return;
 
-            this.allChapters = chapters;
-            this.renderChapterMenu();
+        const url = `/manga/api/progress/${encodeURIComponent(this.chapterPath)}`;
+        const body = JSON.stringify({ page: this.pendingPage, total: this.images.length });
+        this.reportedPage = this.pendingPage;
 
-        } catch (error) {
-            console.warn('無法載入章節列表:', error);
+        if (useBeacon && navigator.sendBeacon) {
+            navigator.sendBeacon(url, body);
+        } else {
+            fetch(url, {
+                method: 'POST',
+                headers: { 'Content-Type': 'application/json' },
+                body: body
+            }).catch(error => console.warn('無法儲存閱讀進度:', error));
         }
     }
 
@@ -272,9 +267,7 @@ class MangaReader {
         try {
             // 使用章節路徑而不是漫畫名稱
             const chapterPath = this.navigation.current_chapter.path;
-            const response = await fetch(`/manga/api/status/${encodeURIComponent(chapterPath)}`);
-            const currentData = await response.json();
-            const isFavorite = currentData.status === 'favorite';
+            const isFavorite = this.isFavorite;
 
             // 切換狀態：如果已收藏則改為已審核，否則設為收藏
             const newStatus = isFavorite ? 'reviewed' : 'favorite';
@@ -297,7 +290,21 @@ class MangaReader {
         }
     }
 
+    bindServerEvents() {
+        // 其他分頁修改當前章節的收藏狀態時同步按鈕
+        subscribeServerEvents({
+            status: (event) => {
+                if (event.category !== 'manga' || !this.navigation || !this.navigation.current_chapter) return;
+                if (event.path === this.navigation.current_chapter.path) {
+                    this.updateFavoriteButton(event.status === 'favorite');
+                }
+            },
+            reload: () => this.loadFavoriteStatus()
+        });
+    }
+
     updateFavoriteButton(isFavorite) {
+        this.isFavorite = isFavorite;
         this.favoriteStar.textContent = isFavorite ? '★' : '☆';
         this.favoriteBtn.title = isFavorite ? '取消收藏' : '加入收藏';
     }
@@ -341,31 +348,67 @@ class MangaReader {
         this.loadingElement.style.display = 'none';
         this.imagesContainer.innerHTML = '';
 
-        // 依序載入所有圖片
-        this.images.forEach((imagePath, index) => {
-            const img = document.createElement('img');
-            img.className = 'manga-image';
-            img.dataset.index = index;
-            img.alt = `第 ${index + 1} 頁`;
+        // 從起始頁開始載入，之前的頁面不載入（需要時點擊按鈕再載入）
+        if (this.startIndex > 0) {
+            this.createLoadEarlierButton();
+        }
+        this.images.slice(this.startIndex).forEach((imagePath, offset) => {
+            this.imagesContainer.appendChild(this.createImageElement(imagePath, this.startIndex + offset));
+        });
+    }
+
+    createLoadEarlierButton() {
+        const button = document.createElement('button');
+        button.className = 'load-earlier-btn';
+        button.textContent = `載入前面 ${this.startIndex} 頁`;
+        button.onclick = () => this.loadEarlierImages(button);
+        this.imagesContainer.appendChild(button);
+    }
 
-            // 設置最大寬度
-            if (this.maxImageWidth > 0) {
-                img.style.maxWidth = `${this.maxImageWidth}px`;
-                img.style.width = 'auto';
-                img.style.height = 'auto';
-                img.style.objectFit = 'contain';
+    loadEarlierImages(button) {
+        // 插入前面的頁面，並以目前第一張圖片為錨點維持閱讀位置
+        const anchor = this.imagesContainer.querySelector(`.manga-image[data-index="${this.startIndex}"]`);
+        const anchorOffset = anchor ? anchor.offsetTop - this.imageContainer.scrollTop : 0;
+        const keepAnchor = () => {
+            if (anchor) {
+                this.imageContainer.scrollTop = anchor.offsetTop - anchorOffset;
             }
+        };
 
-            // 添加載入錯誤處理
-            img.onerror = () => {
-                img.src = 'data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" width="400" height="300"><text x="50%" y="50%" text-anchor="middle" fill="%23999">載入失敗</text></svg>';
-            };
+        const fragment = document.createDocumentFragment();
+        this.images.slice(0, this.startIndex).forEach((imagePath, index) => {
+            const img = this.createImageElement(imagePath, index);
+            img.addEventListener('load', keepAnchor, { once: true });
+            fragment.appendChild(img);
+        });
+        button.replaceWith(fragment);
+        this.startIndex = 0;
+        keepAnchor();
+    }
+
+    createImageElement(imagePath, index) {
+        const img = document.createElement('img');
+        img.className = 'manga-image';
+        img.dataset.index = index;
+        img.alt = `第 ${index + 1} 頁`;
+
+        // 設置最大寬度
+        if (this.maxImageWidth > 0) {
+            img.style.maxWidth = `${this.maxImageWidth}px`;
+            img.style.width = 'auto';
+            img.style.height = 'auto';
+            img.style.objectFit = 'contain';
+        }
 
-            // 設置圖片來源
-            img.src = `${this.imagePrefix}${encodeURIComponent(imagePath)}`;
+        // 添加載入錯誤處理
+        img.onerror = () => {
+            img.src = 'data:image/svg+xml,<svg xmlns="http://www.w3.org/2000/svg" width="400" height="300"><text x="50%" y="50%" text-anchor="middle" fill="%23999">載入失敗</text></svg>';
+        };
 
-            this.imagesContainer.appendChild(img);
-        });
+        // 設置圖片來源
+        img.src = `${this.imagePrefix}${encodeURIComponent(imagePath)}`;
+
+        return img;
     }
 
     applyMaxWidthToImages() {
@@ -387,18 +430,19 @@ class MangaReader {
         if (images.length === 0) return;
 
         const containerRect = this.imageContainer.getBoundingClientRect();
-        let currentPage = 1;
+        let currentPage = parseInt(images[0].dataset.index) + 1;
 
         for (let i = 0; i < images.length; i++) {
             const imgRect = images[i].getBoundingClientRect();
             if (imgRect.top <= containerRect.top + containerRect.height / 2 &&
                 imgRect.bottom >= containerRect.top + containerRect.height / 2) {
-                currentPage = i + 1;
+                currentPage = parseInt(images[i].dataset.index) + 1;
                 break;
             }
         }
 
         this.pageInfoElement.textContent = `${currentPage} / ${this.images.length}`;
+        this.reportProgress(currentPage);
     }
 
     handleKeyboard(e) {
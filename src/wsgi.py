@@ -0,0 +1,18 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+WSGI 進入點
+供外部 WSGI 伺服器使用，例如：
+
+    gunicorn --preload -k gthread -w 4 --threads 8 wsgi:app
+    waitress-serve --threads 8 wsgi:app
+
+匯入時建立應用並預熱索引；搭配 --preload 時在 master 進程完成，
+之後 fork 出的 worker 以寫入時複製共用索引記憶體
+"""
+
+from app import create_app, register_exit_hooks, warm_up
+
+app = create_app()
+register_exit_hooks(app)
+warm_up(app)
@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+pytest 共用 fixture
+測試作品庫的建立、目錄 mtime 調整、檔案系統呼叫計數，以及注入測試服務的應用
+"""
+
+import builtins
+import contextlib
+import os
+import sys
+import threading
+from collections import Counter
+from pathlib import Path
+
+import pytest
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from app import create_app
+from core.background import THREAD_NAME_PREFIX
+from core.progress_store import ProgressStore
+from core.status_manager import StatusManager
+from modules.gallery.service import GalleryService
+from modules.manga.service import MangaService
+
+# 計算次數的檔案系統函數（Path.iterdir / exists / is_dir 等最終也會呼叫這些函數）
+FS_FUNCTIONS = ('scandir', 'listdir', 'stat')
+
+
+def build_library(root, works):
+    """建立測試作品庫：works 為 {作品名稱: {章節名稱: 圖片數}}，章節名稱為空字串表示圖片直接在作品目錄下"""
+    for work, chapters in works.items():
+        for chapter, count in chapters.items():
+            chapter_dir = root / work / chapter if chapter else root / work
+            chapter_dir.mkdir(parents=True, exist_ok=True)
+            for i in range(1, count + 1):
+                (chapter_dir / f"{i:03d}.jpg").write_bytes(b'')
+    return root
+
+
+def advance_mtime(path):
+    """確保目錄 mtime 前進（部分檔案系統的時間精度較粗）"""
+    stat = os.stat(path)
+    os.utime(path, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1_000_000_000))
+
+
+@contextlib.contextmanager
+def fs_call_counter():
+    """
+    計算期間（所有請求執行緒）的檔案系統呼叫次數；索引的背景重新驗證不計入
+
+    Yields:
+        Counter: {'scandir' / 'listdir' / 'stat' / 'open': 次數}
+    """
+    counts = Counter()
+    lock = threading.Lock()
+
+    def counted(name, function):
+        def wrapper(*args, **kwargs):
+            if not threading.current_thread().name.startswith(THREAD_NAME_PREFIX):
+                with lock:
+                    counts[name] += 1
+            return function(*args, **kwargs)
+        return wrapper
+
+    originals = {name: getattr(os, name) for name in FS_FUNCTIONS}
+    original_open = builtins.open
+    try:
+        for name, function in originals.items():
+            setattr(os, name, counted(name, function))
+        builtins.open = counted('open', original_open)
+        yield counts
+    finally:
+        for name, function in originals.items():
+            setattr(os, name, function)
+        builtins.open = original_open
+
+
+@pytest.fixture(scope='session')
+def image_extensions():
+    """測試作品庫使用的圖片格式"""
+    return {'.jpg', '.png'}
+
+
+@pytest.fixture(scope='session')
+def make_library():
+    """作品庫建立函數 make_library(root, works)"""
+    return build_library
+
+
+@pytest.fixture(scope='session')
+def touch_root():
+    """使目錄 mtime 前進的函數 touch_root(path)"""
+    return advance_mtime
+
+
+@pytest.fixture(scope='session')
+def count_fs_calls():
+    """檔案系統呼叫計數的 context manager：with count_fs_calls() as counts"""
+    return fs_call_counter
+
+
+@pytest.fixture
+def make_app(tmp_path, image_extensions):
+    """
+    建立注入測試服務的應用：make_app(manga_root, gallery_root, config=None, data_dir=None)
+
+    狀態與進度檔案放在 data_dir（預設為測試暫存目錄）；config 的區段會合併到最小配置，
+    並一併傳給服務（例如 performance.metadata_refresh_seconds）。
+    啟動快照預設停用，需要的測試傳入 performance.index_snapshot=True
+    """
+    def factory(manga_root, gallery_root, config=None, data_dir=None):
+        config = {'server': {}, 'manga': {}, **(config or {})}
+        config['performance'] = {'index_snapshot': False, **config.get('performance', {})}
+        data_dir = Path(data_dir or tmp_path)
+        return create_app(
+            config,
+            manga_service=MangaService(manga_root, image_extensions, config),
+            gallery_service=GalleryService(gallery_root, image_extensions, config),
+            status_manager=StatusManager(str(data_dir / 'status.json')),
+            progress_store=ProgressStore(str(data_dir / 'progress.json'), flush_interval=60)
+        )
+
+    return factory
@@ -2,12 +2,149 @@
 # -*- coding: utf-8 -*-
 """
 創建測試用的漫畫資料夾結構
+
+不帶參數時建立少量附有示意圖片的範例漫畫（需要 Pillow）；
+指定 --preset 或規模參數時建立大量空白圖片的合成作品庫，供效能測試使用：
+
+    python tests/create_test_data.py --preset 10k --root /tmp/bench_manga
+    python tests/create_test_data.py --works 500 --chapters 20 --images 30 --depth 2 --name-length 60 --archives 2
+    python tests/create_test_data.py --preset 10k --layout gallery --root /tmp/bench_gallery
 """
 
+import argparse
 import os
-from pathlib import Path
-from PIL import Image, ImageDraw, ImageFont
 import random
+import time
+import zipfile
+from pathlib import Path
+
+try:
+    from PIL import Image, ImageDraw, ImageFont
+except ImportError:  # 選用相依套件（只有範例漫畫需要）
+    Image = ImageDraw = ImageFont = None
+
+# 合成作品庫的預設規模
+PRESETS = {
+    'small': {'works': 50, 'chapters': 5, 'images': 10},
+    'medium': {'works': 1000, 'chapters': 10, 'images': 20},
+    # 10k 部作品、共 100 萬張圖片
+    '10k': {'works': 10000, 'chapters': 10, 'images': 10},
+    # 少量作品、極深的章節層級與超長中文名稱
+    'deep': {'works': 20, 'chapters': 200, 'images': 50, 'depth': 3, 'name_length': 80},
+}
+
+# 長名稱使用的中日文字元（UTF-8 每字 3 位元組，多數檔案系統的檔名上限為 255 位元組）
+MAX_NAME_LENGTH = 80
+CJK_CHARS = '漫畫測試長篇名稱第話卷之戀物語勇者魔王異世界転生冒険の少女學園日常戰記物語夜空星月'
+
+# 合成圖片的內容（空檔案；需要實際解碼時可改用 create_test_image）
+PLACEHOLDER_IMAGE = b''
+
+
+def make_name(prefix, index, name_length, rng):
+    """
+    產生作品 / 章節名稱
+
+    Args:
+        prefix: 名稱前綴
+        index: 序號（自然排序用）
+        name_length: 名稱總長度（大於前綴時以隨機中日文字元補足，最多 MAX_NAME_LENGTH 字）
+        rng: 亂數產生器
+
+    Returns:
+        str: 名稱
+    """
+    name = f"{prefix}{index:03d}"
+    padding = min(name_length, MAX_NAME_LENGTH) - len(name)
+    if padding > 0:
+        name += ''.join(rng.choice(CJK_CHARS) for _ in range(padding))
+    return name
+
+
+def write_images(dir_path, count):
+    """在目錄中建立 count 張空白圖片"""
+    dir_path.mkdir(parents=True, exist_ok=True)
+    for page in range(1, count + 1):
+        with open(dir_path / f"{page:03d}.jpg", 'wb') as f:
+            f.write(PLACEHOLDER_IMAGE)
+
+
+def write_archive(archive_path, count):
+    """建立包含 count 張空白圖片的壓縮檔章節（.cbz）"""
+    with zipfile.ZipFile(archive_path, 'w', zipfile.ZIP_STORED) as archive:
+        for page in range(1, count + 1):
+            archive.writestr(f"{page:03d}.jpg", PLACEHOLDER_IMAGE)
+
+
+def generate_library(root, works=50, chapters=5, images=10, depth=1, name_length=0, archives=0,
+                     layout='manga', seed=0):
+    """
+    建立合成作品庫
+
+    Args:
+        root: 作品庫根目錄
+        works: 作品數
+        chapters: 每部作品的章節數（gallery 版面時為 0 表示圖片直接在作品目錄下）
+        images: 每個章節的圖片數
+        depth: 章節目錄深度（2 以上時章節放在「卷」子目錄中，例如 卷001/第001話）
+        name_length: 作品與章節名稱長度（0 表示使用短名稱）
+        archives: 每部作品額外建立的壓縮檔章節數（.cbz，閱讀器目前不會讀取）
+        layout: 'manga'（作品/章節/圖片）或 'gallery'（{id}-{artist}/圖片）
+        seed: 亂數種子（相同參數產生相同的作品庫）
+
+    Returns:
+        dict: {'works', 'chapters', 'images', 'archives'} 實際建立的數量
+    """
+    rng = random.Random(seed)
+    root = Path(root)
+    root.mkdir(parents=True, exist_ok=True)
+    totals = {'works': 0, 'chapters': 0, 'images': 0, 'archives': 0}
+
+    for work_index in range(1, works + 1):
+        if layout == 'gallery':
+            work_name = f"{100000 + work_index}-{make_name('artist', work_index % 97, name_length, rng)}"
+        else:
+            work_name = make_name('作品', work_index, name_length, rng)
+        work_path = root / work_name
+
+        if layout == 'gallery' and not chapters:
+            write_images(work_path, images)
+            totals['chapters'] += 1
+            totals['images'] += images
+        else:
+            for chapter_index in range(1, chapters + 1):
+                chapter_path = work_path
+                # 深層章節：外層以「卷」分組，每卷 10 話
+                for level in range(depth - 1, 0, -1):
+                    chapter_path = chapter_path / f"卷{(chapter_index - 1) // (10 ** level) + 1:03d}"
+                chapter_path = chapter_path / make_name('第', chapter_index, name_length, rng)
+                write_images(chapter_path, images)
+                totals['chapters'] += 1
+                totals['images'] += images
+
+        work_path.mkdir(parents=True, exist_ok=True)
+        for archive_index in range(1, archives + 1):
+            write_archive(work_path / f"{make_name('番外', archive_index, name_length, rng)}.cbz", images)
+            totals['archives'] += 1
+        totals['works'] += 1
+
+    return totals
+
+
+def parse_args():
+    """解析命令列參數"""
+    parser = argparse.ArgumentParser(description='建立測試用作品庫')
+    parser.add_argument('--preset', choices=sorted(PRESETS), help='預設規模')
+    parser.add_argument('--root', help='作品庫根目錄（預設 test_manga 或 test_gallery）')
+    parser.add_argument('--layout', choices=('manga', 'gallery'), default='manga')
+    parser.add_argument('--works', type=int)
+    parser.add_argument('--chapters', type=int)
+    parser.add_argument('--images', type=int)
+    parser.add_argument('--depth', type=int)
+    parser.add_argument('--name-length', type=int)
+    parser.add_argument('--archives', type=int)
+    parser.add_argument('--seed', type=int, default=0)
+    return parser.parse_args()
 
 def create_test_manga_structure():
     """創建測試用的漫畫資料夾結構"""
@@ -96,10 +233,33 @@ def create_test_image(folder_path, filename, page_num, chapter_name):
         image = Image.new('RGB', (600, 800), color=(200, 200, 200))
         image.save(folder_path / filename, "JPEG")
 
+def main_synthetic(args):
+    """依命令列參數建立合成作品庫"""
+    options = dict(PRESETS.get(args.preset, {}))
+    for key in ('works', 'chapters', 'images', 'depth', 'name_length', 'archives'):
+        if getattr(args, key) is not None:
+            options[key] = getattr(args, key)
+    root = args.root or ('test_gallery' if args.layout == 'gallery' else 'test_manga')
+
+    print(f"正在建立合成作品庫: {root} {options}")
+    started = time.perf_counter()
+    totals = generate_library(root, layout=args.layout, seed=args.seed, **options)
+    print(f"✅ 完成（{time.perf_counter() - started:.1f} 秒）："
+          f"{totals['works']} 部作品、{totals['chapters']} 個章節、{totals['images']} 張圖片、{totals['archives']} 個壓縮檔")
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    if any(getattr(args, key) is not None for key in ('preset', 'root', 'works', 'chapters', 'images',
+                                                      'depth', 'name_length', 'archives')):
+        main_synthetic(args)
+        raise SystemExit(0)
+
     print("正在創建測試用漫畫資料夾結構...")
     
     try:
+        if Image is None:
+            raise ImportError('Pillow')
         create_test_manga_structure()
         print("\n✅ 測試資料夾結構創建完成！")
         print("📁 測試漫畫位於: ./test_manga/")
@@ -0,0 +1,430 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+閱讀工作階段負載產生器
+
+模擬使用者的完整閱讀流程並統計各路由的延遲百分位數與吞吐量：
+瀏覽列表頁 → 開啟閱讀器（頁面 + reader-bootstrap）→ 依 gallery/reader.js 的方式捲動載入圖片
+（起始 5 張、每載入一張預載接下來 8 張）→ 回報閱讀進度 → 切換作品狀態
+
+預設在本進程啟動伺服器並使用合成作品庫，完全離線；也可以用 --url 對已啟動的伺服器
+（例如 python serve.py --workers 4）施壓，用來估算 worker 數。
+相同的 --seed、作品庫與伺服器狀態會產生相同的請求序列，可重播比較不同設定。
+
+用法：
+    python tests/load_generator.py --users 8 --sessions 40
+    python tests/load_generator.py --category manga --works 2000 --cache-mode cold --json report.json
+    python tests/load_generator.py --url http://127.0.0.1:5000 --library /path/to/gallery --users 16 --duration 60
+"""
+
+import argparse
+import http.client
+import json
+import logging
+import math
+import random
+import sys
+import tempfile
+import threading
+import time
+from collections import defaultdict
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from urllib.parse import quote, urlsplit
+
+# 添加 src 與專案根目錄到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from tests.create_test_data import generate_library
+
+# 與 gallery/reader.js 相同的載入方式
+INITIAL_IMAGES = 5      # 開啟時直接載入的張數
+PRELOAD_COUNT = 8       # 每載入一張後預載接下來的張數
+BROWSER_CONNECTIONS = 6  # 瀏覽器對同一主機的並行連線數
+
+# 與 index.js 相同的列表欄位
+LIST_QUERIES = {
+    'manga': 'per_page=6&skip_chapters=false&fields=name,path,cover_image,url_link,chapters,chapter_count,status'
+             '&chapter_limit=5',
+    'gallery': 'per_page=6&fields=name,path,cover_image,chapter_count,status,artist,featured'
+}
+
+
+class LatencyRecorder:
+    """依路由記錄延遲（執行緒安全）"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.samples = defaultdict(list)  # 路由 -> [秒數]
+        self.errors = defaultdict(int)    # 路由 -> 錯誤數
+        self.bytes = defaultdict(int)     # 路由 -> 回應位元組數
+
+    def record(self, route, seconds, size, ok):
+        with self._lock:
+            self.samples[route].append(seconds)
+            self.bytes[route] += size
+            if not ok:
+                self.errors[route] += 1
+
+    def report(self, elapsed):
+        """
+        產生統計報告
+
+        Args:
+            elapsed: 測試總秒數
+
+        Returns:
+            dict: {'elapsed', 'requests', 'throughput', 'routes': {路由: 統計}}
+        """
+        routes = {}
+        with self._lock:
+            for route, samples in sorted(self.samples.items()):
+                ordered = sorted(samples)
+                routes[route] = {
+                    'count': len(ordered),
+                    'errors': self.errors[route],
+                    'throughput': len(ordered) / elapsed if elapsed else 0,
+                    'bytes': self.bytes[route],
+                    'p50_ms': percentile(ordered, 50) * 1000,
+                    'p90_ms': percentile(ordered, 90) * 1000,
+                    'p99_ms': percentile(ordered, 99) * 1000,
+                    'max_ms': ordered[-1] * 1000
+                }
+        total = sum(route['count'] for route in routes.values())
+        return {
+            'elapsed': elapsed,
+            'requests': total,
+            'errors': sum(route['errors'] for route in routes.values()),
+            'throughput': total / elapsed if elapsed else 0,
+            'routes': routes
+        }
+
+
+def percentile(ordered, pct):
+    """已排序樣本的百分位數（nearest-rank）"""
+    if not ordered:
+        return 0
+    return ordered[max(0, math.ceil(pct / 100 * len(ordered)) - 1)]
+
+
+class Client:
+    """
+    HTTP 用戶端（每個執行緒各自保持一條 keep-alive 連線）
+    """
+
+    def __init__(self, base_url, recorder):
+        parts = urlsplit(base_url)
+        self.host = parts.hostname
+        self.port = parts.port or 80
+        self.recorder = recorder
+        self._local = threading.local()
+
+    def _connection(self):
+        connection = getattr(self._local, 'connection', None)
+        if connection is None:
+            connection = self._local.connection = http.client.HTTPConnection(self.host, self.port, timeout=60)
+        return connection
+
+    def request(self, route, method, path, body=None):
+        """
+        發出請求並記錄延遲
+
+        Args:
+            route: 統計用的路由名稱（例如 GET /manga/api/list）
+            method: HTTP 方法
+            path: 已編碼的路徑（含查詢字串）
+            body: JSON 內容
+
+        Returns:
+            tuple: (狀態碼, 回應內容)；連線失敗時狀態碼為 0
+        """
+        headers = {'Accept-Encoding': 'identity'}
+        payload = None
+        if body is not None:
+            payload = json.dumps(body).encode('utf-8')
+            headers['Content-Type'] = 'application/json'
+        started = time.perf_counter()
+        for attempt in range(2):
+            connection = self._connection()
+            try:
+                connection.request(method, path, body=payload, headers=headers)
+                response = connection.getresponse()
+                data = response.read()
+                break
+            except (http.client.HTTPException, OSError):
+                # 伺服器關閉了 keep-alive 連線：重新連線一次
+                connection.close()
+                self._local.connection = None
+                if attempt:
+                    self.recorder.record(route, time.perf_counter() - started, 0, False)
+                    return 0, b''
+        self.recorder.record(route, time.perf_counter() - started, len(data), response.status < 400)
+        return response.status, data
+
+
+class ReaderSession:
+    """
+    單一使用者的閱讀工作階段
+
+    Args:
+        client: Client
+        category: 'manga' 或 'gallery'
+        rng: 亂數產生器（決定瀏覽頁數、開啟的作品、閱讀張數與是否切換狀態）
+        options: 命令列參數
+        image_pool: 並行載入圖片的執行緒池（模擬瀏覽器的並行連線）
+    """
+
+    def __init__(self, client, category, rng, options, image_pool):
+        self.client = client
+        self.category = category
+        self.rng = rng
+        self.options = options
+        self.image_pool = image_pool
+
+    def get_json(self, route, path, method='GET', body=None):
+        status, data = self.client.request(f"{method} {route}", method, path, body)
+        if status != 200:
+            return None
+        try:
+            return json.loads(data)
+        except ValueError:
+            return None
+
+    def think(self):
+        if self.options.think_ms:
+            time.sleep(self.rng.uniform(0.5, 1.5) * self.options.think_ms / 1000)
+
+    def run(self):
+        """執行一次完整的工作階段"""
+        prefix = f"/{self.category}"
+        works = []
+        pages = self.rng.randint(1, self.options.browse_pages)
+        for page in range(1, pages + 1):
+            data = self.get_json(f"{prefix}/api/list", f"{prefix}/api/list?{LIST_QUERIES[self.category]}&page={page}")
+            if not data:
+                break
+            works.extend(data.get('mangas', []))
+            self.think()
+        if not works:
+            return
+
+        work = self.rng.choice(works)
+        if self.category == 'manga':
+            chapters = work.get('chapters') or []
+            if not chapters:
+                return
+            chapter_path = self.rng.choice(chapters)['path']
+        else:
+            chapter_path = work['path']
+
+        # 開啟閱讀器：頁面與單一 bootstrap 請求
+        encoded = quote(chapter_path)
+        self.client.request(f"GET {prefix}/reader/<path>", 'GET', f"{prefix}/reader/{encoded}")
+        data = self.get_json(f"{prefix}/api/reader-bootstrap/<path>", f"{prefix}/api/reader-bootstrap/{encoded}")
+        if not data or not data.get('manifest'):
+            return
+        manifest = data['manifest']
+        base = manifest.get('base', '')
+        images = [f"{base}/{name}" if base else name for name in manifest.get('files', [])]
+        if not images:
+            return
+
+        read_count = self.rng.randint(1, len(images)) if self.options.read_ratio is None \
+            else max(1, int(len(images) * self.options.read_ratio))
+        self.scroll(prefix, images, read_count, chapter_path)
+
+        if self.rng.random() < self.options.status_rate:
+            status = self.rng.choice(['favorite', 'reviewed', 'unreviewed'])
+            target = quote(chapter_path if self.category == 'manga' else work['name'])
+            self.get_json(f"{prefix}/api/status/<path>", f"{prefix}/api/status/{target}", 'POST', {'status': status})
+
+    def scroll(self, prefix, images, read_count, chapter_path):
+        """依 reader.js 的方式捲動載入圖片並回報進度"""
+        requested = set()
+
+        def fetch(indexes):
+            indexes = [i for i in indexes if i < len(images) and i not in requested]
+            requested.update(indexes)
+            futures = [
+                self.image_pool.submit(self.client.request, f"GET {prefix}/image/<path>", 'GET',
+                                       f"{prefix}/image/{quote(images[i])}")
+                for i in indexes
+            ]
+            for future in futures:
+                future.result()
+
+        # 開啟時載入起始 5 張並預載接下來 8 張
+        fetch(range(INITIAL_IMAGES))
+        fetch(range(INITIAL_IMAGES, INITIAL_IMAGES + PRELOAD_COUNT))
+
+        progress_path = f"{prefix}/api/progress/{quote(chapter_path)}"
+        for index in range(INITIAL_IMAGES, read_count):
+            # 捲動到的圖片（通常已預載）與接下來的預載
+            fetch([index] + list(range(index + 1, index + 1 + PRELOAD_COUNT)))
+            if (index + 1) % self.options.progress_every == 0:
+                self.get_json(f"{prefix}/api/progress/<path>", progress_path, 'POST',
+                              {'page': index + 1, 'total': len(images)})
+            self.think()
+        self.get_json(f"{prefix}/api/progress/<path>", progress_path, 'POST',
+                      {'page': read_count, 'total': len(images)})
+
+
+def start_local_server(options):
+    """
+    在本進程啟動伺服器（合成作品庫或 --library 指定的作品庫）
+
+    Returns:
+        tuple: (伺服器網址, 停止函數, 清除快取函數)
+    """
+    from werkzeug.serving import make_server
+
+    from app import create_app, warm_up
+    from core.progress_store import ProgressStore
+    from core.status_manager import StatusManager
+    from modules.gallery.service import GalleryService
+    from modules.manga.service import MangaService
+
+    workdir = Path(tempfile.mkdtemp(prefix='reader-load-'))
+    image_extensions = {'.jpg', '.jpeg', '.png', '.gif', '.webp', '.bmp'}
+    roots = {}
+    for category in ('manga', 'gallery'):
+        if options.library and category == options.category:
+            roots[category] = Path(options.library)
+            continue
+        roots[category] = workdir / category
+        if category == options.category:
+            totals = generate_library(roots[category], works=options.works, images=options.images,
+                                      chapters=options.chapters if category == 'manga' else 0,
+                                      layout=category, seed=options.seed)
+            print(f"合成作品庫：{roots[category]}（{totals['works']} 部、{totals['images']} 張圖片）")
+        else:
+            roots[category].mkdir(parents=True)
+
+    config = {'server': {}, 'manga': {},
+              'performance': {'io_workers': options.io_workers, 'index_snapshot': False}}
+    app = create_app(
+        config,
+        manga_service=MangaService(roots['manga'], image_extensions, config),
+        gallery_service=GalleryService(roots['gallery'], image_extensions, config),
+        status_manager=StatusManager(str(workdir / 'status.json')),
+        progress_store=ProgressStore(str(workdir / 'progress.json'), flush_interval=5)
+    )
+    if options.cache_mode != 'cold':
+        warm_up(app)
+    logging.getLogger('werkzeug').setLevel(logging.WARNING)  # 不逐一輸出請求記錄
+    server = make_server('127.0.0.1', 0, app, threaded=True)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+
+    shared = app.extensions['reader']
+
+    def clear_caches():
+        shared['manga_service'].cache.clear()
+        shared['gallery_service'].cache.clear()
+
+    return f"http://127.0.0.1:{server.server_port}", server.shutdown, clear_caches
+
+
+def run_load(options):
+    """
+    執行負載測試
+
+    Returns:
+        dict: LatencyRecorder.report 的統計報告
+    """
+    stop_server = clear_caches = None
+    base_url = options.url
+    if not base_url:
+        base_url, stop_server, clear_caches = start_local_server(options)
+
+    recorder = LatencyRecorder()
+    client = Client(base_url, recorder)
+    deadline = time.monotonic() + options.duration if options.duration else None
+    next_session = [0]
+    counter_lock = threading.Lock()
+
+    def user():
+        image_pool = ThreadPoolExecutor(max_workers=BROWSER_CONNECTIONS)
+        try:
+            while True:
+                # 依序分配工作階段編號（以 --duration 執行時直到時間結束）
+                with counter_lock:
+                    if deadline is not None:
+                        if time.monotonic() >= deadline:
+                            return
+                    elif next_session[0] >= options.sessions:
+                        return
+                    session_id = next_session[0]
+                    next_session[0] += 1
+                if options.cache_mode == 'cold' and clear_caches:
+                    clear_caches()
+                rng = random.Random(options.seed * 1_000_003 + session_id)
+                ReaderSession(client, options.category, rng, options, image_pool).run()
+        finally:
+            image_pool.shutdown()
+
+    started = time.perf_counter()
+    users = [threading.Thread(target=user) for _ in range(options.users)]
+    for thread in users:
+        thread.start()
+    for thread in users:
+        thread.join()
+    report = recorder.report(time.perf_counter() - started)
+    report['options'] = {key: value for key, value in vars(options).items() if key != 'json'}
+
+    if stop_server:
+        stop_server()
+    return report
+
+
+def print_report(report):
+    """輸出各路由的延遲與吞吐量"""
+    print(f"\n共 {report['requests']} 個請求、{report['errors']} 個錯誤，"
+          f"{report['elapsed']:.1f} 秒，{report['throughput']:.1f} req/s")
+    header = f"{'路由':<44}{'次數':>8}{'錯誤':>6}{'req/s':>9}{'p50 ms':>9}{'p90 ms':>9}{'p99 ms':>9}{'max ms':>9}"
+    print(header)
+    print('-' * len(header))
+    for route, stats in report['routes'].items():
+        print(f"{route:<44}{stats['count']:>8}{stats['errors']:>6}{stats['throughput']:>9.1f}"
+              f"{stats['p50_ms']:>9.1f}{stats['p90_ms']:>9.1f}{stats['p99_ms']:>9.1f}{stats['max_ms']:>9.1f}")
+
+
+def parse_args(argv=None):
+    """解析命令列參數"""
+    parser = argparse.ArgumentParser(description='閱讀工作階段負載產生器')
+    parser.add_argument('--url', help='已啟動的伺服器網址（未指定時在本進程啟動）')
+    parser.add_argument('--category', choices=('manga', 'gallery'), default='gallery')
+    parser.add_argument('--library', help='作品庫目錄（未指定時建立合成作品庫）')
+    parser.add_argument('--works', type=int, default=500, help='合成作品庫的作品數')
+    parser.add_argument('--chapters', type=int, default=5, help='合成漫畫庫每部作品的章節數')
+    parser.add_argument('--images', type=int, default=40, help='合成作品庫每個章節的圖片數')
+    parser.add_argument('--users', type=int, default=4, help='並行使用者數')
+    parser.add_argument('--sessions', type=int, default=20, help='工作階段總數')
+    parser.add_argument('--duration', type=float, help='以秒數為準執行（取代 --sessions）')
+    parser.add_argument('--browse-pages', type=int, default=3, help='每個工作階段最多瀏覽的列表頁數')
+    parser.add_argument('--read-ratio', type=float, help='每章閱讀的圖片比例（未指定時隨機）')
+    parser.add_argument('--progress-every', type=int, default=5, help='每捲動幾張回報一次進度')
+    parser.add_argument('--status-rate', type=float, default=0.3, help='切換作品狀態的機率')
+    parser.add_argument('--think-ms', type=float, default=0, help='每個動作之間的平均思考時間（毫秒）')
+    parser.add_argument('--cache-mode', choices=('warm', 'cold'), default='warm',
+                        help='cold：本進程伺服器不預熱索引，且每個工作階段前清除記憶體快取')
+    parser.add_argument('--io-workers', type=int, default=4, help='本進程伺服器的 io_workers')
+    parser.add_argument('--seed', type=int, default=0)
+    parser.add_argument('--json', help='將報告寫入 JSON 檔案')
+    return parser.parse_args(argv)
+
+
+def main(argv=None):
+    options = parse_args(argv)
+    report = run_load(options)
+    print_report(report)
+    if options.json:
+        with open(options.json, 'w', encoding='utf-8') as f:
+            json.dump(report, f, ensure_ascii=False, indent=2)
+        print(f"報告已寫入 {options.json}")
+    return report
+
+
+if __name__ == '__main__':
+    main()
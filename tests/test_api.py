@@ -0,0 +1,340 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+HTTP API 測試（使用 Flask test client）
+"""
+
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from app import warm_up
+from core.metrics import metrics
+
+
+@pytest.fixture
+def client(tmp_path, make_library, make_app):
+    """建立測試用 Flask 應用與作品庫"""
+    manga_root = make_library(tmp_path / 'manga', {
+        '漫畫A': {'第01話': 3, '第02話': 2},
+        '漫畫B': {'Chapter 01': 1},
+    })
+    gallery_root = make_library(tmp_path / 'gallery', {
+        '1001-artist': {'': 4},
+        '1002-other': {'': 2},
+    })
+    return make_app(manga_root, gallery_root).test_client()
+
+
+def test_app_factory_warm_up(client):
+    """create_app 使用注入的服務；warm_up 預先建立索引"""
+    shared = client.application.extensions['reader']
+    warm_up(client.application, stats=True)
+    assert shared['manga_service'].index.get_names() == ['漫畫A', '漫畫B']
+    assert len(shared['manga_service'].chapter_index) == 3
+    assert client.get('/').status_code == 302
+    assert 'ui' in client.get('/api/config').get_json()
+
+
+def test_status_counts_endpoint(client):
+    """/api/status/counts 回傳各篩選分頁的數量"""
+    assert client.get('/manga/api/status/counts').get_json() == {
+        'all': 2, 'favorite': 0, 'reviewed': 0, 'unreviewed': 2
+    }
+
+    client.post('/gallery/api/status/1001-artist', json={'status': 'favorite'})
+    assert client.get('/gallery/api/status/counts').get_json() == {
+        'all': 2, 'favorite': 1, 'reviewed': 0, 'unreviewed': 1
+    }
+
+
+def test_progress_and_continue_endpoints(client):
+    """記錄進度後，繼續閱讀 API 回傳最後的章節與頁碼"""
+    assert client.get('/manga/api/continue/漫畫A').get_json() == {'continue': None}
+
+    response = client.post('/manga/api/progress/漫畫A/第02話', json={'page': 2, 'total': 2})
+    assert response.status_code == 200
+    for body in ({'page': 0, 'total': 2}, {'page': 3, 'total': 2}, {'page': True, 'total': 2}, {'page': 1}):
+        assert client.post('/manga/api/progress/漫畫A/第02話', json=body).status_code == 400
+    assert client.post('/manga/api/progress/nope/zzz', json={'page': 1, 'total': 1}).status_code == 404
+    assert client.post('/gallery/api/progress/nope', json={'page': 1, 'total': 1}).status_code == 404
+    assert client.post('/gallery/api/progress/1001-artist', json={'page': 4, 'total': 4}).status_code == 200
+
+    data = client.get('/manga/api/continue/漫畫A').get_json()['continue']
+    assert (data['chapter'], data['page']) == ('漫畫A/第02話', 2)
+    assert client.get('/manga/api/progress/漫畫A/第02話').get_json()['progress']['page'] == 2
+
+
+def test_gallery_artist_filter_endpoints(client):
+    """/api/list 支援 artist / featured 參數，/api/artists 回傳作者列表"""
+    data = client.get('/gallery/api/list?artist=ARTIST').get_json()
+    assert [w['name'] for w in data['mangas']] == ['1001-artist']
+    assert data['mangas'][0]['pixiv_id'] == 1001
+
+    assert client.get('/gallery/api/list?featured=true').get_json()['total'] == 0
+    assert client.get('/gallery/api/artists').get_json() == {
+        'artists': [{'artist': 'artist', 'count': 1}, {'artist': 'other', 'count': 1}]
+    }
+
+
+def test_chapter_search_endpoint(client):
+    """/manga/api/chapters/search 回傳章節與所屬漫畫"""
+    data = client.get('/manga/api/chapters/search?q=第02').get_json()
+    assert data == {
+        'results': [{
+            'manga': {'name': '漫畫A', 'path': '漫畫A'},
+            'chapter': {'name': '第02話', 'path': '漫畫A/第02話'}
+        }],
+        'total': 1
+    }
+
+
+def test_list_search_match_modes(client):
+    """列表 API 的 match 參數：substring 為子字串搜尋（預設），prefix 只返回前綴相符的作品"""
+    def names(url):
+        response = client.get(url)
+        assert response.status_code == 200, response.get_data(as_text=True)
+        return [item['name'] for item in response.get_json()['mangas']]
+
+    assert names('/gallery/api/list?skip_chapters=true&search=artist') == ['1001-artist']
+    assert names('/gallery/api/list?skip_chapters=true&search=artist&match=substring') == ['1001-artist']
+    assert names('/gallery/api/list?skip_chapters=true&search=artist&match=prefix') == []
+    assert sorted(names('/gallery/api/list?skip_chapters=true&search=100&match=prefix')) == ['1001-artist', '1002-other']
+    assert names('/manga/api/list?skip_chapters=true&search=漫畫B&match=prefix') == ['漫畫B']
+    assert names('/manga/api/list?skip_chapters=true&search=畫B&match=prefix') == []
+    assert names('/manga/api/list?skip_chapters=true&search=畫B') == ['漫畫B']
+
+    for category in ('manga', 'gallery'):
+        assert client.get(f'/{category}/api/list?search=a&match=regex').status_code == 400
+
+
+def test_list_cursor_pagination(client):
+    """列表 API 回傳不透明游標，可用於取得下一頁；無效游標回傳 400"""
+    first = client.get('/manga/api/list?per_page=1&skip_chapters=true').get_json()
+    assert [m['name'] for m in first['mangas']] == ['漫畫A']
+
+    second = client.get(f"/manga/api/list?per_page=1&skip_chapters=true&cursor={first['next_cursor']}").get_json()
+    assert [m['name'] for m in second['mangas']] == ['漫畫B']
+    assert second['next_cursor'] is None
+
+    assert client.get('/gallery/api/list?cursor=not-a-cursor').status_code == 400
+    assert client.get('/gallery/api/list?sort=unknown').status_code == 400
+
+
+def test_list_fields_and_chapter_preview(client):
+    """fields 只回傳指定欄位；chapter_limit 只回傳前幾個章節，完整列表由詳情 API 取得"""
+    data = client.get('/manga/api/list?fields=name,chapters,chapter_count&chapter_limit=1').get_json()
+    manga = data['mangas'][0]
+    assert set(manga) == {'name', 'chapters', 'chapter_count', 'has_more_chapters'}
+    assert [c['name'] for c in manga['chapters']] == ['第01話']
+    assert (manga['chapter_count'], manga['has_more_chapters']) == (2, True)
+    assert data['mangas'][1]['has_more_chapters'] is False
+
+    detail = client.get('/manga/api/detail/漫畫A').get_json()
+    assert [c['name'] for c in detail['chapters']] == ['第01話', '第02話']
+
+    data = client.get('/gallery/api/list?fields=name,artist').get_json()
+    assert data['mangas'][0] == {'name': '1001-artist', 'artist': 'artist'}
+
+
+def test_chapter_count_ignores_empty_chapters(client):
+    """載入章節時章節數只計算含有圖片的章節（與章節上限無關）；快速模式不讀取章節內容，以目錄數估計"""
+    manga_root = client.application.extensions['reader']['manga_service'].root_path
+    (manga_root / '漫畫B' / 'Chapter 02').mkdir()
+
+    for query in ('chapter_limit=1', ''):
+        manga = client.get(f'/manga/api/list?{query}').get_json()['mangas'][1]
+        assert manga['chapter_count'] == 1
+        assert manga.get('has_more_chapters', False) is False
+    for query in ('fields=name,chapter_count', 'skip_chapters=true'):
+        manga = client.get(f'/manga/api/list?{query}').get_json()['mangas'][1]
+        assert manga['chapter_count'] == 2
+        assert 'has_more_chapters' not in manga
+
+    # Gallery 作品含子資料夾時同樣只計算含有圖片的子資料夾
+    gallery_root = client.application.extensions['reader']['gallery_service'].root_path
+    work = gallery_root / '1003-folders'
+    for name, count in (('part1', 2), ('part2', 0), ('part3', 0)):
+        (work / name).mkdir(parents=True)
+        for i in range(count):
+            (work / name / f'{i:03d}.jpg').write_bytes(b'')
+    for query in ('chapter_limit=1', ''):
+        works = client.get(f'/gallery/api/list?skip_chapters=false&search=folders&{query}').get_json()['mangas']
+        assert [len(works[0]['chapters']), works[0]['chapter_count']] == [1, 1]
+        assert works[0].get('has_more_chapters', False) is False
+
+    assert client.get('/manga/api/list?fields=name,unknown').status_code == 400
+
+
+def test_batch_work_details(client):
+    """/api/details 一次回傳多部作品的章節列表，不存在的路徑列於 missing"""
+    response = client.post('/manga/api/details', json={'paths': ['漫畫B', '漫畫A', '漫畫B', '不存在']})
+    data = response.get_json()
+    assert [w['path'] for w in data['works']] == ['漫畫B', '漫畫A']
+    assert [c['name'] for c in data['works'][1]['chapters']] == ['第01話', '第02話']
+    assert data['missing'] == ['不存在']
+    assert data['works'][1] == client.get('/manga/api/detail/漫畫A').get_json()
+
+    data = client.post('/gallery/api/details', json={'paths': ['1001-artist']}).get_json()
+    assert data['works'][0]['chapters'][0]['image_count'] == 4
+
+    assert client.post('/manga/api/details', json={'paths': 'x'}).status_code == 400
+    assert client.post('/manga/api/details', json={'paths': ['x'] * 51}).status_code == 400
+
+
+def test_paths_outside_library_are_rejected(client):
+    """含有 '..' 或絕對路徑的請求不會讀取作品庫以外的目錄"""
+    data = client.post('/manga/api/details', json={'paths': ['../gallery', '/etc', '..\\gallery']}).get_json()
+    assert data == {'works': [], 'missing': ['../gallery', '/etc', '..\\gallery']}
+    assert client.get('/manga/api/detail/..%2Fgallery').status_code == 404
+    assert client.get('/manga/image/..%2Fgallery%2F1001-artist%2F001.jpg').status_code == 404
+    assert client.get('/manga/api/chapter/..%2Fgallery%2F1001-artist').get_json()['images'] == []
+    assert client.post('/manga/api/progress/..%2Fgallery%2F1001-artist', json={'page': 1, 'total': 4}).status_code == 404
+
+
+def test_chapter_manifest_format(client):
+    """format=manifest 只帶一次基底路徑，展開後與完整路徑列表一致"""
+    legacy = client.get('/manga/api/chapter/漫畫A/第01話').get_json()
+    data = client.get('/manga/api/chapter/漫畫A/第01話?format=manifest&columns=bytes').get_json()
+
+    manifest = data['manifest']
+    assert manifest['version'] == 1
+    assert manifest['base'] == '漫畫A/第01話'
+    assert manifest['files'] == ['001.jpg', '002.jpg', '003.jpg']
+    assert manifest['columns'] == {'bytes': [0, 0, 0]}
+    assert [f"{manifest['base']}/{name}" for name in manifest['files']] == legacy['images']
+    assert data['total'] == 3
+    assert data['navigation']['next']['path'] == '漫畫A/第02話'
+
+    # 逐圖欄位另外快取，不會出現在沒有要求欄位的回應
+    plain = client.get('/manga/api/chapter/漫畫A/第01話?format=manifest').get_json()['manifest']
+    assert 'columns' not in plain
+    assert client.get('/manga/api/chapter/漫畫A/第01話?format=manifest&columns=bytes,bytes').get_json()[
+        'manifest']['columns'] == {'bytes': [0, 0, 0]}
+
+    # Gallery 作品圖片直接位於作品目錄
+    data = client.get('/gallery/api/chapter/1001-artist?format=manifest').get_json()
+    assert (data['manifest']['base'], len(data['manifest']['files'])) == ('1001-artist', 4)
+    assert 'columns' not in data['manifest']
+
+
+def test_reader_bootstrap(client):
+    """reader-bootstrap 一次回傳配置、章節清單、導航、章節選單狀態與閱讀進度"""
+    client.post('/manga/api/status/漫畫A/第02話', json={'status': 'favorite'})
+    client.post('/manga/api/progress/漫畫A/第01話', json={'page': 2, 'total': 3})
+
+    data = client.get('/manga/api/reader-bootstrap/漫畫A/第01話').get_json()
+    assert set(data['config']) >= {'reader', 'ui'}
+    assert (data['manifest']['files'], data['total']) == (['001.jpg', '002.jpg', '003.jpg'], 3)
+    assert data['navigation']['next']['path'] == '漫畫A/第02話'
+    assert [c['path'] for c in data['chapters']] == ['漫畫A/第01話', '漫畫A/第02話']
+    assert data['statuses'] == {'漫畫A/第01話': 'unreviewed', '漫畫A/第02話': 'favorite'}
+    assert data['progress']['page'] == 2
+
+    # 只顯示收藏章節時選單只含收藏章節
+    data = client.get('/manga/api/reader-bootstrap/漫畫A/第01話?favorite_only=true').get_json()
+    assert [c['path'] for c in data['chapters']] == ['漫畫A/第02話']
+
+    client.post('/gallery/api/status/1001-artist', json={'status': 'favorite'})
+    data = client.get('/gallery/api/reader-bootstrap/1001-artist').get_json()
+    assert (data['total'], data['status'], data['progress']) == (4, 'favorite', None)
+
+    # 不存在的章節在讀取導航前就返回 404
+    assert client.get('/manga/api/reader-bootstrap/nope/x').status_code == 404
+    assert client.get('/manga/api/reader-bootstrap/漫畫A/nope').status_code == 404
+    assert client.get('/gallery/api/reader-bootstrap/nope').status_code == 404
+
+
+def test_export_streams_ndjson(client):
+    """/api/export 以 NDJSON 串流輸出作品，可選擇附上章節與圖片"""
+    response = client.get('/manga/api/export')
+    assert response.mimetype == 'application/x-ndjson'
+    records = [json.loads(line) for line in response.data.decode('utf-8').splitlines()]
+    assert [(r['type'], r['name'], r['status']) for r in records] == [
+        ('work', '漫畫A', 'unreviewed'), ('work', '漫畫B', 'unreviewed')
+    ]
+
+    records = [json.loads(line) for line in client.get('/manga/api/export?images=true').data.decode('utf-8').splitlines()]
+    assert [r['path'] for r in records] == ['漫畫A', '漫畫A/第01話', '漫畫A/第02話', '漫畫B', '漫畫B/Chapter 01']
+    assert records[1]['files'] == ['001.jpg', '002.jpg', '003.jpg']
+
+    # Gallery 作品的圖片直接位於作品目錄，作品本身即為章節；作品記錄附上中繼資料
+    records = [json.loads(line) for line in client.get('/gallery/api/export?chapters=true').data.decode('utf-8').splitlines()]
+    assert records[0]['artist'] == 'artist'
+    assert records[1] == {'type': 'chapter', 'work': '1001-artist', 'name': '1001-artist', 'path': '1001-artist', 'image_count': 4}
+
+
+def test_metrics_endpoint(client):
+    """/metrics 以 Prometheus 文字格式輸出路由延遲、檔案系統呼叫與快取命中"""
+    metrics.reset()
+    client.get('/manga/api/chapter/漫畫A/第01話')
+    client.get('/manga/api/chapter/漫畫A/第01話')
+
+    response = client.get('/metrics')
+    assert response.mimetype == 'text/plain'
+    text = response.get_data(as_text=True)
+    route = 'route="/manga/api/chapter/<path:chapter_path>",method="GET"'
+    assert f'reader_http_request_duration_seconds_count{{{route}}} 2' in text
+    assert f'reader_http_request_duration_seconds_bucket{{{route},le="+Inf"}} 2' in text
+    assert f'reader_http_response_size_bytes_count{{{route}}} 2' in text
+    assert 'reader_fs_calls_total{op="listdir"}' in text
+    assert 'reader_cache_requests_total{cache="manifest",result="hit"}' in text
+    assert 'reader_cache_hit_ratio{cache="manifest"}' in text
+    assert 'reader_cache_entries{service="manga"}' in text
+
+
+def test_profiling_and_memory_snapshot(tmp_path, make_library, make_app):
+    """[debug] profiling 啟用時可分析單一請求並取得記憶體快照，只允許本機或管理權杖"""
+    manga_root = make_library(tmp_path / 'manga', {'漫畫A': {'第01話': 2}})
+    gallery_root = make_library(tmp_path / 'gallery', {'1001-artist': {'': 1}})
+    app = make_app(manga_root, gallery_root, {'debug': {'profiling': True, 'token': 'secret'}})
+    client = app.test_client()
+
+    response = client.get('/manga/api/list?profile=1')
+    assert response.status_code == 200 and 'mangas' in response.get_json()
+    name = response.headers['X-Profile']
+    assert (tmp_path / 'profiles' / name).exists()
+    assert client.get('/debug/profiles').get_json() == {'profiles': [name]}
+    assert 'function calls' in client.get(f'/debug/profiles/{name}?sort=tottime').get_data(as_text=True)
+    assert client.get('/debug/profiles/../status.json').status_code == 404
+
+    response = client.get('/gallery/api/list', headers={'X-Profile': 'text'})
+    assert response.mimetype == 'text/plain' and 'function calls' in response.get_data(as_text=True)
+
+    # 非本機連線需要管理權杖，也不會被分析
+    remote = {'REMOTE_ADDR': '192.168.1.20'}
+    assert client.get('/debug/memory', environ_base=remote).status_code == 403
+    assert 'X-Profile' not in client.get('/manga/api/list?profile=1', environ_base=remote).headers
+
+    try:
+        first = client.get('/debug/memory', environ_base=remote, headers={'X-Debug-Token': 'secret'}).get_json()
+        assert first['tracing'] and first['growth'] == []
+        assert first['caches']['manga']['manga']['entries'] == 1
+        second = client.get('/debug/memory').get_json()
+        assert second['current_bytes'] > 0
+    finally:
+        assert client.get('/debug/memory?stop=1').get_json()['tracing'] is False
+
+
+def test_event_stream_connection_limit(tmp_path, make_library, make_app):
+    """SSE 連線數達上限時返回 503 與 Retry-After，關閉連線後釋放名額"""
+    manga_root = make_library(tmp_path / 'manga', {'漫畫A': {'第01話': 1}})
+    gallery_root = make_library(tmp_path / 'gallery', {'1001-artist': {'': 1}})
+    client = make_app(manga_root, gallery_root, {'server': {'sse_max_connections': 1}}).test_client()
+
+    stream = client.get('/api/events', buffered=False)
+    assert stream.status_code == 200
+    rejected = client.get('/api/events')
+    assert rejected.status_code == 503
+    assert rejected.headers['Retry-After'] == '30'
+
+    stream.close()
+    assert client.application.extensions['reader']['event_broker'].subscriber_count == 0
+    reopened = client.get('/api/events', buffered=False)
+    assert reopened.status_code == 200
+    reopened.close()
@@ -0,0 +1,173 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ASGI 介面測試（直接以 asyncio 呼叫 ASGI 應用）
+"""
+
+import asyncio
+import json
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from core.asgi_app import ReaderASGI
+
+
+@pytest.fixture
+def make_asgi(tmp_path, make_library, make_app):
+    """建立測試用 ASGI 應用與作品庫：make_asgi(**ReaderASGI 選項)"""
+    manga_root = make_library(tmp_path / 'manga', {'漫畫A': {'第01話': 2}})
+    gallery_root = make_library(tmp_path / 'gallery', {'1001-artist': {'': 1}})
+
+    def factory(**options):
+        return ReaderASGI(make_app(manga_root, gallery_root), request_workers=2, **options)
+
+    return factory
+
+
+def request(app, method, path, query=b'', body=b'', headers=()):
+    """
+    發出單一 HTTP 請求
+
+    Returns:
+        tuple: (狀態碼, 標頭字典, 回應內容, 回應分段數)
+    """
+    async def run():
+        messages = [{'type': 'http.request', 'body': body, 'more_body': False}]
+        sent = []
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await asyncio.sleep(3600)
+
+        async def send(message):
+            sent.append(message)
+
+        scope = {
+            'type': 'http', 'method': method, 'path': path, 'query_string': query,
+            'headers': [(b'host', b'localhost')] + list(headers), 'http_version': '1.1'
+        }
+        await app(scope, receive, send)
+        return sent
+
+    sent = asyncio.run(run())
+    start = sent[0]
+    chunks = [m.get('body', b'') for m in sent[1:]]
+    return start['status'], dict(start['headers']), b''.join(chunks), len(chunks)
+
+
+def test_images_stream_in_chunks(tmp_path, make_asgi):
+    """圖片分段串流，並支援 ETag 條件請求與 HEAD"""
+    app = make_asgi(chunk_size=4)
+    image = tmp_path / 'manga' / '漫畫A' / '第01話' / '001.jpg'
+    image.write_bytes(b'0123456789')
+
+    status, headers, body, parts = request(app, 'GET', '/manga/image/漫畫A/第01話/001.jpg')
+    assert (status, body, parts) == (200, b'0123456789', 3)
+    assert headers[b'content-type'] == b'image/jpeg'
+    assert headers[b'content-length'] == b'10'
+
+    status, _, body, _ = request(app, 'GET', '/manga/image/漫畫A/第01話/001.jpg',
+                                 headers=[(b'if-none-match', headers[b'etag'])])
+    assert (status, body) == (304, b'')
+
+    status, _, body, _ = request(app, 'HEAD', '/manga/image/漫畫A/第01話/001.jpg')
+    assert (status, body) == (200, b'')
+
+    assert request(app, 'GET', '/manga/image/漫畫A/第01話/missing.jpg')[0] == 404
+    assert request(app, 'GET', '/gallery/image/../manga/漫畫A/第01話/001.jpg')[0] == 404
+
+
+def test_image_ranges_and_cache_headers(tmp_path, make_asgi):
+    """Range / If-Modified-Since 與 Blueprint 的 send_file 一致，Cache-Control 依服務設定"""
+    app = make_asgi(chunk_size=4)
+    image = tmp_path / 'manga' / '漫畫A' / '第01話' / '001.jpg'
+    image.write_bytes(b'0123456789')
+    url = '/manga/image/漫畫A/第01話/001.jpg'
+
+    status, headers, body, _ = request(app, 'GET', url, headers=[(b'range', b'bytes=2-7')])
+    assert (status, body) == (206, b'234567')
+    assert (headers[b'content-range'], headers[b'content-length']) == (b'bytes 2-7/10', b'6')
+    assert headers[b'accept-ranges'] == b'bytes'
+    assert request(app, 'GET', url, headers=[(b'range', b'bytes=-3')])[2] == b'789'
+    assert request(app, 'GET', url, headers=[(b'range', b'bytes=8-')])[2] == b'89'
+    assert request(app, 'GET', url, headers=[(b'range', b'bytes=0-1,4-5')])[:3:2] == (200, b'0123456789')
+    status, headers, _, _ = request(app, 'GET', url, headers=[(b'range', b'bytes=10-')])
+    assert (status, headers[b'content-range']) == (416, b'bytes */10')
+    # If-Range 與目前版本不符時回應完整檔案
+    assert request(app, 'GET', url, headers=[(b'range', b'bytes=2-3'), (b'if-range', b'"old"')])[0] == 200
+
+    status, headers, _, _ = request(app, 'GET', url)
+    assert headers[b'cache-control'] == b'no-cache'
+    assert request(app, 'GET', url, headers=[(b'if-modified-since', headers[b'last-modified'])])[0] == 304
+    assert request(app, 'GET', url, headers=[(b'if-modified-since', b'Thu, 01 Jan 1970 00:00:00 GMT')])[0] == 200
+
+    _, headers, _, _ = request(app, 'GET', '/gallery/image/1001-artist/001.jpg')
+    assert headers[b'cache-control'] == b'public, max-age=86400'
+
+
+def test_flask_routes_run_in_thread_pool(make_asgi):
+    """其他路由交給 Flask 應用（含 POST 內容與串流回應）"""
+    app = make_asgi()
+
+    status, _, body, _ = request(app, 'GET', '/manga/api/list', query=b'skip_chapters=true')
+    assert status == 200
+    assert [m['name'] for m in json.loads(body)['mangas']] == ['漫畫A']
+
+    payload = json.dumps({'status': 'favorite'}).encode()
+    status, _, body, _ = request(app, 'POST', '/gallery/api/status/1001-artist', body=payload,
+                                 headers=[(b'content-type', b'application/json'),
+                                          (b'content-length', str(len(payload)).encode())])
+    assert (status, json.loads(body)['status']) == (200, 'favorite')
+
+    status, headers, body, _ = request(app, 'GET', '/gallery/api/export')
+    assert headers[b'content-type'] == b'application/x-ndjson'
+    assert json.loads(body.splitlines()[0])['status'] == 'favorite'
+
+
+def test_event_stream_wakes_on_publish(make_asgi):
+    """SSE 連線在事件迴圈中等待事件：其他執行緒廣播的事件立即轉入事件迴圈送出"""
+    app = make_asgi()
+    broker = app.shared['event_broker']
+
+    async def run():
+        sent = []
+        connected = asyncio.Event()
+        closed = asyncio.Event()
+        messages = [{'type': 'http.request', 'body': b'', 'more_body': False}]
+
+        async def receive():
+            if messages:
+                return messages.pop(0)
+            await closed.wait()
+            return {'type': 'http.disconnect'}
+
+        async def send(message):
+            sent.append(message)
+            if message.get('body', b'').startswith(b'retry:'):
+                connected.set()
+            elif message.get('body', b'').startswith(b'event:'):
+                closed.set()
+
+        scope = {'type': 'http', 'method': 'GET', 'path': '/api/events', 'query_string': b'',
+                 'headers': [(b'host', b'localhost')], 'http_version': '1.1'}
+        stream = asyncio.ensure_future(app(scope, receive, send))
+        await asyncio.wait_for(connected.wait(), timeout=5)
+        assert broker.subscriber_count == 1
+
+        started = asyncio.get_running_loop().time()
+        # 由其他執行緒廣播（與 StatusManager 的監聽器相同）
+        await asyncio.to_thread(broker.publish, {'type': 'status', 'path': 'A'})
+        await asyncio.wait_for(stream, timeout=5)
+        return sent, asyncio.get_running_loop().time() - started
+
+    sent, elapsed = asyncio.run(run())
+    assert sent[0]['status'] == 200
+    assert sent[-1]['body'].startswith(b'event: status\ndata: {')
+    assert elapsed < 1
+    assert broker.subscriber_count == 0
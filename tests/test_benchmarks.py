@@ -0,0 +1,142 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+效能基準測試（需要 pytest-benchmark，未安裝時略過）
+
+作品庫以 create_test_data.generate_library 產生，規模可由環境變數調整：
+READER_BENCH_WORKS（預設 200）、READER_BENCH_CHAPTERS（預設 5）、READER_BENCH_IMAGES（預設 20）
+
+儲存基準並在之後比較（平均時間變慢超過 25% 即失敗）：
+
+    python -m pytest tests/test_benchmarks.py --benchmark-only --benchmark-save=baseline
+    python -m pytest tests/test_benchmarks.py --benchmark-only --benchmark-compare --benchmark-compare-fail=mean:25%
+
+基準存於 .benchmarks/<機器>/，只在同一台機器上比較才有意義
+"""
+
+import os
+import sys
+from pathlib import Path
+
+import pytest
+
+pytest.importorskip('pytest_benchmark')
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from core.status_manager import StatusManager
+from modules.gallery.service import GalleryService
+from modules.manga.service import MangaService
+from tests.create_test_data import generate_library
+
+WORKS = int(os.environ.get('READER_BENCH_WORKS', 200))
+CHAPTERS = int(os.environ.get('READER_BENCH_CHAPTERS', 5))
+IMAGES = int(os.environ.get('READER_BENCH_IMAGES', 20))
+
+
+@pytest.fixture(scope='module')
+def library(tmp_path_factory):
+    """建立基準測試用的漫畫與 Gallery 作品庫（整個模組共用）"""
+    root = tmp_path_factory.mktemp('bench')
+    generate_library(root / 'manga', works=WORKS, chapters=CHAPTERS, images=IMAGES)
+    generate_library(root / 'gallery', works=WORKS, chapters=0, images=IMAGES, layout='gallery')
+    return root
+
+
+@pytest.fixture
+def manga_service(library, image_extensions):
+    """已建立作品索引的漫畫服務"""
+    service = MangaService(library / 'manga', image_extensions, {})
+    service.index.refresh()
+    return service
+
+
+@pytest.fixture
+def gallery_service(library, image_extensions):
+    """已建立作品索引的 Gallery 服務"""
+    service = GalleryService(library / 'gallery', image_extensions, {})
+    service.index.refresh()
+    return service
+
+
+@pytest.fixture
+def status_manager(tmp_path):
+    """每三部漫畫收藏一部的狀態管理器"""
+    manager = StatusManager(str(tmp_path / 'status.json'))
+    for i in range(1, WORKS + 1, 3):
+        manager.set_status('manga', f"作品{i:03d}", 'favorite')
+    return manager
+
+
+def first_chapter(service):
+    """第一部作品的第一個章節路徑"""
+    work = service.index.get_names()[0]
+    return service.get_chapters(service.root_path / work)[0]['path']
+
+
+def test_manga_list_cold(benchmark, manga_service, status_manager):
+    """漫畫列表（每輪清除記憶體快取，需重新讀取章節目錄）"""
+    def run():
+        return manga_service.get_manga_list(page=1, per_page=24, status_manager=status_manager, chapter_limit=5)
+
+    result = benchmark.pedantic(run, setup=manga_service.cache.clear, rounds=20)
+    assert len(result['mangas']) == min(24, WORKS)
+
+
+def test_manga_list_warm(benchmark, manga_service, status_manager):
+    """漫畫列表（快取命中）"""
+    result = benchmark(manga_service.get_manga_list, page=2, per_page=24, status_manager=status_manager,
+                       chapter_limit=5)
+    assert result['total'] == WORKS
+
+
+def test_gallery_list_cold(benchmark, gallery_service, status_manager):
+    """Gallery 列表（每輪清除記憶體快取）"""
+    def run():
+        return gallery_service.get_gallery_list(page=1, per_page=24, status_manager=status_manager)
+
+    result = benchmark.pedantic(run, setup=gallery_service.cache.clear, rounds=20)
+    assert len(result['mangas']) == min(24, WORKS)
+
+
+def test_gallery_list_search(benchmark, gallery_service, status_manager):
+    """Gallery 列表搜尋（快取命中）"""
+    result = benchmark(gallery_service.get_gallery_list, per_page=24, status_manager=status_manager,
+                       search_keyword='artist01')
+    assert result['mangas']
+
+
+def test_get_chapters_cold(benchmark, manga_service):
+    """章節列表（每輪清除章節清單快取）"""
+    work_path = manga_service.root_path / manga_service.index.get_names()[0]
+    result = benchmark.pedantic(manga_service.get_chapters, args=(work_path,), setup=manga_service.cache.clear,
+                                rounds=50)
+    assert len(result) == CHAPTERS
+
+
+def test_chapter_navigation(benchmark, manga_service, status_manager):
+    """章節導航（上一話 / 下一話）"""
+    chapter_path = first_chapter(manga_service)
+    result = benchmark(manga_service.get_chapter_navigation, chapter_path, status_manager=status_manager)
+    assert result['current_index'] == 1
+
+
+def test_images_in_dir_paginated(benchmark, manga_service):
+    """章節圖片分頁"""
+    chapter_dir = manga_service.root_path / first_chapter(manga_service)
+    images, _ = benchmark(manga_service.get_images_in_dir_paginated, chapter_dir, offset=0, limit=10)
+    assert len(images) == min(10, IMAGES)
+
+
+def test_status_get_all(benchmark, status_manager):
+    """讀取全部狀態（列表篩選使用）"""
+    statuses = benchmark(status_manager.get_all_statuses, 'manga')
+    assert len(statuses) == len(range(1, WORKS + 1, 3))
+
+
+def test_status_toggle(benchmark, status_manager):
+    """設定狀態（含檔案鎖與寫回）"""
+    states = iter(['favorite', 'reviewed'] * 10000)
+    result = benchmark.pedantic(lambda: status_manager.set_status('manga', '作品002', next(states)), rounds=50)
+    assert result
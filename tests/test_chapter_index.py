@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+全域章節索引測試
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from modules.manga.service import MangaService
+
+
+def test_search_chapters_across_mangas(tmp_path, make_library, image_extensions):
+    """章節搜尋跨所有漫畫，回傳章節與所屬漫畫"""
+    root = make_library(tmp_path / 'manga', {
+        '漫畫A': {'第01話': 1, '第02話': 1, '番外篇': 1},
+        '漫畫B': {'第01話 出發': 1, 'Extra': 1},
+    })
+    service = MangaService(root, image_extensions)
+
+    result = service.search_chapters('01')
+    assert result['total'] == 2
+    assert {(hit['manga']['name'], hit['chapter']['path']) for hit in result['results']} == {
+        ('漫畫A', '漫畫A/第01話'), ('漫畫B', '漫畫B/第01話 出發')
+    }
+    assert [hit['chapter']['name'] for hit in service.search_chapters('番外')['results']] == ['番外篇']
+    assert service.search_chapters('EXTRA')['results'][0]['manga']['name'] == '漫畫B'
+    assert service.search_chapters('第', limit=2)['total'] == 3
+    assert len(service.search_chapters('第', limit=2)['results']) == 2
+    assert service.search_chapters('')['total'] == 0
+
+
+def test_chapter_index_incremental_refresh(tmp_path, make_library, touch_root, image_extensions):
+    """只重新掃描有變動的作品：新增章節、刪除作品都會反映在搜尋結果"""
+    root = make_library(tmp_path / 'manga', {'A': {'ch1': 1}, 'B': {'ch1': 1}, 'C': {'ch1': 1}})
+    service = MangaService(root, image_extensions)
+    index = service.chapter_index
+
+    assert index.refresh() == 3
+    assert index.refresh(force=True) == 0  # 沒有變動時不重新掃描任何作品
+
+    make_library(root, {'A': {'ch2 special': 1}})
+    touch_root(root / 'A')
+    assert index.refresh(force=True) == 1
+    assert index.search('special') == [('A', 'ch2 special')]
+
+    for image in (root / 'B' / 'ch1').iterdir():
+        image.unlink()
+    (root / 'B' / 'ch1').rmdir()
+    (root / 'B').rmdir()
+    touch_root(root)
+    assert sorted(index.search('ch1')) == [('A', 'ch1'), ('C', 'ch1')]
+    assert len(index) == 3
+
+
+def test_chapter_search_revalidates_in_background(tmp_path, monkeypatch, make_library, touch_root, count_fs_calls,
+                                                  image_extensions):
+    """TTL 到期時搜尋只 stat 根目錄，作品目錄的比對在背景進行；作品清單未變時不複製名稱"""
+    root = make_library(tmp_path / 'manga', {f'W{i:02d}': {'ch1': 1} for i in range(30)})
+    service = MangaService(root, image_extensions, {'performance': {'metadata_refresh_seconds': 0}})
+    index = service.chapter_index
+    assert index.refresh(force=True) == 30
+
+    make_library(root, {'W07': {'bonus': 1}})
+    touch_root(root / 'W07')
+    monkeypatch.setattr(service.index, 'get_name_set', lambda: pytest.fail('作品清單未變動'))
+    with count_fs_calls() as counts:
+        index.search('bonus')
+    assert counts == {'stat': 1}
+    monkeypatch.undo()
+
+    assert index.wait_for_refresh(timeout=10)
+    assert index.search('bonus') == [('W07', 'bonus')]
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+啟動快照測試（保存後重新建立應用，預熱不需重新掃描作品庫）
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from app import warm_up
+from tests.create_test_data import generate_library
+
+CHAPTER = '作品001/第001'
+
+
+@pytest.fixture
+def library(tmp_path):
+    """小型漫畫與 Gallery 作品庫"""
+    generate_library(tmp_path / 'manga', works=10, chapters=3, images=4)
+    generate_library(tmp_path / 'gallery', works=10, chapters=0, images=4, layout='gallery')
+    return tmp_path
+
+
+@pytest.fixture
+def start_app(library, make_app):
+    """以同一組路徑建立新的應用（模擬重新啟動）"""
+    return lambda: make_app(library / 'manga', library / 'gallery', data_dir=library / 'data',
+                            config={'performance': {'index_snapshot': True}})
+
+
+def shutdown(app):
+    """保存快照（等同進程結束時的 atexit）"""
+    assert app.extensions['reader']['index_snapshot'].save()
+
+
+def test_restart_restores_indexes_without_scanning(start_app, count_fs_calls):
+    """重新啟動後由快照載入作品索引、章節索引與章節清單，預熱與第一個請求都不需讀取目錄"""
+    app = start_app()
+    warm_up(app)
+    client = app.test_client()
+    expected = client.get(f'/manga/api/chapter/{CHAPTER}').get_json()
+    expected_search = client.get('/manga/api/chapters/search?q=第002').get_json()
+    shutdown(app)
+
+    restarted = start_app()
+    with count_fs_calls() as counts:
+        result = warm_up(restarted)
+    # 開啟章節時會讀取該作品所有章節（3 個）的清單
+    assert result['snapshot']['manga'] == {'index': True, 'manifests': 3, 'chapters': True}
+    assert result['snapshot']['gallery']['index'] is True
+    assert counts['scandir'] == 0 and counts['listdir'] == 0
+
+    client = restarted.test_client()
+    with count_fs_calls() as counts:
+        assert client.get(f'/manga/api/chapter/{CHAPTER}').get_json() == expected
+    assert counts['listdir'] == 0
+    assert client.get('/manga/api/chapters/search?q=第002').get_json() == expected_search
+    assert client.get('/gallery/api/list?per_page=20').get_json()['total'] == 10
+
+
+def test_changes_while_stopped_are_detected(library, start_app):
+    """停機期間的變動：新增作品由根目錄 mtime 偵測，章節目錄變動的清單不載入"""
+    app = start_app()
+    warm_up(app)
+    app.test_client().get(f'/manga/api/chapter/{CHAPTER}')
+    shutdown(app)
+
+    (library / 'manga' / '作品999' / '第001').mkdir(parents=True)
+    (library / 'manga' / CHAPTER / '999.jpg').write_bytes(b'')
+
+    restarted = start_app()
+    result = warm_up(restarted)
+    assert result['snapshot']['manga']['manifests'] == 2
+    service = restarted.extensions['reader']['manga_service']
+    assert service.index.contains('作品999')
+    assert ('作品999', '第001') in service.chapter_index.search('第001')
+    assert len(service.get_images_in_dir(library / 'manga' / CHAPTER)) == 5
+
+
+def test_unreadable_snapshot_falls_back_to_scan(start_app):
+    """快照損毀時忽略並照常掃描"""
+    app = start_app()
+    snapshot_path = Path(app.extensions['reader']['index_snapshot'].storage_path)
+    snapshot_path.parent.mkdir(parents=True, exist_ok=True)
+    snapshot_path.write_bytes(b'not a snapshot')
+
+    result = warm_up(app)
+    assert result['snapshot'] == {}
+    assert len(app.extensions['reader']['manga_service'].index.get_names()) == 10
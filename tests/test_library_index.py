@@ -0,0 +1,167 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+作品庫索引與列表服務測試
+"""
+
+import sys
+from pathlib import Path
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from core.status_manager import StatusManager
+from core.utils import decodeCursor
+from modules.gallery.service import GalleryService
+from modules.manga.service import MangaService
+
+def test_status_filters_use_index(tmp_path, make_library, image_extensions):
+    """收藏 / 已審核 / 未審核篩選結果正確，且會跟隨狀態變更"""
+    root = make_library(tmp_path / 'gallery', {f"work{i}": {'': 1} for i in range(1, 11)})
+    sm = StatusManager(str(tmp_path / 'status.json'))
+    service = GalleryService(root, image_extensions)
+
+    sm.set_status('gallery', 'work2', 'favorite')
+    sm.set_status('gallery', 'work10', 'favorite')
+    sm.set_status('gallery', 'work3', 'reviewed')
+    sm.set_status('gallery', 'missing', 'favorite')  # 已不存在的作品不應出現
+
+    def names(status):
+        result = service.get_gallery_list(per_page=50, skip_chapters=True, status_filter=status, status_manager=sm)
+        return [w['name'] for w in result['mangas']]
+
+    assert names('favorite') == ['work2', 'work10']
+    assert names('reviewed') == ['work3']
+    assert names('unreviewed') == ['work1', 'work4', 'work5', 'work6', 'work7', 'work8', 'work9']
+
+    # 狀態變更後補集即時更新
+    sm.set_status('gallery', 'work1', 'reviewed')
+    sm.set_status('gallery', 'work2', 'unreviewed')
+    assert names('unreviewed') == ['work2', 'work4', 'work5', 'work6', 'work7', 'work8', 'work9']
+
+
+def test_index_follows_directory_changes(tmp_path, make_library, touch_root, image_extensions):
+    """新增 / 刪除作品資料夾後，列表與未審核補集都會更新"""
+    root = make_library(tmp_path / 'manga', {'A': {'ch1': 2}, 'B': {'ch1': 1}})
+    sm = StatusManager(str(tmp_path / 'status.json'))
+    service = MangaService(root, image_extensions)
+
+    result = service.get_manga_list(skip_chapters=True, status_filter='unreviewed', status_manager=sm)
+    assert [m['name'] for m in result['mangas']] == ['A', 'B']
+
+    make_library(root, {'C': {'ch1': 1}})
+    (root / 'A' / 'ch1' / '001.jpg').unlink()
+    (root / 'A' / 'ch1' / '002.jpg').unlink()
+    (root / 'A' / 'ch1').rmdir()
+    (root / 'A').rmdir()
+    touch_root(root)
+
+    result = service.get_manga_list(skip_chapters=True, status_filter='unreviewed', status_manager=sm)
+    assert [m['name'] for m in result['mangas']] == ['B', 'C']
+    assert service.get_manga_list(skip_chapters=True)['total'] == 2
+
+
+def test_status_counts(tmp_path, make_library, image_extensions):
+    """狀態計數與篩選結果一致，並隨狀態變更即時更新"""
+    root = make_library(tmp_path / 'gallery', {f"work{i}": {'': 1} for i in range(1, 6)})
+    sm = StatusManager(str(tmp_path / 'status.json'))
+    service = GalleryService(root, image_extensions)
+
+    sm.set_status('gallery', 'work1', 'favorite')
+    sm.set_status('gallery', 'deleted-work', 'favorite')
+    assert service.get_status_counts(sm) == {'all': 5, 'favorite': 1, 'reviewed': 0, 'unreviewed': 4}
+
+    sm.set_status('gallery', 'work2', 'reviewed')
+    sm.set_status('gallery', 'work1', 'unreviewed')
+    assert service.get_status_counts(sm) == {'all': 5, 'favorite': 0, 'reviewed': 1, 'unreviewed': 4}
+    assert sm.get_status_counts('gallery') == {'favorite': 1, 'reviewed': 1}
+
+
+def test_cursor_pagination_is_stable(tmp_path, make_library, touch_root, image_extensions):
+    """游標分頁依自然排序逐頁前進，兩次請求之間新增作品不會造成重複或遺漏"""
+    root = make_library(tmp_path / 'gallery', {f"work{i}": {'': 1} for i in range(1, 8)})
+    sm = StatusManager(str(tmp_path / 'status.json'))
+    service = GalleryService(root, image_extensions)
+
+    first = service.get_gallery_list(per_page=3, skip_chapters=True)
+    assert [w['name'] for w in first['mangas']] == ['work1', 'work2', 'work3']
+
+    # 在目前頁之前插入作品：頁碼分頁會重複 work3，游標分頁不受影響
+    make_library(root, {'work0': {'': 1}})
+    touch_root(root)
+    cursor = decodeCursor(first['next_cursor'])
+    second = service.get_gallery_list(per_page=3, skip_chapters=True, cursor=cursor)
+    assert [w['name'] for w in second['mangas']] == ['work4', 'work5', 'work6']
+    third = service.get_gallery_list(per_page=3, skip_chapters=True, cursor=decodeCursor(second['next_cursor']))
+    assert [w['name'] for w in third['mangas']] == ['work7']
+    assert third['next_cursor'] is None
+
+    # 狀態篩選下的游標分頁
+    for name in ('work2', 'work5', 'work7'):
+        sm.set_status('gallery', name, 'favorite')
+    page = service.get_gallery_list(per_page=2, skip_chapters=True, status_filter='favorite', status_manager=sm)
+    assert [w['name'] for w in page['mangas']] == ['work2', 'work5']
+    page = service.get_gallery_list(per_page=2, skip_chapters=True, status_filter='favorite', status_manager=sm,
+                                    cursor=decodeCursor(page['next_cursor']))
+    assert [w['name'] for w in page['mangas']] == ['work7']
+    assert page['next_cursor'] is None
+
+    # 舊版頁碼分頁仍可使用
+    page = service.get_gallery_list(page=2, per_page=2, skip_chapters=True, status_filter='unreviewed', status_manager=sm)
+    assert [w['name'] for w in page['mangas']] == ['work3', 'work4']
+
+
+def test_sort_by_index_columns(tmp_path, make_library, touch_root, image_extensions):
+    """依統計欄位排序（預設遞減，統計欄位建立前以名稱排序），游標分頁沿用欄位值，作品變動後增量更新"""
+    root = make_library(tmp_path / 'manga', {
+        'A': {'ch1': 1},
+        'B': {'ch1': 2, 'ch2': 2},
+        'C': {'ch1': 3},
+    })
+    (root / 'C' / 'ch1' / '001.jpg').write_bytes(b'x' * 100)
+    service = MangaService(root, image_extensions)
+
+    def names(sort, **kwargs):
+        result = service.get_manga_list(per_page=2, skip_chapters=True, sort=sort, **kwargs)
+        return [m['name'] for m in result['mangas']], result['next_cursor']
+
+    # 統計欄位在背景建立，完成前以名稱排序回應
+    pending = service.get_manga_list(per_page=2, skip_chapters=True, sort='images')
+    assert [m['name'] for m in pending['mangas']] == ['A', 'B'] and pending['sort_pending'] is True
+    assert service.index.wait_for_refresh(timeout=10)
+    assert service.get_manga_list(per_page=2, skip_chapters=True, sort='images')['sort_pending'] is False
+
+    page, cursor = names('images')
+    assert page == ['B', 'C']
+    assert names('images', cursor=decodeCursor(cursor)) == (['A'], None)
+    assert names('chapters')[0] == ['B', 'A']
+    assert names('bytes', descending=False)[0] == ['A', 'B']
+    stats = service.index.get_stats('C')
+    assert (stats['images'], stats['chapters'], stats['bytes']) == (3, 1, 100)
+
+    # 新增章節後作品目錄 mtime 改變，只重新計算該作品
+    make_library(root, {'A': {'ch2': 5, 'ch3': 1}})
+    touch_root(root / 'A')
+    assert service.index.refresh_stats(force=True) == 1
+    assert names('images')[0] == ['A', 'B']
+
+
+def test_generated_library_is_indexed(tmp_path, image_extensions):
+    """合成作品庫：長名稱、深層章節與壓縮檔章節都能正確建立並被索引"""
+    from tests.create_test_data import generate_library
+
+    totals = generate_library(tmp_path / 'manga', works=3, chapters=12, images=2, depth=2,
+                              name_length=40, archives=1)
+    assert totals == {'works': 3, 'chapters': 36, 'images': 72, 'archives': 3}
+
+    service = MangaService(tmp_path / 'manga', image_extensions, {})
+    names = service.index.get_names()
+    assert len(names) == 3 and all(len(name) == 40 for name in names)
+    # 深層章節放在「卷」目錄中，第一層只有兩卷（壓縮檔不是目錄）
+    volumes = service.get_chapter_dirs(service.root_path / names[0])
+    assert [d.name for d in volumes] == ['卷001', '卷002']
+
+    totals = generate_library(tmp_path / 'gallery', works=2, chapters=0, images=3, layout='gallery')
+    gallery = GalleryService(tmp_path / 'gallery', image_extensions, {})
+    assert gallery.index.get_names() == ['100001-artist001', '100002-artist002']
+    assert gallery.get_chapters(gallery.root_path / '100001-artist001')[0]['image_count'] == 3
@@ -0,0 +1,41 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+負載產生器測試（本進程伺服器 + 小型合成作品庫）
+"""
+
+import sys
+from pathlib import Path
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from tests.load_generator import parse_args, percentile, run_load
+
+
+def test_percentile_nearest_rank():
+    """百分位數使用 nearest-rank"""
+    samples = list(range(1, 101))
+    assert (percentile(samples, 50), percentile(samples, 99), percentile(samples, 100)) == (50, 99, 100)
+    assert percentile([], 90) == 0
+
+
+def test_sessions_replay_reader_pattern():
+    """工作階段依閱讀器的載入方式發出請求，並以相同種子重播出相同的請求數"""
+    argv = ['--category', 'gallery', '--works', '8', '--images', '20', '--users', '2', '--sessions', '3',
+            '--read-ratio', '1', '--status-rate', '1', '--seed', '7']
+    report = run_load(parse_args(argv))
+
+    assert report['errors'] == 0
+    routes = report['routes']
+    assert set(routes) == {
+        'GET /gallery/api/list', 'GET /gallery/reader/<path>', 'GET /gallery/api/reader-bootstrap/<path>',
+        'GET /gallery/image/<path>', 'POST /gallery/api/progress/<path>', 'POST /gallery/api/status/<path>'
+    }
+    # 讀完整章：每張圖片只請求一次
+    assert routes['GET /gallery/image/<path>']['count'] == 3 * 20
+    assert routes['GET /gallery/api/reader-bootstrap/<path>']['p99_ms'] >= routes['GET /gallery/api/reader-bootstrap/<path>']['p50_ms']
+
+    replay = run_load(parse_args(argv))
+    assert {route: stats['count'] for route, stats in replay['routes'].items()} == \
+        {route: stats['count'] for route, stats in routes.items()}
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+作品中繼資料索引測試
+"""
+
+import sys
+from pathlib import Path
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from core.metadata_index import MetadataIndex, parse_work_name
+from core.status_manager import StatusManager
+from modules.gallery.service import GalleryService
+
+
+def test_parse_work_name():
+    """解析 `<pixiv id>-<artist>` 命名，作者名稱可包含連字號"""
+    assert parse_work_name('109314222-Nalunel') == {'pixiv_id': 109314222, 'artist': 'Nalunel'}
+    assert parse_work_name('1001-foo-bar') == {'pixiv_id': 1001, 'artist': 'foo-bar'}
+    assert parse_work_name('no-id') == {'pixiv_id': None, 'artist': None}
+
+
+def test_metadata_index_updates_reverse_index():
+    """記錄變更時舊值從反向索引移除，字串查詢不分大小寫"""
+    index = MetadataIndex()
+    index.set('1-A', {'artist': 'Alice', 'featured': True})
+    index.set('2-a', {'artist': 'alice', 'featured': False})
+
+    assert index.lookup('artist', 'ALICE') == {'1-A', '2-a'}
+    assert index.lookup('featured', True) == {'1-A'}
+
+    index.set('1-A', {'artist': 'Alice', 'featured': False})
+    index.remove('2-a')
+    assert index.lookup('featured', True) == set()
+    assert index.value_counts('artist') == {'Alice': 1}
+
+
+def test_gallery_artist_and_featured_filters(tmp_path, make_library, touch_root, image_extensions):
+    """作者 / 精選篩選來自索引，可與狀態篩選、搜尋組合，並偵測標記檔案變動"""
+    root = make_library(tmp_path / 'gallery', {
+        '1001-Alice': {'': 1}, '1002-alice': {'': 1}, '1003-Bob': {'': 1}, 'misc': {'': 1}
+    })
+    (root / '1002-alice' / '.special').write_bytes(b'')
+    sm = StatusManager(str(tmp_path / 'status.json'))
+    service = GalleryService(root, image_extensions)
+
+    def names(**kwargs):
+        result = service.get_gallery_list(per_page=50, skip_chapters=True, status_manager=sm, **kwargs)
+        return [w['name'] for w in result['mangas']]
+
+    assert names(artist='alice') == ['1001-Alice', '1002-alice']
+    assert names(featured_only=True) == ['1002-alice']
+    assert names(artist='bob', featured_only=True) == []
+    assert service.get_artists()[0]['count'] == 2
+
+    sm.set_status('gallery', '1001-Alice', 'favorite')
+    assert names(artist='alice', status_filter='favorite') == ['1001-Alice']
+    assert names(artist='alice', search_keyword='1002') == ['1002-alice']
+
+    work = service.get_gallery_list(per_page=50, skip_chapters=True, artist='bob')['mangas'][0]
+    assert (work['pixiv_id'], work['artist'], work['featured']) == (1003, 'Bob', False)
+
+    # 在既有作品加上標記檔案：根目錄 mtime 不變，由作品目錄 mtime 重新驗證
+    (root / '1003-Bob' / '.special').write_bytes(b'')
+    touch_root(root / '1003-Bob')
+    assert service.index.refresh_metadata(force=True) == 1
+    assert names(featured_only=True) == ['1002-alice', '1003-Bob']
+
+    # 新增的作品在掃描時擷取中繼資料
+    make_library(root, {'1004-Bob': {'': 1}})
+    touch_root(root)
+    assert names(artist='Bob') == ['1003-Bob', '1004-Bob']
+
+
+def test_metadata_revalidates_served_works_only(tmp_path, make_library, touch_root, count_fs_calls,
+                                                 image_extensions):
+    """TTL 到期時只 stat 回傳的作品；篩選所需的全庫重新驗證在背景執行"""
+    root = make_library(tmp_path / 'gallery', {f'{1000 + i}-artist': {'': 1} for i in range(30)})
+    service = GalleryService(root, image_extensions, {'performance': {'metadata_refresh_seconds': 0}})
+    service.index.refresh()
+
+    with count_fs_calls() as counts:
+        assert service.index.get_metadata('1001-artist')['featured'] is False
+    assert counts['stat'] == 1
+
+    # 變動的作品重新擷取（擷取時檢查標記檔案）
+    (root / '1005-artist' / '.special').write_bytes(b'')
+    touch_root(root / '1005-artist')
+    with count_fs_calls() as counts:
+        assert service.index.get_metadata('1005-artist')['featured'] is True
+    assert counts['stat'] == 2
+
+    (root / '1020-artist' / '.special').write_bytes(b'')
+    touch_root(root / '1020-artist')
+    with count_fs_calls() as counts:
+        service.index.get_names_filtered(metadata={'featured': True})
+    assert counts['stat'] == 0
+    assert service.index.wait_for_refresh(timeout=10)
+    assert service.index.get_names_filtered(metadata={'featured': True}) == ['1005-artist', '1020-artist']
@@ -0,0 +1,54 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+ProgressStore 測試
+"""
+
+import json
+import sys
+from pathlib import Path
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from core.progress_store import ProgressStore
+
+
+def test_updates_are_coalesced_until_flush(tmp_path):
+    """頻繁更新只寫入記憶體，flush 時一次寫回最新值"""
+    path = tmp_path / 'progress.json'
+    store = ProgressStore(str(path), flush_interval=60)
+
+    for page in range(1, 50):
+        store.set_progress('manga', '漫畫A/第01話', page, total=80)
+
+    assert not path.exists()
+    assert store.get_progress('manga', '漫畫A/第01話')['page'] == 49
+
+    assert store.flush() == 1
+    saved = json.loads(path.read_text(encoding='utf-8'))
+    assert saved['manga']['chapters']['漫畫A/第01話']['page'] == 49
+    assert store.flush() == 0
+
+
+def test_continue_point_and_worker_merge(tmp_path):
+    """繼續閱讀指向最後閱讀的章節，且兩個 worker 的進度會合併"""
+    path = str(tmp_path / 'progress.json')
+    worker_a = ProgressStore(path, flush_interval=60)
+    worker_b = ProgressStore(path, flush_interval=60)
+
+    worker_a.set_progress('manga', '漫畫A/第01話', 12)
+    worker_a.flush()
+    worker_b.set_progress('manga', '漫畫A/第02話', 3, total=20)
+    worker_b.set_progress('gallery', '1001-artist', 7)
+    worker_b.flush()
+
+    assert worker_a.get_continue_point('manga', '漫畫A') == {
+        'chapter': '漫畫A/第02話',
+        'page': 3,
+        'total': 20,
+        'updated_at': worker_a.get_progress('manga', '漫畫A/第02話')['updated_at']
+    }
+    assert worker_a.get_progress('manga', '漫畫A/第01話')['page'] == 12
+    assert worker_a.get_progress('gallery', '1001-artist')['page'] == 7
+    assert worker_a.get_continue_point('manga', '漫畫B') is None
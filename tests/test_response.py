@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+JSON 回應工具測試
+"""
+
+import gzip
+import json
+import sys
+from pathlib import Path
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from flask import Flask
+
+from core.response import choose_encoding, json_response
+
+
+def make_app():
+    """建立回傳大型 / 小型 JSON 的測試應用"""
+    app = Flask(__name__)
+
+    @app.route('/big')
+    def big():
+        return json_response({'images': [f"作品/章節/{i:04d}.jpg" for i in range(500)]})
+
+    @app.route('/small')
+    def small():
+        return json_response({'ok': True}, status=201, headers={'Cache-Control': 'no-store'})
+
+    return app.test_client()
+
+
+def test_gzip_negotiation():
+    """接受 gzip 時壓縮大型回應，內容解壓後與原資料一致"""
+    client = make_app()
+
+    response = client.get('/big', headers={'Accept-Encoding': 'gzip, deflate'})
+    assert response.headers['Content-Encoding'] == 'gzip'
+    assert 'Accept-Encoding' in response.headers['Vary']
+    data = json.loads(gzip.decompress(response.data))
+    assert data['images'][1] == '作品/章節/0001.jpg'
+    assert len(response.data) < len(json.dumps(data, ensure_ascii=False).encode('utf-8')) // 5
+
+    plain = client.get('/big')
+    assert 'Content-Encoding' not in plain.headers
+    assert plain.get_json() == data
+
+
+def test_small_response_is_not_compressed():
+    """小型回應不壓縮，保留狀態碼與自訂標頭"""
+    response = make_app().get('/small', headers={'Accept-Encoding': 'gzip'})
+    assert response.status_code == 201
+    assert 'Content-Encoding' not in response.headers
+    assert response.headers['Cache-Control'] == 'no-store'
+    assert response.get_json() == {'ok': True}
+
+
+def test_choose_encoding():
+    """q=0 表示不接受；未安裝 brotli 時 br 退回 gzip"""
+    assert choose_encoding('gzip;q=0, identity') is None
+    assert choose_encoding('') is None
+    assert choose_encoding('br, gzip') in ('br', 'gzip')
@@ -0,0 +1,64 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+名稱搜尋索引測試
+"""
+
+import sys
+from pathlib import Path
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from core.search_index import NgramIndex
+from modules.gallery.service import GalleryService
+
+
+def test_short_and_long_queries():
+    """短查詢（1~2 字元的中文）與 trigram 查詢都能找到子字串"""
+    index = NgramIndex()
+    index.update(added=['進擊的巨人', '鬼滅之刃', '巨人族的新娘', 'One Piece'])
+
+    assert index.search('巨') == ['巨人族的新娘', '進擊的巨人']
+    assert set(index.search('巨人')) == {'巨人族的新娘', '進擊的巨人'}
+    assert index.search('的巨人') == ['進擊的巨人']
+    assert index.search('piece') == ['One Piece']
+    assert index.search('xyz') == []
+    assert index.search('  ') == []
+
+
+def test_normalization_and_ranking():
+    """全形 / 大小寫正規化，並依完全相符 > 前綴 > 單字開頭 > 子字串排序"""
+    index = NgramIndex()
+    index.update(added=['ｂｅｒｓｅｒｋ', 'Berserk Deluxe', '1001-Berserk', 'xberserk'])
+
+    assert index.search('BERSERK') == ['ｂｅｒｓｅｒｋ', 'Berserk Deluxe', '1001-Berserk', 'xberserk']
+    assert index.search('berserk', prefix=True) == ['ｂｅｒｓｅｒｋ', 'Berserk Deluxe']
+    assert index.search('berserk', limit=1) == ['ｂｅｒｓｅｒｋ']
+
+
+def test_incremental_removal():
+    """移除名稱後不再出現在任何查詢結果中"""
+    index = NgramIndex()
+    index.update(added=['alpha', 'alphabet'])
+    index.update(removed=['alpha'])
+
+    assert index.search('alpha') == ['alphabet']
+    assert index.search('al') == ['alphabet']
+    assert len(index) == 1
+
+
+def test_service_search_follows_directory_changes(tmp_path, make_library, touch_root, image_extensions):
+    """列表 API 的搜尋走索引，且跟隨資料夾增刪"""
+    root = make_library(tmp_path / 'gallery', {'1001-山田': {'': 1}, '1002-田中': {'': 1}, '1003-other': {'': 1}})
+    service = GalleryService(root, image_extensions)
+
+    result = service.get_gallery_list(skip_chapters=True, search_keyword='田')
+    # '田中' 在單字開頭，排在 '山田' 之前
+    assert [w['name'] for w in result['mangas']] == ['1002-田中', '1001-山田']
+    assert result['total'] == 2
+
+    make_library(root, {'1004-田村': {'': 1}})
+    touch_root(root)
+    result = service.get_gallery_list(skip_chapters=True, search_keyword='田村')
+    assert [w['name'] for w in result['mangas']] == ['1004-田村']
@@ -0,0 +1,93 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+SingleFlight 測試
+"""
+
+import os
+import sys
+import threading
+from pathlib import Path
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from core.single_flight import SingleFlight
+from modules.manga.service import MangaService
+
+
+def run_concurrently(count, fn):
+    """同時啟動多個執行緒呼叫 fn，返回各自的結果"""
+    results = [None] * count
+    barrier = threading.Barrier(count)
+
+    def worker(i):
+        barrier.wait()
+        try:
+            results[i] = fn()
+        except Exception as e:
+            results[i] = e
+
+    threads = [threading.Thread(target=worker, args=(i,)) for i in range(count)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    return results
+
+
+def test_concurrent_calls_share_one_computation():
+    """計算進行中到達的同鍵請求等待同一個結果，例外也一併拋出"""
+    flight = SingleFlight()
+    release = threading.Event()
+    calls = []
+
+    def compute():
+        calls.append(1)
+        release.wait(5)
+        return {'value': 42}
+
+    results = []
+    threads = [threading.Thread(target=lambda: results.append(flight.do('key', compute))) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    # 等其餘 7 個請求都在等待第一個請求的結果後才讓計算完成
+    while flight.coalesced < 7:
+        threading.Event().wait(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(calls) == 1
+    assert all(result is results[0] for result in results)
+    assert (flight.executed, flight.coalesced, flight.in_flight()) == (1, 7, 0)
+
+    def fail():
+        raise ValueError('boom')
+
+    errors = run_concurrently(4, lambda: flight.do('error', fail))
+    assert all(isinstance(error, ValueError) for error in errors)
+    # 計算結束後不保留結果，下一次呼叫重新計算
+    assert flight.do('key', lambda: 'fresh') == 'fresh'
+
+
+def test_cold_manifest_is_listed_once(tmp_path, monkeypatch, make_library, image_extensions):
+    """多個請求同時開啟同一章節時只讀取一次目錄"""
+    root = make_library(tmp_path / 'manga', {'漫畫A': {'第01話': 3}})
+    service = MangaService(root, image_extensions, {})
+    chapter_dir = root / '漫畫A' / '第01話'
+
+    listed = []
+    real_listdir = os.listdir
+    gate = threading.Event()
+
+    def slow_listdir(path):
+        listed.append(path)
+        gate.wait(0.2)  # 讓其他請求在讀取期間到達
+        return real_listdir(path)
+
+    monkeypatch.setattr(os, 'listdir', slow_listdir)
+    results = run_concurrently(6, lambda: service.get_images_in_dir(chapter_dir))
+
+    assert len(listed) == 1
+    assert all(len(images) == 3 for images in results)
@@ -0,0 +1,102 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+StatusManager 測試
+"""
+
+import sys
+import threading
+from pathlib import Path
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from core.event_broker import EventBroker
+from core.status_manager import StatusManager
+
+
+def test_set_and_get_status(tmp_path):
+    """基本的狀態設定與讀取"""
+    sm = StatusManager(str(tmp_path / 'status.json'))
+
+    assert sm.get_status('manga', 'A') == 'unreviewed'
+    assert sm.set_status('manga', 'A', 'favorite')
+    assert sm.get_status('manga', 'A') == 'favorite'
+
+    sm.set_status('manga', 'A', 'reviewed')
+    assert sm.get_status('manga', 'A') == 'reviewed'
+    assert sm.get_items_by_status('manga', 'favorite') == []
+
+
+def test_workers_see_each_other(tmp_path):
+    """兩個實例（模擬兩個 worker）共用同一檔案時，彼此的寫入都看得到"""
+    path = str(tmp_path / 'status.json')
+    worker_a = StatusManager(path)
+    worker_b = StatusManager(path)
+
+    worker_a.set_status('gallery', 'A', 'favorite')
+    assert worker_b.get_status('gallery', 'A') == 'favorite'
+
+    # worker_b 寫入時不能覆蓋 worker_a 的變更
+    worker_b.set_status('gallery', 'B', 'favorite')
+    assert set(worker_a.get_items_by_status('gallery', 'favorite')) == {'A', 'B'}
+
+
+def test_concurrent_writes_are_not_lost(tmp_path):
+    """多執行緒、多實例同時寫入時不遺失任何變更"""
+    path = str(tmp_path / 'status.json')
+    managers = [StatusManager(path) for _ in range(4)]
+
+    def worker(index, sm):
+        for i in range(25):
+            sm.set_status('manga', f'item-{index}-{i}', 'favorite')
+
+    threads = [threading.Thread(target=worker, args=(i, sm)) for i, sm in enumerate(managers)]
+    for t in threads:
+        t.start()
+    for t in threads:
+        t.join()
+
+    favorites = StatusManager(path).get_items_by_status('manga', 'favorite')
+    assert len(favorites) == 100
+
+
+def test_status_events_reach_broker(tmp_path):
+    """狀態變更會以事件形式推送給 SSE 訂閱者"""
+    broker = EventBroker()
+    subscription = broker.subscribe()
+    sm = StatusManager(str(tmp_path / 'status.json'))
+    sm.add_listener(broker.publish)
+
+    sm.set_status('gallery', 'A', 'favorite')
+    event = subscription.get_nowait()
+    assert event == {
+        'type': 'status', 'category': 'gallery', 'path': 'A',
+        'old_status': 'unreviewed', 'status': 'favorite'
+    }
+    assert EventBroker.format_sse(event).startswith('event: status\ndata: {')
+
+    # 其他 worker 寫入後，refresh() 會發出 reload 事件
+    StatusManager(str(tmp_path / 'status.json')).set_status('gallery', 'B', 'reviewed')
+    sm.refresh()
+    assert subscription.get_nowait() == {'type': 'reload'}
+
+
+def test_reload_event_is_sent_after_locks_are_released(tmp_path):
+    """寫入交易中偵測到的 reload 事件在釋放鎖之後才發出，監聽器可以再寫入狀態"""
+    path = str(tmp_path / 'status.json')
+    sm = StatusManager(path, lock_timeout=0.5)
+    other = StatusManager(path, lock_timeout=0.5)
+    results = []
+
+    def on_event(event):
+        if event['type'] == 'reload' and not results:
+            # 另一個實例（等同另一個 worker）需要取得跨進程檔案鎖
+            results.append(other.set_status('manga', 'C', 'reviewed'))
+            results.append(sm.set_status('manga', 'D', 'reviewed'))
+
+    sm.add_listener(on_event)
+    other.set_status('manga', 'A', 'favorite')
+    assert sm.set_status('manga', 'B', 'favorite')
+    assert results == [True, True]
+    assert sm.get_all_statuses('manga') == {'A': 'favorite', 'B': 'favorite', 'C': 'reviewed', 'D': 'reviewed'}
@@ -0,0 +1,136 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+"""
+檔案系統呼叫預算測試
+
+效能退化通常表現為多出來的檔案系統呼叫（多一次 iterdir、多一次 exists()），而不是 CPU 變慢。
+透過 Flask test client 發出請求，計算期間的 os.scandir / os.listdir / os.stat / open 次數
+（Path.iterdir / exists / is_dir 等最終也會呼叫這些函數），並檢查每個端點在冷 / 熱快取下的上限。
+
+同一組預算在 20 部與 200 部作品的作品庫上都必須成立，因此列表頁若退化為依作品庫大小掃描就會失敗。
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+# 添加 src 到路徑
+sys.path.insert(0, str(Path(__file__).parent.parent / 'src'))
+
+from app import warm_up
+from tests.create_test_data import generate_library
+
+# 檢查的呼叫種類（與 conftest 的 count_fs_calls 計數的種類相同）
+COUNTED_CALLS = ('scandir', 'listdir', 'stat', 'open')
+
+MANGA_CHAPTER = '作品001/第001'
+GALLERY_WORK = '100001-artist001'
+
+# (端點說明, 方法, 網址, JSON 內容, 冷快取上限, 熱快取上限)；未列出的呼叫種類上限為 0
+# 每部漫畫 4 個章節：章節預覽列表（章節數只計算含有圖片的章節）、詳情與閱讀器在冷快取時
+# 會讀取該作品每個章節的圖片清單（listdir 4 次）；快速模式只讀取章節目錄
+BUDGETS = [
+    ('漫畫列表（快速模式）', 'GET', '/manga/api/list?per_page=6&skip_chapters=true', None,
+     {'scandir': 24, 'stat': 14}, {'stat': 8}),
+    ('漫畫列表（章節預覽）', 'GET', '/manga/api/list?per_page=6&chapter_limit=3', None,
+     {'scandir': 24, 'listdir': 24, 'stat': 14}, {'stat': 8}),
+    ('Gallery 列表', 'GET', '/gallery/api/list?per_page=6', None,
+     {'scandir': 12, 'stat': 14}, {'stat': 14}),
+    ('狀態數量', 'GET', '/manga/api/status/counts', None,
+     {'stat': 2}, {'stat': 1}),
+    ('章節搜尋', 'GET', '/manga/api/chapters/search?q=第001', None,
+     {'stat': 1}, {'stat': 1}),
+    ('漫畫詳情', 'GET', f'/manga/api/detail/{MANGA_CHAPTER.split("/")[0]}', None,
+     {'scandir': 1, 'listdir': 4, 'stat': 1}, {'scandir': 1, 'stat': 1}),
+    ('章節圖片', 'GET', f'/manga/api/chapter/{MANGA_CHAPTER}', None,
+     {'scandir': 1, 'listdir': 4}, {'scandir': 1}),
+    ('漫畫閱讀器啟動', 'GET', f'/manga/api/reader-bootstrap/{MANGA_CHAPTER}', None,
+     {'scandir': 2, 'listdir': 4, 'stat': 4}, {'scandir': 2, 'stat': 4}),
+    ('Gallery 閱讀器啟動', 'GET', f'/gallery/api/reader-bootstrap/{GALLERY_WORK}', None,
+     {'listdir': 1, 'stat': 3}, {'stat': 3}),
+    ('儲存閱讀進度', 'POST', f'/manga/api/progress/{MANGA_CHAPTER}', {'page': 3, 'total': 4},
+     {'stat': 1}, {'stat': 1}),
+    ('設定狀態', 'POST', f'/gallery/api/status/{GALLERY_WORK}', {'status': 'favorite'},
+     {'stat': 6, 'open': 3}, {'stat': 6, 'open': 3}),
+]
+
+
+@pytest.fixture(scope='module', params=[20, 200], ids=['20-works', '200-works'])
+def library(request, tmp_path_factory):
+    """不同規模的作品庫（預算必須與作品數無關）"""
+    root = tmp_path_factory.mktemp(f'budget-{request.param}')
+    generate_library(root / 'manga', works=request.param, chapters=4, images=5)
+    generate_library(root / 'gallery', works=request.param, chapters=0, images=5, layout='gallery')
+    return root
+
+
+@pytest.fixture
+def client(library, make_app):
+    """新建應用（記憶體快取為空）；作品索引在啟動時預熱，不計入請求"""
+    app = make_app(library / 'manga', library / 'gallery')
+    warm_up(app)
+    return app.test_client()
+
+
+def check_budget(counts, budget):
+    """返回超出預算的呼叫種類說明"""
+    return [
+        f"{name}: {counts[name]} > {budget.get(name, 0)}"
+        for name in COUNTED_CALLS
+        if counts[name] > budget.get(name, 0)
+    ]
+
+
+@pytest.mark.parametrize('label, method, url, body, cold_budget, warm_budget', BUDGETS,
+                         ids=[budget[0] for budget in BUDGETS])
+def test_endpoint_fs_budget(client, count_fs_calls, label, method, url, body, cold_budget, warm_budget):
+    """每個端點在冷 / 熱快取下的檔案系統呼叫次數不超過預算"""
+    for state, budget in (('cold', cold_budget), ('warm', warm_budget)):
+        with count_fs_calls() as counts:
+            response = client.open(url, method=method, json=body)
+        assert response.status_code == 200, (label, state, response.get_data(as_text=True))
+        over = check_budget(counts, budget)
+        assert not over, f"{label}（{state}）超出檔案系統呼叫預算：{', '.join(over)}；實際 {dict(counts)}"
+
+
+# TTL 為 0 時每個請求都會觸發全庫 mtime 重新驗證，排序列表需要全庫統計；
+# 兩者都在背景進行，請求本身的預算仍與作品數無關：(端點說明, 網址, 冷快取上限, 熱快取上限)
+SORTED_BUDGETS = [
+    ('漫畫列表（依修改時間排序）', '/manga/api/list?per_page=6&skip_chapters=true&sort=mtime',
+     {'scandir': 24, 'stat': 14}, {'stat': 8}),
+    ('Gallery 列表（依修改時間排序）', '/gallery/api/list?per_page=6&sort=mtime',
+     {'scandir': 12, 'stat': 14}, {'stat': 14}),
+]
+
+
+@pytest.fixture
+def expired_client(library, make_app):
+    """中繼資料 TTL 為 0 的應用（每個請求都視為 TTL 已過期）"""
+    app = make_app(library / 'manga', library / 'gallery',
+                   config={'performance': {'metadata_refresh_seconds': 0}})
+    warm_up(app)
+    return app
+
+
+def wait_for_background(app):
+    """等待兩個服務的背景重新驗證與排序統計完成"""
+    for key in ('manga_service', 'gallery_service'):
+        assert app.extensions['reader'][key].index.wait_for_refresh(timeout=30)
+
+
+@pytest.mark.parametrize('label, url, cold_budget, warm_budget', SORTED_BUDGETS,
+                         ids=[budget[0] for budget in SORTED_BUDGETS])
+def test_sorted_list_fs_budget_with_expired_ttl(expired_client, count_fs_calls, label, url,
+                                               cold_budget, warm_budget):
+    """TTL 過期與排序統計建立不在請求中逐一 stat 作品庫：統計未完成、完成後與熱快取時都不超過預算"""
+    client = expired_client.test_client()
+    for state, budget, pending in (('pending', cold_budget, True), ('cold', cold_budget, False),
+                                   ('warm', warm_budget, False)):
+        with count_fs_calls() as counts:
+            response = client.get(url)
+        wait_for_background(expired_client)
+        assert response.status_code == 200, (label, state, response.get_data(as_text=True))
+        assert response.get_json()['sort_pending'] is pending, (label, state)
+        over = check_budget(counts, budget)
+        assert not over, f"{label}（{state}）超出檔案系統呼叫預算：{', '.join(over)}；實際 {dict(counts)}"